@@ -1,8 +1,13 @@
 from patlytics import create_app
 from patlytics.routes import register_blueprints
+from patlytics.services.container import default_container
 
 app = create_app()
 register_blueprints(app)
 
 if __name__ == '__main__':
+    # Build the services and open their connections before taking traffic
+    for step, result in default_container.warm_up().items():
+        status = f"failed: {result['error']}" if result['error'] else "ok"
+        print(f"Warm-up {step}: {result['ms']} ms, {status}")
     app.run(host='0.0.0.0', port=5001)
@@ -0,0 +1,5 @@
+from app import app as flask_app
+from patlytics.asgi_app import AsyncPatlyticsApp
+
+# uvicorn asgi:app --host 0.0.0.0 --port 5001
+app = AsyncPatlyticsApp(flask_app)
@@ -0,0 +1,140 @@
+"""
+Benchmark configuration loading: the legacy one `get_parameter` call (and
+one new boto3 client) per setting versus the lazy `ParameterStore` with a
+batched `get_parameters_by_path`, an encrypted cache hit and the env source.
+
+SSM answers come from an in-process fake that sleeps `--rtt-ms` per API
+call, so results do not depend on credentials or the network; boto3 client
+creation is real.
+
+Usage:
+    python -m benchmarks.bench_config_load [--rtt-ms 40] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import boto3
+from cryptography.fernet import Fernet
+
+from config.parameters import EnvSource, ParameterStore, SSMSource, SSM_REGION
+
+PARAMETERS = {
+    f"/patlytics/{name}": f"value-{i}"
+    for i, name in enumerate([
+        'os/host', 'os/user', 'os/password', 'openai/api_key', 'gemini/api_key',
+        'db/user', 'db/password', 'db/host', 'db/port', 'db/name', 'secret_key',
+        'db/test_name'
+    ])
+}
+# SSM returns at most 10 parameters per get_parameters_by_path page
+PAGE_SIZE = 10
+
+
+class FakeSSM:
+    def __init__(self, rtt_s: float):
+        self.rtt_s = rtt_s
+        self.calls = 0
+
+    def get_parameter(self, Name, WithDecryption=True):
+        self.calls += 1
+        time.sleep(self.rtt_s)
+        return {"Parameter": {"Name": Name, "Value": PARAMETERS[Name]}}
+
+    def get_paginator(self, operation):
+        fake = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                items = [{"Name": k, "Value": v} for k, v in PARAMETERS.items()]
+                for start in range(0, len(items), PAGE_SIZE):
+                    fake.calls += 1
+                    time.sleep(fake.rtt_s)
+                    yield {"Parameters": items[start: start + PAGE_SIZE]}
+
+        return Paginator()
+
+
+def legacy_load(rtt_s: float) -> int:
+    calls = 0
+    for name in PARAMETERS:
+        boto3.client('ssm', region_name=SSM_REGION)
+        fake = FakeSSM(rtt_s)
+        fake.get_parameter(Name=name)
+        calls += fake.calls
+    return calls
+
+
+def batched_load(rtt_s: float) -> int:
+    boto3.client('ssm', region_name=SSM_REGION)
+    fake = FakeSSM(rtt_s)
+    store = ParameterStore(SSMSource(client=fake))
+    for name in PARAMETERS:
+        store.get(name)
+    return fake.calls
+
+
+def cached_load(rtt_s: float, cache_path: str, key: str) -> int:
+    fake = FakeSSM(rtt_s)
+    store = ParameterStore(SSMSource(client=fake), cache_path, key)
+    for name in PARAMETERS:
+        store.get(name)
+    return fake.calls
+
+
+def env_load(environ: dict) -> int:
+    store = ParameterStore(EnvSource(environ))
+    for name in PARAMETERS:
+        store.get(name)
+    return 0
+
+
+def import_config_ms() -> float:
+    """Wall time of `import config` in a fresh interpreter (env source)."""
+    environ = {**os.environ, "PATLYTICS_CONFIG_SOURCE": "env"}
+    code = ("import time; t = time.perf_counter(); import config; "
+            "print((time.perf_counter() - t) * 1000)")
+    output = subprocess.run([sys.executable, "-c", code], env=environ,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure(name: str, load, repeat: int) -> None:
+    samples, calls = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calls = load()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{name:<22} median={statistics.median(samples):9.1f} ms  "
+          f"min={min(samples):9.1f} ms  ssm_calls={calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rtt-ms', type=float, default=40.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    rtt_s = args.rtt_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'config.cache')
+        key = Fernet.generate_key().decode()
+        cached_load(rtt_s, cache_path, key)
+
+        environ = {EnvSource.variable(name): value for name, value in PARAMETERS.items()}
+
+        print(f"{len(PARAMETERS)} parameters, simulated SSM rtt={args.rtt_ms} ms")
+        measure("legacy get_parameter", lambda: legacy_load(rtt_s), args.repeat)
+        measure("batched by path", lambda: batched_load(rtt_s), args.repeat)
+        measure("encrypted cache hit", lambda: cached_load(rtt_s, cache_path, key), args.repeat)
+        measure("env source", lambda: env_load(environ), args.repeat)
+
+    print(f"import config (lazy)   {import_config_ms():9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
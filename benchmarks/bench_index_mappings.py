@@ -0,0 +1,187 @@
+"""
+Benchmark the v1 and v2 index mappings side by side on a local OpenSearch:
+index size, ingest rate, and p50/p99 of the company lookup (v1 fuzzy query,
+v2 completion suggester), title typeahead (v1 ngram match, v2 completion)
+and a full-text claims query.
+
+Start a disposable single-node cluster first:
+    docker run -d --name patlytics-bench -p 9200:9200 \\
+        -e discovery.type=single-node -e DISABLE_SECURITY_PLUGIN=true \\
+        opensearchproject/opensearch:2.17.1
+
+v1 needs the analysis-pinyin plugin. Without it, v1 is built with its
+pinyin sub-fields left out, so its size and ingest figures are a lower bound.
+
+Usage:
+    python -m benchmarks.bench_index_mappings [--host http://localhost:9200] [--copies 20] [--queries 500]
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from opensearchpy import OpenSearch
+
+from config import COMPANY_PRODUCTS_FILE, PATENTS_FILE
+from patlytics.utils.bulk_ingest import BulkIngester, iter_records
+from patlytics.utils.opensearch import company_suggest_query, fuzzy_company_query
+from patlytics.utils.reindex import MAPPINGS, BlueGreenReindexer
+
+PINYIN_ANALYZER = "pinyin_analyzer"
+
+
+def strip_pinyin(settings: dict) -> dict:
+    """v1 settings without the pinyin analyzer, tokenizer and sub-fields."""
+    settings = copy.deepcopy(settings)
+    analysis = settings["settings"].get("analysis", {})
+    analysis.get("analyzer", {}).pop(PINYIN_ANALYZER, None)
+    for name, tokenizer in list(analysis.get("tokenizer", {}).items()):
+        if tokenizer.get("type") == "pinyin":
+            del analysis["tokenizer"][name]
+
+    def strip(properties):
+        for field in properties.values():
+            sub_fields = field.get("fields", {})
+            for name in [n for n, f in sub_fields.items() if f.get("analyzer") == PINYIN_ANALYZER]:
+                del sub_fields[name]
+            strip(field.get("properties", {}))
+
+    strip(settings["mappings"]["properties"])
+    return settings
+
+
+def write_dumps(directory: str, copies: int) -> tuple[str, str]:
+    """NDJSON dumps of `copies` times the patents and companies, with fresh ids."""
+    patents_path = os.path.join(directory, "patents.ndjson")
+    companies_path = os.path.join(directory, "companies.ndjson")
+    patents = list(iter_records(PATENTS_FILE))
+    companies = list(iter_records(COMPANY_PRODUCTS_FILE))
+    with open(patents_path, "w", encoding="utf-8") as file:
+        for copy_number in range(copies):
+            for patent in patents:
+                record = {**patent, "id": str(copy_number * len(patents) + int(patent["id"]))}
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    with open(companies_path, "w", encoding="utf-8") as file:
+        for copy_number in range(copies):
+            for company in companies:
+                name = company["name"] if copy_number == 0 else f"{company['name']} {copy_number}"
+                file.write(json.dumps({**company, "name": name}, ensure_ascii=False) + "\n")
+    return patents_path, companies_path
+
+
+def typo(text: str, rng: random.Random) -> str:
+    """`text` with one letter dropped, as typed in a hurry."""
+    if len(text) < 5:
+        return text
+    i = rng.randrange(1, len(text) - 1)
+    return text[:i] + text[i + 1:]
+
+
+def query_workloads(version: str, patents_index: str, companies_index: str,
+                    rng: random.Random, queries: int) -> dict:
+    """Query name -> list of (index, body) to time."""
+    patents = list(iter_records(PATENTS_FILE))
+    companies = [c["name"] for c in iter_records(COMPANY_PRODUCTS_FILE)]
+    titles = [p["title"] for p in patents if p.get("title")]
+    words = [w for p in patents for w in str(p.get("abstract", "")).split() if len(w) > 6]
+
+    lookups, typeahead, claims = [], [], []
+    for _ in range(queries):
+        name = typo(rng.choice(companies), rng)
+        prefix = rng.choice(titles)[:rng.randint(3, 12)]
+        if version == "v1":
+            lookups.append((companies_index, fuzzy_company_query(name, fields=["name"])))
+            typeahead.append((patents_index, {
+                "query": {"match": {"title": prefix}}, "size": 10, "_source": ["title"]}))
+        else:
+            lookups.append((companies_index, company_suggest_query(name, fields=["name"])))
+            typeahead.append((patents_index, {"size": 0, "_source": ["title"], "suggest": {"title": {
+                "prefix": prefix,
+                "completion": {"field": "title.suggest", "size": 10, "skip_duplicates": True}}}}))
+        claims.append((patents_index, {
+            "query": {"nested": {"path": "claims", "query": {
+                "match": {"claims.text": " ".join(rng.sample(words, 2))}}}},
+            "size": 10, "_source": ["title"]}))
+    return {"company lookup": lookups, "title typeahead": typeahead, "claims search": claims}
+
+
+def time_queries(client: OpenSearch, workload: list) -> dict:
+    # A few untimed queries first, to warm the caches
+    for index, body in workload[:20]:
+        client.search(index=index, body=body)
+    samples = []
+    for index, body in workload:
+        start = time.perf_counter()
+        client.search(index=index, body=body)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"p50": statistics.median(samples),
+            "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))]}
+
+
+def store_bytes(client: OpenSearch, index: str) -> int:
+    stats = client.indices.stats(index=index, metric="store")
+    return stats["indices"][index]["primaries"]["store"]["size_in_bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='http://localhost:9200')
+    parser.add_argument('--user')
+    parser.add_argument('--password')
+    parser.add_argument('--copies', type=int, default=20,
+                        help="Times the data files are repeated (with new ids)")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--keep', action='store_true', help="Keep the benchmark indices")
+    args = parser.parse_args()
+
+    client = OpenSearch(hosts=[args.host], timeout=120,
+                        http_auth=(args.user, args.password) if args.user else None,
+                        verify_certs=False, ssl_show_warn=False)
+    plugins = {p["component"] for p in client.cat.plugins(format="json")}
+    has_pinyin = "analysis-pinyin" in plugins
+    if not has_pinyin:
+        print("analysis-pinyin is not installed: v1 is built without its pinyin sub-fields")
+
+    reindexer = BlueGreenReindexer(client, BulkIngester(client), force_merge=True)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        patents_path, companies_path = write_dumps(directory, args.copies)
+        for version, settings in MAPPINGS.items():
+            if version == "v1" and not has_pinyin:
+                settings = {source: strip_pinyin(s) for source, s in settings.items()}
+            indices = {}
+            for source, path in (("patents", patents_path), ("company_products", companies_path)):
+                index = f"bench-{source.replace('_', '-')}-{version}"
+                indices[source] = index
+                if client.indices.exists(index=index):
+                    client.indices.delete(index=index)
+                start = time.perf_counter()
+                build = reindexer.build(index, settings[source], path, source, index)
+                seconds = time.perf_counter() - start
+                rows.append((version, source, f"{store_bytes(client, index) / 1e6:9.1f} MB",
+                             f"{build['count'] / seconds:8.0f} docs/s"))
+
+            workloads = query_workloads(version, indices["patents"], indices["company_products"],
+                                        random.Random(42), args.queries)
+            for name, workload in workloads.items():
+                latency = time_queries(client, workload)
+                rows.append((version, name, f"p50 {latency['p50']:6.2f} ms",
+                             f"p99 {latency['p99']:6.2f} ms"))
+
+            if not args.keep:
+                for index in indices.values():
+                    client.indices.delete(index=index)
+
+    print(f"\n{args.copies} copies of the data files, {args.queries} queries each")
+    for row in rows:
+        print(f"{row[0]:<4} {row[1]:<18} {row[2]:>14}  {row[3]:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark company-name resolution: brute-force RapidFuzz scan versus the
+`NGramIndex` shortlist used by `CompanyCatalog` for large catalogs.
+
+Queries are catalog names with one random edit (so a >= 80 match exists)
+plus unrelated strings. Recall is the share of queries where the index
+returns a match with the same score as the brute-force scan.
+
+Usage:
+    python -m benchmarks.bench_name_index [--sizes 10000 100000 1000000]
+"""
+import argparse
+import random
+import string
+import time
+
+from rapidfuzz import fuzz, process
+
+from patlytics.utils.name_index import NGramIndex
+
+SCORE_CUTOFF = 79.5
+SUFFIXES = ['inc.', 'corp.', 'llc', 'co.', 'group', 'industries', 'holdings',
+            'systems', 'labs', '']
+
+
+def synthetic_names(count: int, rng: random.Random) -> list[str]:
+    def word():
+        return ''.join(
+            rng.choice('bcdfghjklmnprstvwz') + rng.choice('aeiou')
+            for _ in range(rng.randint(2, 4)))
+
+    names = set()
+    while len(names) < count:
+        words = ' '.join(word() for _ in range(rng.randint(1, 3)))
+        names.add(f"{words} {rng.choice(SUFFIXES)}".strip())
+    return list(names)
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    op = rng.random()
+    if op < 0.33:
+        chars[i] = rng.choice(string.ascii_lowercase)
+    elif op < 0.66:
+        del chars[i]
+    else:
+        chars.insert(i, rng.choice(string.ascii_lowercase))
+    return ''.join(chars)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def timed(fn, queries: list[str]) -> tuple[list, list[float]]:
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def run(size: int, query_count: int, rng: random.Random) -> None:
+    names = synthetic_names(size, rng)
+
+    start = time.perf_counter()
+    index = NGramIndex(names)
+    build_s = time.perf_counter() - start
+
+    queries = [perturb(rng.choice(names), rng) for _ in range(query_count)]
+    queries += [''.join(rng.choice(string.ascii_lowercase) for _ in range(12))
+                for _ in range(query_count // 4)]
+
+    def brute(query):
+        return process.extractOne(
+            query, names, scorer=fuzz.ratio, score_cutoff=SCORE_CUTOFF)
+
+    def indexed(query):
+        ids = index.candidates(query, SCORE_CUTOFF).tolist()
+        return process.extractOne(
+            query, [names[i] for i in ids], scorer=fuzz.ratio,
+            score_cutoff=SCORE_CUTOFF)
+
+    expected, brute_ms = timed(brute, queries)
+    got, index_ms = timed(indexed, queries)
+    recall = sum(
+        1 for e, g in zip(expected, got) if (e and e[1]) == (g and g[1])
+    ) / len(queries)
+
+    print(f"n={size:>9,}  build={build_s:6.2f}s  "
+          f"brute p50={percentile(brute_ms, 50):8.3f}ms p99={percentile(brute_ms, 99):8.3f}ms  "
+          f"index p50={percentile(index_ms, 50):7.3f}ms p99={percentile(index_ms, 99):7.3f}ms  "
+          f"recall={recall:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        run(size, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Benchmark OpenSearch reads: whole documents fetched one search per id (as
+`get_document_by_id` did) versus projected `mget` batches and realtime gets,
+and the fuzzy company lookup with and without `_source` filtering.
+
+The cluster is an in-process connection serving `data/patents.json` and
+`data/company_products.json`. Every request sleeps `--rtt-ms` plus its
+response size at `--mbps`, so the numbers include the real opensearch-py
+serialization and JSON decoding but do not depend on a cluster.
+
+Usage:
+    python -m benchmarks.bench_opensearch_fetch [--ids 50] [--rtt-ms 1.0] [--mbps 1000] [--repeat 5]
+"""
+import argparse
+import difflib
+import json
+import statistics
+import time
+
+from opensearchpy import Connection
+
+from config import COMPANY_PRODUCTS_ALIAS, COMPANY_PRODUCTS_FILE, PATENTS_ALIAS, PATENTS_FILE
+from patlytics.utils.opensearch import OpenSearchClient, company_matches, fuzzy_company_query
+
+# What the infringement prompt reads from a patent
+ANALYSIS_FIELDS = ["publication_number", "title", "abstract", "claims"]
+LIST_FIELDS = ["publication_number", "title"]
+
+
+def filter_source(source: dict, includes: list | None, excludes: list | None) -> dict:
+    if includes is not None:
+        source = {k: v for k, v in source.items() if k in includes}
+    if excludes is not None:
+        source = {k: v for k, v in source.items() if k not in excludes}
+    return source
+
+
+def param_list(value) -> list | None:
+    # opensearch-py sends list parameters comma-joined, as bytes
+    if isinstance(value, bytes):
+        value = value.decode()
+    return value.split(',') if value else None
+
+
+class LocalCluster:
+    """Patents and companies by index, with wire time and bytes counted."""
+
+    def __init__(self, rtt_s: float, bytes_per_s: float):
+        with open(PATENTS_FILE, encoding='utf-8') as f:
+            patents = json.load(f)
+        with open(COMPANY_PRODUCTS_FILE, encoding='utf-8') as f:
+            companies = json.load(f)['companies']
+        self.indexes = {
+            PATENTS_ALIAS: {str(p['id']): p for p in patents},
+            COMPANY_PRODUCTS_ALIAS: {c['name']: c for c in companies},
+        }
+        self.rtt_s = rtt_s
+        self.bytes_per_s = bytes_per_s
+        self.requests = 0
+        self.bytes = 0
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.bytes = 0
+
+    def send(self, payload: dict) -> str:
+        raw = json.dumps(payload)
+        self.requests += 1
+        self.bytes += len(raw.encode())
+        time.sleep(self.rtt_s + len(raw) / self.bytes_per_s)
+        return raw
+
+    def handle(self, method: str, url: str, params: dict, body: dict | None) -> dict:
+        index, _, rest = url.strip('/').partition('/')
+        docs = self.indexes[index]
+        includes, excludes = param_list(params.get('_source_includes')), param_list(
+            params.get('_source_excludes'))
+
+        if rest.startswith('_doc/'):
+            doc_id = rest[len('_doc/'):]
+            return {"_id": doc_id, "found": True,
+                    "_source": filter_source(docs[doc_id], includes, excludes)}
+
+        if rest == '_mget':
+            return {"docs": [
+                {"_id": doc_id, "found": True,
+                 "_source": filter_source(docs[doc_id], includes, excludes)}
+                if doc_id in docs else {"_id": doc_id, "found": False}
+                for doc_id in body['ids']
+            ]}
+
+        # _search: a term query on _id, or the fuzzy company query
+        source = body.get('_source') or {}
+        includes, excludes = source.get('includes'), source.get('excludes')
+        query = body['query']
+        if 'term' in query:
+            doc_id = str(query['term']['_id'])
+            scored = [(1.0, doc_id)] if doc_id in docs else []
+        else:
+            name = query['bool']['should'][0]['fuzzy']['name']['value'].lower()
+            scored = sorted(
+                ((10 * difflib.SequenceMatcher(None, name, doc_id.lower()).ratio(), doc_id)
+                 for doc_id in docs), reverse=True)
+            scored = [(s, d) for s, d in scored if s >= body.get('min_score', 0)]
+        hits = [{"_id": doc_id, "_score": score,
+                 "_source": filter_source(docs[doc_id], includes, excludes)}
+                for score, doc_id in scored[:body.get('size', 10)]]
+        return {"hits": {"total": {"value": len(hits)}, "hits": hits}}
+
+
+def local_connection(cluster: LocalCluster):
+    class LocalConnection(Connection):
+        def perform_request(self, method, url, params=None, body=None, timeout=None,
+                            ignore=(), headers=None):
+            payload = cluster.handle(method, url, params or {}, json.loads(body) if body else None)
+            return 200, {}, cluster.send(payload)
+
+    return LocalConnection
+
+
+def measure(name: str, cluster: LocalCluster, run, repeat: int) -> None:
+    samples = []
+    for _ in range(repeat):
+        cluster.reset()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"{name:<34} median={statistics.median(samples):8.2f} ms  "
+          f"requests={cluster.requests:4d}  bytes={cluster.bytes:10,d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ids', type=int, default=50)
+    parser.add_argument('--rtt-ms', type=float, default=1.0)
+    parser.add_argument('--mbps', type=float, default=1000.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cluster = LocalCluster(args.rtt_ms / 1000, args.mbps * 1_000_000 / 8)
+    client = OpenSearchClient("localhost", "user", "password",
+                              connection_class=local_connection(cluster))
+    ids = list(cluster.indexes[PATENTS_ALIAS])[:args.ids]
+    patent_id = ids[0]
+    company = "Walmart"
+
+    def search_by_id(doc_id):
+        return client.search_documents(PATENTS_ALIAS, {"term": {"_id": doc_id}}, size=1)
+
+    def legacy_fuzzy():
+        # The lookup before projection: default size, whole documents
+        body = fuzzy_company_query(company)
+        del body['size']
+        return company_matches(client.client.search(index=COMPANY_PRODUCTS_ALIAS, body=body))
+
+    print(f"{len(ids)} patents, simulated rtt={args.rtt_ms} ms, {args.mbps} Mbit/s")
+    measure(f"list: {len(ids)} searches, full doc", cluster,
+            lambda: [search_by_id(doc_id) for doc_id in ids], args.repeat)
+    measure(f"list: mget, {len(LIST_FIELDS)} fields", cluster,
+            lambda: client.get_documents(PATENTS_ALIAS, ids, fields=LIST_FIELDS), args.repeat)
+    measure("patent: search, full doc", cluster,
+            lambda: search_by_id(patent_id), args.repeat)
+    measure("patent: get, analysis fields", cluster,
+            lambda: client.get_document_by_id(PATENTS_ALIAS, patent_id, fields=ANALYSIS_FIELDS),
+            args.repeat)
+    measure("company: fuzzy, full docs", cluster, legacy_fuzzy, args.repeat)
+    measure("company: fuzzy, top 3 names", cluster,
+            lambda: client.fuzzy_search_company(company, fields=["name"]), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
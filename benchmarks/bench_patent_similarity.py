@@ -0,0 +1,94 @@
+"""
+Benchmark "patents similar to this product" queries on synthetic corpora.
+
+Each synthetic patent draws its terms from a Zipf distribution over the
+vocabulary, as real claim text does. Reports index build time, resident
+matrix size and p50/p99 query latency (one query at a time, and per query
+in batches).
+
+Usage:
+    python -m benchmarks.bench_patent_similarity [--sizes 100 10000 1000000]
+        [--svd-components 64]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from patlytics.utils.patent_similarity import SimilarityIndex
+
+
+def synthetic_counts(size: int, vocabulary_size: int, terms_per_doc: int,
+                     rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Document-term counts in coordinate form, one row per (patent, term)."""
+    rows = np.repeat(np.arange(size, dtype=np.int64), terms_per_doc)
+    terms = (rng.zipf(1.3, size * terms_per_doc) - 1) % vocabulary_size
+    # Merge repeated terms of a document into one (row, term, count) entry
+    keys, counts = np.unique(rows * vocabulary_size + terms, return_counts=True)
+    return keys // vocabulary_size, keys % vocabulary_size, counts
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(size: int, args, rng: np.random.Generator) -> None:
+    rows, terms, counts = synthetic_counts(
+        size, args.vocabulary, args.terms_per_doc, rng)
+    vocabulary = {f"t{i}": i for i in range(args.vocabulary)}
+
+    start = time.perf_counter()
+    index = SimilarityIndex(rows, terms, counts, size, vocabulary,
+                            svd_components=args.svd_components)
+    build_s = time.perf_counter() - start
+    del rows, terms, counts
+
+    queries = [
+        [f"t{term}" for term in (rng.zipf(1.3, args.query_terms) - 1) % args.vocabulary]
+        for _ in range(args.queries)
+    ]
+
+    single_ms = []
+    for query in queries:
+        start = time.perf_counter()
+        index.top_k([query], args.top_k)
+        single_ms.append((time.perf_counter() - start) * 1000)
+
+    batch_ms = []
+    for i in range(0, len(queries), args.batch):
+        batch = queries[i: i + args.batch]
+        start = time.perf_counter()
+        index.top_k(batch, args.top_k)
+        batch_ms.append((time.perf_counter() - start) * 1000 / len(batch))
+
+    print(f"n={size:>9,}  build={build_s:7.2f}s  size={index.nbytes / 2**20:8.1f} MiB  "
+          f"query p50={percentile(single_ms, 50):8.3f}ms p99={percentile(single_ms, 99):8.3f}ms  "
+          f"batched p50={percentile(batch_ms, 50):8.3f}ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 10_000, 1_000_000])
+    parser.add_argument('--svd-components', type=int, default=0,
+                        help="dense dimensions, 0 for sparse TF-IDF only")
+    parser.add_argument('--vocabulary', type=int, default=50_000)
+    parser.add_argument('--terms-per-doc', type=int, default=40)
+    parser.add_argument('--query-terms', type=int, default=15)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=32)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    mode = f"svd={args.svd_components}" if args.svd_components else "sparse"
+    print(f"{mode}, vocabulary={args.vocabulary:,}, "
+          f"{args.terms_per_doc} terms/patent, top_k={args.top_k}")
+    for size in args.sizes:
+        run(size, args, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark patent lookups: legacy per-request `json.load` + linear scan versus
+the resident `PatentStore`.
+
+Reports p50/p99 latency and the peak memory allocated per lookup.
+
+Usage:
+    python -m benchmarks.bench_patent_store [--iterations 200]
+"""
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+from config import PATENTS_FILE
+from patlytics.utils.patent_store import PatentStore
+
+
+def legacy_lookup(patent_id: int) -> dict:
+    with open(PATENTS_FILE) as f:
+        patents = json.load(f)
+        return next((p for p in patents if p['id'] == int(patent_id)), None)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(name: str, lookup, ids: list[int]) -> None:
+    latencies = []
+    for patent_id in ids:
+        start = time.perf_counter()
+        lookup(patent_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    peaks = []
+    for patent_id in ids[:20]:
+        tracemalloc.start()
+        lookup(patent_id)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(f"{name:<14} p50={percentile(latencies, 50):9.4f} ms  "
+          f"p99={percentile(latencies, 99):9.4f} ms  "
+          f"alloc/lookup={sum(peaks) / len(peaks) / 1024:10.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    store = PatentStore(PATENTS_FILE)
+    with open(PATENTS_FILE) as f:
+        all_ids = [p['id'] for p in json.load(f)]
+    ids = [random.choice(all_ids) for _ in range(args.iterations)]
+
+    # Warm the store so the one-off load is not counted as a lookup
+    store.get(ids[0])
+
+    print(f"{len(all_ids)} patents, {args.iterations} lookups")
+    measure("legacy", legacy_lookup, ids)
+    measure("PatentStore", store.get, ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,195 @@
-from patlytics.utils.aws_utils import get_ssm_parameter
+from config.parameters import default_parameters
 
 
 PATENTS_ALIAS = "patents_v1"
 COMPANY_PRODUCTS_ALIAS = "company_products_v1"
-OS_HOST = get_ssm_parameter('/patlytics/os/host')
-OS_USER = get_ssm_parameter('/patlytics/os/user')
-OS_PASSWORD = get_ssm_parameter('/patlytics/os/password')
-OPENAI_API_KEY = get_ssm_parameter('/patlytics/openai/api_key')
-GEMINI_API_KEY = get_ssm_parameter('/patlytics/gemini/api_key')
-
-DB_USER = get_ssm_parameter('/patlytics/db/user')
-DB_PWD = get_ssm_parameter('/patlytics/db/password')
-DB_HOST = get_ssm_parameter('/patlytics/db/host')
-DB_PORT = get_ssm_parameter('/patlytics/db/port')
-DB_NAME = get_ssm_parameter('/patlytics/db/name')
+PATENTS_FILE = "./data/patents.json"
+COMPANY_PRODUCTS_FILE = "./data/company_products.json"
+
+# Compiled patent corpus (see patlytics/utils/patent_corpus.py) the patent
+# store and similarity index serve from instead of PATENTS_FILE, which stays
+# the dump that reindexing and ingestion read; None serves PATENTS_FILE
+PATENTS_CORPUS_FILE = None
+
+# Infringement analysis cache: in-process LRU size/TTL and how long saved
+# reports keep answering for the same inputs (seconds)
+ANALYSIS_CACHE_SIZE = 1024
+ANALYSIS_CACHE_TTL = 60 * 60
+ANALYSIS_CACHE_PERSISTENT_TTL = 7 * 24 * 60 * 60
+
+# Background infringement jobs: concurrent analyses, extra queued jobs, and
+# how long finished job state is kept (seconds). Job state is kept in the
+# worker process that runs the job, so async mode needs a single worker
+# process (or sticky routing of polls to it)
+JOB_WORKERS = 8
+JOB_QUEUE_SIZE = 100
+JOB_RESULT_TTL = 60 * 60
+
+# Concurrent LLM calls per request when analyzing products one by one
+LLM_FANOUT_CONCURRENCY = 4
+
+# LLM routing across Gemini and OpenAI: rolling window of calls per provider,
+# calls needed before its stats are trusted, error rate above which it is
+# unhealthy, and hedging a slow call to the next provider after its p95 (or
+# the default delay before enough calls were seen). Hedging is off by default:
+# every hedged call is paid for, and counts against the rate limits, twice, so
+# up to ~5% of calls (those past p95) may cost double
+LLM_ROUTER_WINDOW = 100
+LLM_ROUTER_MIN_SAMPLES = 5
+LLM_ROUTER_MAX_ERROR_RATE = 0.5
+LLM_ROUTER_WORKERS = 32
+# Seconds a call counts in its provider's stats. A demoted provider only sees
+# failover traffic; once its samples expire it is tried again (re-measured)
+LLM_ROUTER_SAMPLE_TTL = 5 * 60
+LLM_HEDGE = False
+LLM_HEDGE_DEFAULT_DELAY_MS = 20_000
+
+# Client-side LLM rate governor: requests and tokens per minute to stay under
+# for each provider (a little below its quota), output tokens reserved per
+# call on top of the prompt, and the longest/most calls waiting for capacity
+GEMINI_REQUESTS_PER_MINUTE = 1800
+GEMINI_TOKENS_PER_MINUTE = 3_600_000
+OPENAI_REQUESTS_PER_MINUTE = 3000
+OPENAI_TOKENS_PER_MINUTE = 180_000
+LLM_RESERVED_OUTPUT_TOKENS = 1024
+LLM_GOVERNOR_MAX_WAIT = 30
+LLM_GOVERNOR_MAX_QUEUE = 500
+
+# Retries of rate-limited and transient LLM errors, with exponential backoff
+# and full jitter (seconds)
+LLM_RETRY_ATTEMPTS = 3
+LLM_RETRY_BASE_DELAY = 1.0
+LLM_RETRY_MAX_DELAY = 20.0
+
+# Infringement analyses one user (uid, or client address) may run at once
+LLM_USER_MAX_CONCURRENCY = 4
+
+# Reverse proxies (nginx, load balancer) in front of the app: the client
+# address is read from the X-Forwarded-For entry they added, so anonymous
+# callers do not all share the proxy's quota. 0 when clients connect directly
+# (a forwarded header could then be forged)
+TRUSTED_PROXY_COUNT = 1
+
+# Cold-start budget enforced by `python -m patlytics.startup_profile`: import
+# time of the app and peak RSS once it is imported
+STARTUP_IMPORT_BUDGET_MS = 1500
+STARTUP_MEMORY_BUDGET_MB = 250
+
+# Async (ASGI) serving mode: threads for the blocking work still left in a
+# request (MySQL, file-backed lookups, prompt building) and the connection
+# pool of the non-blocking OpenSearch client
+ASYNC_BLOCKING_WORKERS = 32
+OS_ASYNC_POOL_SIZE = 100
+
+# Circuit breaker around OpenSearch company lookups: per-request timeout
+# (seconds), consecutive failures that open it, and how long it stays open
+# before a trial request is let through (seconds)
+OS_COMPANY_LOOKUP_TIMEOUT = 0.5
+OS_BREAKER_FAILURE_THRESHOLD = 5
+OS_BREAKER_RESET_TIMEOUT = 30
+
+# OpenSearch reads: company matches returned by a fuzzy lookup (the best one
+# plus alternatives) and ids fetched per mget round trip
+OS_COMPANY_MATCHES = 3
+OS_MGET_BATCH_SIZE = 500
+
+# Bulk ingestion (python -m patlytics.utils.bulk_ingest): processes normalizing
+# records (0 normalizes inline), records per batch they get, concurrent bulk
+# requests, documents and bytes per request (bytes shrink down to the minimum
+# while the cluster answers 429), and retries of rejected documents
+INGEST_PROCESSES = 4
+INGEST_NORMALIZE_BATCH = 500
+INGEST_BULK_THREADS = 4
+INGEST_CHUNK_DOCS = 5000
+INGEST_CHUNK_BYTES = 10 * 1024 * 1024
+INGEST_MIN_CHUNK_BYTES = 1024 * 1024
+INGEST_MAX_RETRIES = 8
+
+# Blue/green reindex (python -m patlytics.utils.reindex): how long a new index
+# may take to reach the wanted health before its alias is swapped
+REINDEX_HEALTH_TIMEOUT = "5m"
+
+# Delta indexing (python -m patlytics.utils.delta_index): where the manifests of
+# content hashes of indexed documents are kept, one file per index
+DELTA_MANIFEST_DIR = "./data"
+
+# OpenSearch mapping set the reindex builds indices with (see
+# patlytics/opensearch_settings)
+OS_MAPPING_VERSION = "v1"
+
+# Company lookups query the `name.suggest` completion field of v2 indices
+# instead of running a fuzzy search. Turn on only once a v2 reindex has moved
+# the alias; until then a lookup errors and falls back to the fuzzy search
+OS_COMPANY_SUGGESTER = False
+
+# Product pre-screening: only the products most similar to the patent (TF-IDF
+# cosine, 0-1) are sent to the LLM, at most this many and none below the score
+PRODUCT_SCREENING_TOP_K = 5
+PRODUCT_SCREENING_MIN_SCORE = 0.01
+
+# Batch infringement matrix: concurrent LLM analyses per request and the
+# largest patents x companies matrix accepted
+BATCH_CONCURRENCY = 8
+BATCH_MAX_PAIRS = 1000
+
+# Claims sent to the LLM: every independent claim plus at most this many of
+# the dependent claims most relevant to the products, within a token budget
+CLAIM_SELECTION_TOP_K = 5
+CLAIM_SELECTION_TOKEN_BUDGET = 3000
+
+# "Patents similar to this product" search: default/maximum results and the
+# dense (truncated SVD) dimensions, 0 to score sparse TF-IDF vectors only
+SIMILARITY_TOP_K = 10
+SIMILARITY_MAX_TOP_K = 100
+SIMILARITY_SVD_COMPONENTS = 0
+
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 SQLALCHEMY_CHARSET_SYNTAX = "charset=utf8mb4"
-SQLALCHEMY_DATABASE_URI = (
-    f"mysql+pymysql://{DB_USER}:{DB_PWD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?"
-    f"{SQLALCHEMY_CHARSET_SYNTAX}"
-)
-SECRET_KEY = get_ssm_parameter('/patlytics/secret_key')
-
-# for test
-TEST_DB_NAME = get_ssm_parameter('/patlytics/db/test_name')
-TEST_SQLALCHEMY_DATABASE_URI = (
-    f"mysql+pymysql://{DB_USER}:{DB_PWD}@{DB_HOST}:{DB_PORT}/{TEST_DB_NAME}?"
-    f"{SQLALCHEMY_CHARSET_SYNTAX}"
-)
+
+# Settings stored in SSM Parameter Store. They are resolved on first access
+# (see config.parameters), so importing config costs no network round trip
+_parameter_names = {
+    'OS_HOST': '/patlytics/os/host',
+    'OS_USER': '/patlytics/os/user',
+    'OS_PASSWORD': '/patlytics/os/password',
+    'OPENAI_API_KEY': '/patlytics/openai/api_key',
+    'GEMINI_API_KEY': '/patlytics/gemini/api_key',
+    'DB_USER': '/patlytics/db/user',
+    'DB_PWD': '/patlytics/db/password',
+    'DB_HOST': '/patlytics/db/host',
+    'DB_PORT': '/patlytics/db/port',
+    'DB_NAME': '/patlytics/db/name',
+    'SECRET_KEY': '/patlytics/secret_key',
+    # for test
+    'TEST_DB_NAME': '/patlytics/db/test_name',
+}
+
+
+def _resolve(name: str) -> str:
+    # Module-level code sees globals only, not the lazy __getattr__
+    return globals()[name] if name in globals() else __getattr__(name)
+
+
+def _database_uri(db_name_setting: str) -> str:
+    return (
+        f"mysql+pymysql://{_resolve('DB_USER')}:{_resolve('DB_PWD')}@"
+        f"{_resolve('DB_HOST')}:{_resolve('DB_PORT')}/{_resolve(db_name_setting)}?"
+        f"{SQLALCHEMY_CHARSET_SYNTAX}"
+    )
+
+
+_derived = {
+    'SQLALCHEMY_DATABASE_URI': lambda: _database_uri('DB_NAME'),
+    'TEST_SQLALCHEMY_DATABASE_URI': lambda: _database_uri('TEST_DB_NAME'),
+}
+
+
+def __getattr__(name: str):
+    if name in _parameter_names:
+        value = default_parameters.get(_parameter_names[name])
+    elif name in _derived:
+        value = _derived[name]()
+    else:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+    globals()[name] = value
+    return value
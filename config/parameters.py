@@ -0,0 +1,204 @@
+"""
+Secrets and endpoints the app reads from AWS SSM Parameter Store.
+
+Parameters are fetched lazily, on the first access to any of them, with one
+batched `get_parameters_by_path` call over PARAMETER_PATH instead of one
+`get_parameter` round trip per key. The result can be kept in an encrypted
+file for a TTL, so restarts and CLI commands skip SSM entirely.
+
+Environment variables (read once, at import):
+
+    PATLYTICS_CONFIG_SOURCE     ssm (default), env or file
+    PATLYTICS_CONFIG_FILE       JSON object of parameter name -> value, for
+                                the file source (default ./config/local.json)
+    PATLYTICS_CONFIG_CACHE      Path of the encrypted on-disk cache; unset
+                                disables it
+    PATLYTICS_CONFIG_CACHE_KEY  Fernet key of the cache
+    PATLYTICS_CONFIG_CACHE_TTL  Seconds a cached copy is used (default 3600)
+
+With the env source, `/patlytics/db/user` is read from `PATLYTICS_DB_USER`.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+PARAMETER_PATH = '/patlytics/'
+SSM_REGION = 'ap-northeast-1'
+DEFAULT_CACHE_TTL = 60 * 60
+
+
+class SSMSource:
+    """All parameters under a path, with one paginated batch call."""
+
+    cacheable = True
+
+    def __init__(self, path: str = PARAMETER_PATH, region: str = SSM_REGION, client=None):
+        self.path = path
+        self.region = region
+        self.client = client
+
+    def load(self) -> dict[str, str]:
+        client = self.client
+        if client is None:
+            import boto3
+            client = boto3.client('ssm', region_name=self.region)
+
+        parameters = {}
+        paginator = client.get_paginator('get_parameters_by_path')
+        for page in paginator.paginate(Path=self.path, Recursive=True, WithDecryption=True):
+            for parameter in page['Parameters']:
+                parameters[parameter['Name']] = parameter['Value']
+        return parameters
+
+    def __str__(self) -> str:
+        return f"SSM path '{self.path}'"
+
+
+class _EnvParameters(dict):
+    def __init__(self, environ):
+        super().__init__()
+        self.environ = environ
+
+    def __missing__(self, name: str) -> str:
+        return self.environ[EnvSource.variable(name)]
+
+
+class EnvSource:
+    """Parameters from environment variables, for offline runs."""
+
+    cacheable = False
+
+    def __init__(self, environ=None):
+        self.environ = os.environ if environ is None else environ
+
+    @staticmethod
+    def variable(name: str) -> str:
+        return name.strip('/').replace('/', '_').upper()
+
+    def load(self) -> dict[str, str]:
+        return _EnvParameters(self.environ)
+
+    def __str__(self) -> str:
+        return "environment"
+
+
+class FileSource:
+    """Parameters from a JSON object of name -> value, for offline runs."""
+
+    cacheable = False
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def load(self) -> dict[str, str]:
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            return {name: str(value) for name, value in json.load(f).items()}
+
+    def __str__(self) -> str:
+        return f"file '{self.file_path}'"
+
+
+class ParameterStore:
+    """
+    Lazily loaded, process-wide view of a parameter source, optionally
+    backed by a Fernet-encrypted cache file.
+    """
+
+    def __init__(self, source, cache_path: Optional[str] = None,
+                 cache_key: Optional[str] = None, cache_ttl: int = DEFAULT_CACHE_TTL):
+        self.source = source
+        self.cache_path = cache_path
+        self.cache_key = cache_key
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        self._parameters = None
+
+    def get(self, name: str) -> str:
+        """
+        Get a parameter by its full name, e.g. '/patlytics/db/user'.
+
+        Raises:
+            KeyError: If the source has no such parameter
+        """
+        parameters = self._parameters
+        if parameters is None:
+            with self._lock:
+                if self._parameters is None:
+                    self._parameters = self._load()
+                parameters = self._parameters
+        try:
+            return parameters[name]
+        except KeyError:
+            raise KeyError(f"Parameter '{name}' not found in {self.source}") from None
+
+    def _load(self) -> dict[str, str]:
+        parameters = self._read_cache()
+        if parameters is None:
+            parameters = self.source.load()
+            self._write_cache(parameters)
+        return parameters
+
+    def _fernet(self):
+        if not self.source.cacheable or not self.cache_path or not self.cache_key:
+            return None
+        from cryptography.fernet import Fernet
+        return Fernet(self.cache_key)
+
+    def _read_cache(self) -> Optional[dict[str, str]]:
+        fernet = self._fernet()
+        if fernet is None or not os.path.exists(self.cache_path):
+            return None
+        if time.time() - os.path.getmtime(self.cache_path) > self.cache_ttl:
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                return json.loads(fernet.decrypt(f.read()))
+        except Exception as e:
+            print(f"Ignoring unreadable config cache '{self.cache_path}': {e}")
+            return None
+
+    def _write_cache(self, parameters: dict[str, str]) -> None:
+        fernet = self._fernet()
+        if fernet is None:
+            return
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(fernet.encrypt(json.dumps(parameters).encode('utf-8')))
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write config cache '{self.cache_path}': {e}")
+
+    def invalidate(self) -> None:
+        """Drop the loaded parameters and the cache file."""
+        with self._lock:
+            self._parameters = None
+            if self.cache_path and os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+
+
+def store_from_environment(environ=None) -> ParameterStore:
+    environ = os.environ if environ is None else environ
+    source_name = environ.get('PATLYTICS_CONFIG_SOURCE', 'ssm')
+    if source_name == 'env':
+        source = EnvSource(environ)
+    elif source_name == 'file':
+        source = FileSource(environ.get('PATLYTICS_CONFIG_FILE', './config/local.json'))
+    elif source_name == 'ssm':
+        source = SSMSource()
+    else:
+        raise ValueError(f"Unknown PATLYTICS_CONFIG_SOURCE '{source_name}'")
+
+    return ParameterStore(
+        source,
+        cache_path=environ.get('PATLYTICS_CONFIG_CACHE'),
+        cache_key=environ.get('PATLYTICS_CONFIG_CACHE_KEY'),
+        cache_ttl=int(environ.get('PATLYTICS_CONFIG_CACHE_TTL', DEFAULT_CACHE_TTL))
+    )
+
+
+# Create a default instance
+default_parameters = store_from_environment()
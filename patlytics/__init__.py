@@ -1,6 +1,7 @@
 import pymysql
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 import config
 from patlytics.database import db, migrate
 
@@ -10,7 +11,11 @@ pymysql.install_as_MySQLdb()
 
 def create_app(testing=False):
     app = Flask(__name__)
+    # from_object copies the plain settings; the SSM-backed ones are
+    # resolved lazily, so only those Flask itself needs are set here
     app.config.from_object(config)
+    app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
+    app.config['SECRET_KEY'] = config.SECRET_KEY
 
     if testing:
         app.config['SQLALCHEMY_DATABASE_URI'] = (
@@ -18,6 +23,10 @@ def create_app(testing=False):
             f"{config.DB_HOST}:{config.DB_PORT}/{config.TEST_DB_NAME}?"
             f"{config.SQLALCHEMY_CHARSET_SYNTAX}"
         )
+    if config.TRUSTED_PROXY_COUNT:
+        # request.remote_addr and url_for then see the client, not the proxy
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=config.TRUSTED_PROXY_COUNT, x_proto=config.TRUSTED_PROXY_COUNT)
     CORS(app)
     db.init_app(app)
     migrate.init_app(app, db)
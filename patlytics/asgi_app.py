@@ -0,0 +1,263 @@
+"""
+Async (ASGI) serving mode of the API.
+
+The infringement check and the company lookup run as coroutines on the
+event loop (see `AsyncPatentService`); every other request, and
+/infringements in async-job mode, is handed to the Flask app, which asgiref
+runs on its thread pool. Responses match the Flask routes.
+
+Usage:
+    uvicorn asgi:app --host 0.0.0.0 --port 5001
+"""
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from werkzeug.http import parse_etags, quote_etag
+
+from config import TRUSTED_PROXY_COUNT
+
+from patlytics.routes.patent_bp import (
+    MATCHED_COMPANY_FIELDS,
+    MAX_COMPANY_PAGE_SIZE,
+    _optional_non_negative_int
+)
+from patlytics.services.async_patent_service import AsyncPatentService
+from patlytics.services.container import ServiceContainer, default_container
+from patlytics.services.rate_governor import default_user_quota
+from patlytics.utils import metrics
+
+
+class AsyncPatlyticsApp:
+    def __init__(self, flask_app, container: ServiceContainer = default_container):
+        self.flask_app = flask_app
+        self.container = container
+        self.wsgi = WsgiToAsgi(flask_app)
+        self._service = None
+        self._in_flight = 0
+        self.routes = {
+            ('POST', '/api/patent/infringements'): self.check_infringement,
+            ('GET', '/api/patent/fuzzy_find_company'): self.fuzzy_find_company,
+        }
+
+    @property
+    def service(self) -> AsyncPatentService:
+        if self._service is None:
+            self._service = AsyncPatentService(self.flask_app, self.container.patent_service)
+        return self._service
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        route = None
+        if scope['type'] == 'http':
+            route = self.routes.get((scope['method'], scope['path']))
+        if route is None:
+            return await self.wsgi(scope, receive, send)
+
+        self._in_flight += 1
+        metrics.set_gauge('asgi.in_flight', self._in_flight)
+        try:
+            await route(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+            metrics.set_gauge('asgi.in_flight', self._in_flight)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self.warm_up()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._service is not None:
+                    await self._service.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def warm_up(self) -> dict:
+        """
+        Run the container's warm-up off the event loop, then open the
+        non-blocking OpenSearch client's connection.
+        """
+        steps = await asyncio.to_thread(self.container.warm_up)
+
+        start = time.perf_counter()
+        error = None
+        try:
+            await self.service.warm_up()
+        except Exception as e:
+            error = str(e)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.set_gauge('startup.warm_up.opensearch_async_ms', elapsed_ms)
+        steps['opensearch_async'] = {"ms": round(elapsed_ms, 1), "error": error}
+
+        for step, result in steps.items():
+            status = f"failed: {result['error']}" if result['error'] else "ok"
+            print(f"Warm-up {step}: {result['ms']} ms, {status}")
+        return steps
+
+    async def check_infringement(self, scope, receive, send):
+        body = await _read_body(receive)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return await self._send_json(scope, send, {
+                'error': 'Invalid JSON body'
+            }, 400)
+
+        if data.get('async') or _query_arg(scope, 'mode') == 'async':
+            # Background jobs belong to the Flask app's job manager
+            return await self.wsgi(scope, _replay_body(body, receive), send)
+
+        patent_id = data.get('patent_id')
+        input_company_name = data.get('company_name')
+        if not patent_id or not input_company_name:
+            return await self._send_json(scope, send, {
+                'error': 'Missing required parameters'
+            }, 400)
+
+        # Same per-user quota as the Flask route: the uid, else the client address
+        user = data.get('uid') or _client_address(scope)
+        with default_user_quota.slot(user) as acquired:
+            if not acquired:
+                return await self._send_json(scope, send, {
+                    'error': 'Too many analyses in progress for this user, retry later'
+                }, 429, [(b'retry-after', b'5')])
+            result, status = await self.analyze_infringement(
+                patent_id, input_company_name, data.get('uid'), bool(data.get('fan_out')))
+        await self._send_json(scope, send, result, status)
+
+    async def analyze_infringement(self, patent_id, input_company_name, uid, fan_out=False):
+        """Coroutine version of the Flask route's `_analyze_infringement`."""
+        service = self.service
+        patent_result, company_result = await asyncio.gather(
+            service.get_patent_data(patent_id),
+            service.get_company_data_fuzzy(input_company_name, fields=MATCHED_COMPANY_FIELDS))
+
+        if not company_result['success']:
+            return company_result, 404
+
+        matched_company_name = company_result['data']['name']
+
+        infringement_result = await service.check_infringement(
+            patent_id, matched_company_name, fan_out=fan_out, patent_result=patent_result)
+
+        result = {
+            'input_company': input_company_name,
+            'matched_company': matched_company_name,
+            **infringement_result
+        }
+
+        if uid and not infringement_result.get('error'):
+            await service.save_analysis(
+                uid, patent_id, matched_company_name, input_company_name, result,
+                cache_key=infringement_result.get('cache_key'))
+
+        return result, 200
+
+    async def fuzzy_find_company(self, scope, receive, send):
+        try:
+            limit = _optional_non_negative_int(_query_arg(scope, 'limit'))
+            offset = _optional_non_negative_int(_query_arg(scope, 'cursor')) or 0
+        except ValueError:
+            return await self._send_json(scope, send, {
+                'error': 'Invalid limit or cursor'
+            }, 400)
+        if limit is not None:
+            limit = min(limit, MAX_COMPANY_PAGE_SIZE)
+
+        # Stats the catalog, loads and indexes it on first use, then searches
+        result = await self.service.run_blocking(
+            self.service.patent_service.forward_company_name,
+            _query_arg(scope, 'q') or '', limit, offset)
+
+        headers = [
+            (b'etag', quote_etag(result['version']).encode('latin-1')),
+            (b'cache-control', b'no-cache')
+        ]
+        if parse_etags(_header(scope, b'if-none-match')).contains_weak(result['version']):
+            await send({'type': 'http.response.start', 'status': 304,
+                        'headers': self._cors_headers(scope) + headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        await self._send_json(scope, send, result, 200, headers)
+
+    async def _send_json(self, scope, send, payload: dict, status: int, headers: list | None = None):
+        # The Flask app's JSON provider, so bodies match jsonify's
+        body = self.flask_app.json.dumps(payload).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                *self._cors_headers(scope),
+                *(headers or [])
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def _cors_headers(scope) -> list:
+        # What flask-cors adds with its defaults; preflights go to Flask
+        if _header(scope, b'origin') is None:
+            return []
+        return [(b'access-control-allow-origin', b'*')]
+
+
+def _header(scope, name: bytes) -> str | None:
+    for key, value in scope.get('headers', []):
+        if key.lower() == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _client_address(scope, trusted_proxies: int = TRUSTED_PROXY_COUNT) -> str | None:
+    """
+    The client address, read from X-Forwarded-For behind `trusted_proxies`
+    proxies the way the Flask app's ProxyFix reads it.
+    """
+    if trusted_proxies:
+        forwarded = [address.strip()
+                     for address in (_header(scope, b'x-forwarded-for') or '').split(',')]
+        if len(forwarded) >= trusted_proxies and forwarded[-trusted_proxies]:
+            return forwarded[-trusted_proxies]
+    return (scope.get('client') or [None])[0]
+
+
+def _query_arg(scope, name: str) -> str | None:
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1'),
+                      keep_blank_values=True).get(name)
+    return values[0] if values else None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+def _replay_body(body: bytes, receive):
+    """`receive` for handing an already read request on to another app."""
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return await receive()
+
+    return replay
@@ -94,6 +94,7 @@ class Report(TimestampMixin, db.Model):
     )
     input_company = db.Column(db.String(200), nullable=False)
     analysis_results = db.Column(db.JSON, nullable=False)
+    cache_key = db.Column(db.String(64), index=True)
 
     user = db.relationship(
         'User',
@@ -0,0 +1,36 @@
+# v2 of company_products_v1: names are analyzed once (standard) instead of
+# edge-ngrams plus pinyin (plugin), with a completion sub-field for the
+# company lookup and typeahead
+INDEX_SETTINGS = {
+    "settings": {
+        "index": {
+            "number_of_shards": 1,
+            "number_of_replicas": 0
+        }
+    },
+    "mappings": {
+        "properties": {
+            "name": {
+                "type": "text",
+                "analyzer": "standard",
+                "fields": {
+                    "keyword": {"type": "keyword"},
+                    "suggest": {"type": "completion", "analyzer": "simple"}
+                }
+            },
+            "products": {
+                "type": "nested",
+                "properties": {
+                    "name": {
+                        "type": "text",
+                        "analyzer": "standard",
+                        "fields": {
+                            "keyword": {"type": "keyword"}
+                        }
+                    },
+                    "description": {"type": "text", "analyzer": "standard", "index_options": "freqs"}
+                }
+            }
+        }
+    }
+}
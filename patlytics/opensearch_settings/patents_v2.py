@@ -0,0 +1,90 @@
+# v2 of patents_v1: no 1-20 ngram or pinyin (plugin) analysis of titles, a
+# completion sub-field for title typeahead instead, term frequencies only (no
+# positions) on the large text fields, and URLs stored but not indexed
+INDEX_SETTINGS = {
+    "settings": {
+        "index": {
+            "number_of_shards": 1,
+            "number_of_replicas": 0
+        }
+    },
+    "mappings": {
+        "properties": {
+            "id": {"type": "integer"},
+            "publication_number": {"type": "keyword"},
+            "title": {
+                "type": "text",
+                "analyzer": "standard",
+                "fields": {
+                    "keyword": {"type": "keyword", "ignore_above": 512},
+                    "suggest": {"type": "completion", "analyzer": "simple", "max_input_length": 100}
+                }
+            },
+            "ai_summary": {"type": "text", "analyzer": "standard"},
+            "raw_source_url": {"type": "keyword", "index": False, "doc_values": False},
+            "assignee": {"type": "text", "analyzer": "standard"},
+            "inventors": {
+                "type": "nested",
+                "properties": {
+                    "first_name": {"type": "text", "analyzer": "standard"},
+                    "last_name": {"type": "text", "analyzer": "standard"}
+                }
+            },
+            "priority_date": {"type": "date", "format": "yyyy-MM-dd"},
+            "application_date": {"type": "date", "format": "yyyy-MM-dd"},
+            "grant_date": {"type": "date", "format": "yyyy-MM-dd"},
+            "abstract": {"type": "text", "analyzer": "standard"},
+            "description": {"type": "text", "analyzer": "standard", "index_options": "freqs"},
+            "claims": {
+                "type": "nested",
+                "properties": {
+                    "num": {"type": "keyword"},
+                    "text": {"type": "text", "analyzer": "standard", "index_options": "freqs"}
+                }
+            },
+            "jurisdictions": {"type": "keyword"},
+            "classifications": {
+                "properties": {
+                    "ipcr": {
+                        "type": "nested",
+                        "properties": {
+                            "code": {"type": "keyword"},
+                            "date": {"type": "date", "format": "yyyyMMdd"},
+                            "extra_info": {"type": "text", "index_options": "freqs"}
+                        }
+                    },
+                    "cpc": {
+                        "type": "nested",
+                        "properties": {
+                            "code": {"type": "keyword"},
+                            "date": {"type": "date", "format": "yyyyMMdd"},
+                            "extra_info": {"type": "text", "index_options": "freqs"}
+                        }
+                    }
+                }
+            },
+            "application_events": {"type": "text", "analyzer": "standard", "index_options": "freqs"},
+            "citations": {
+                "type": "nested",
+                "properties": {
+                    "root": {"type": "keyword"},
+                    "ucids": {
+                        "type": "object",
+                        "properties": {
+                            "published": {"type": "date", "format": "yyyyMMdd"},
+                            "assignee": {"type": "text", "index_options": "freqs"},
+                            "applicant": {"type": "text", "index_options": "freqs"},
+                            "inventor": {"type": "text", "index_options": "freqs"},
+                            "cpc": {"type": "keyword"}
+                        }
+                    }
+                }
+            },
+            "image_urls": {"type": "keyword", "index": False, "doc_values": False},
+            "landscapes": {"type": "text", "analyzer": "standard", "index_options": "freqs"},
+            "citations_non_patent": {"type": "text", "analyzer": "standard", "index_options": "freqs"},
+            "provenance": {"type": "keyword"},
+            "attachment_urls": {"type": "keyword", "index": False, "doc_values": False}
+        }
+    }
+}
@@ -1,14 +1,76 @@
-from flask import Blueprint, request, jsonify
-from patlytics.services.patent_service import PatentService
+import json
+
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
+from config import BATCH_MAX_PAIRS, SIMILARITY_TOP_K, SIMILARITY_MAX_TOP_K
+from patlytics.services.job_service import default_job_manager
+from patlytics.services.container import default_container
+from patlytics.services.rate_governor import default_user_quota
+from patlytics.utils import metrics
 patent_bp = Blueprint('patent', __name__)
 
 
+MAX_COMPANY_PAGE_SIZE = 100
+
+# The infringement routes only need the matched company's name (its products
+# come from the catalog), so its product list is not fetched from OpenSearch
+MATCHED_COMPANY_FIELDS = ['name']
+
+
 @patent_bp.route('/fuzzy_find_company', methods=['GET'])
 def fuzzy_find_company():
-    service = PatentService()
-    result = service.forward_company_name()
+    query = request.args.get('q', '')
+    try:
+        limit = _optional_non_negative_int(request.args.get('limit'))
+        offset = _optional_non_negative_int(request.args.get('cursor')) or 0
+    except ValueError:
+        return jsonify({
+            'error': 'Invalid limit or cursor'
+        }), 400
+    if limit is not None:
+        limit = min(limit, MAX_COMPANY_PAGE_SIZE)
+
+    service = default_container.patent_service
+    result = service.forward_company_name(query, limit, offset)
+
+    # The catalog version is hashed once per load, so unchanged pages
+    # revalidate with a 304 instead of re-downloading the list
+    response = jsonify(result)
+    response.set_etag(result['version'])
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def _optional_non_negative_int(value: str | None) -> int | None:
+    if value is None or value == '':
+        return None
+    number = int(value)
+    if number < 0:
+        raise ValueError(value)
+    return number
+
+
+@patent_bp.route('/similar_patents', methods=['POST'])
+def find_similar_patents():
+    data = request.get_json()
+    description = data.get('description')
+    if not description:
+        return jsonify({
+            'error': 'Missing required parameters'
+        }), 400
+
+    try:
+        top_k = _optional_non_negative_int(data.get('top_k'))
+    except (TypeError, ValueError):
+        return jsonify({
+            'error': 'Invalid top_k'
+        }), 400
+    if top_k is None:
+        top_k = SIMILARITY_TOP_K
+    top_k = min(top_k, SIMILARITY_MAX_TOP_K)
 
-    return jsonify(result)
+    service = default_container.patent_service
+    result = service.find_similar_patents(description, top_k)
+    return jsonify(result), 200 if result['success'] else 500
 
 
 @patent_bp.route('/infringements', methods=['POST'])
@@ -22,16 +84,230 @@ def check_infringement():
             'error': 'Missing required parameters'
         }), 400
 
-    service = PatentService()
-    company_result = service.get_company_data_fuzzy(input_company_name)
+    user = _quota_user(data.get('uid'))
+    if data.get('async') or request.args.get('mode') == 'async':
+        # The job holds the user's slot from now until it finishes
+        if not default_user_quota.acquire(user):
+            return _too_many_analyses()
+        job_id = default_job_manager.submit(
+            _run_infringement_job, current_app._get_current_object(), user,
+            patent_id, input_company_name, data.get('uid'),
+            bool(data.get('fan_out')))
+        if not job_id:
+            default_user_quota.release(user)
+            response = jsonify({
+                'error': 'Too many pending analyses, retry later'
+            })
+            response.headers['Retry-After'] = '30'
+            return response, 503
+
+        status_url = url_for('.get_infringement_job', job_id=job_id)
+        response = jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': status_url
+        })
+        response.headers['Location'] = status_url
+        return response, 202
+
+    with default_user_quota.slot(user) as acquired:
+        if not acquired:
+            return _too_many_analyses()
+        result, status = _analyze_infringement(
+            patent_id, input_company_name, data.get('uid'),
+            bool(data.get('fan_out')))
+    return jsonify(result), status
+
+
+def _quota_user(uid):
+    """Who an analysis counts against: the user id, else the client address."""
+    return uid if uid else request.remote_addr
+
+
+def _too_many_analyses():
+    response = jsonify({
+        'error': 'Too many analyses in progress for this user, retry later'
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 429
+
+
+@patent_bp.route('/infringements/stream', methods=['POST'])
+def stream_infringement():
+    """
+    Server-Sent Events variant of /infringements: one `analysis` event per
+    product as the LLM finishes it, then `complete` with the overall
+    assessment and the saved report id (or `error`).
+    """
+    data = request.get_json()
+    patent_id = data.get('patent_id')
+    input_company_name = data.get('company_name')
+    uid = data.get('uid')
+
+    if not patent_id or not input_company_name:
+        return jsonify({
+            'error': 'Missing required parameters'
+        }), 400
+
+    user = _quota_user(uid)
+    if not default_user_quota.acquire(user):
+        return _too_many_analyses()
 
+    service = default_container.patent_service
+    company_result = service.get_company_data_fuzzy(
+        input_company_name, fields=MATCHED_COMPANY_FIELDS)
     if not company_result['success']:
+        default_user_quota.release(user)
         return jsonify(company_result), 404
 
     matched_company_name = company_result['data']['name']
 
+    def generate():
+        for event, payload in service.stream_infringement(patent_id, matched_company_name):
+            if event == 'complete':
+                payload = {
+                    'input_company': input_company_name,
+                    'matched_company': matched_company_name,
+                    **payload
+                }
+                report_id = None
+                # A failed analysis is reported, never saved
+                if uid and not payload.get('error'):
+                    report = service.save_analysis(
+                        uid, patent_id, matched_company_name, input_company_name, payload,
+                        cache_key=payload.get('cache_key'))
+                    report_id = report.get('id')
+                payload = {**payload, 'report_id': report_id}
+            yield _sse_event(event, payload)
+
+    response = Response(stream_with_context(generate()),
+                        mimetype='text/event-stream')
+    # The analysis runs while the stream is read, so the slot is held until
+    # the response is closed
+    response.call_on_close(lambda: default_user_quota.release(user))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@patent_bp.route('/infringements/batch', methods=['POST'])
+def check_infringement_batch():
+    """
+    Check lists of patents against lists of companies, streaming a `pair`
+    event per analysis and a final `summary` with the likelihood matrix.
+    With `uid`, all reports are saved together before the summary.
+    """
+    data = request.get_json()
+    patent_ids = data.get('patent_ids')
+    input_company_names = data.get('company_names')
+    uid = data.get('uid')
+
+    if (not isinstance(patent_ids, list) or not isinstance(input_company_names, list)
+            or not patent_ids or not input_company_names):
+        return jsonify({
+            'error': 'Missing required parameters'
+        }), 400
+
+    # bool is an int, but never a patent id
+    if (any(isinstance(p, bool) or not isinstance(p, (str, int)) for p in patent_ids)
+            or any(not isinstance(c, str) or not c.strip() for c in input_company_names)):
+        return jsonify({
+            'error': 'patent_ids must be strings or integers and company_names non-empty strings'
+        }), 400
+
+    if len(set(map(str, patent_ids))) * len(set(input_company_names)) > BATCH_MAX_PAIRS:
+        return jsonify({
+            'error': f'Too many patent/company pairs, at most {BATCH_MAX_PAIRS} per request'
+        }), 400
+
+    user = _quota_user(uid)
+    if not default_user_quota.acquire(user):
+        return _too_many_analyses()
+
+    service = default_container.patent_service
+
+    def generate():
+        reports = []
+        for event, payload in service.check_infringement_matrix(
+                patent_ids, input_company_names, bool(data.get('fan_out'))):
+            if event == 'pair' and not payload['result'].get('error'):
+                for input_company_name in payload['input_companies']:
+                    reports.append({
+                        'patent_id': payload['patent_id'],
+                        'matched_company': payload['matched_company'],
+                        'input_company': input_company_name,
+                        'analysis': {
+                            'input_company': input_company_name,
+                            'matched_company': payload['matched_company'],
+                            **payload['result']
+                        },
+                        'cache_key': payload['result'].get('cache_key')
+                    })
+            elif event == 'summary' and uid and reports:
+                saved = service.save_analyses(uid, reports)
+                payload = {
+                    **payload,
+                    'reports': [
+                        {
+                            'patent_id': report['patent_id'],
+                            'input_company': report['input_company'],
+                            'report_id': report_id
+                        }
+                        for report, report_id in zip(reports, saved['data'])
+                    ] if saved['success'] else [],
+                    'save_error': saved.get('error')
+                }
+            yield _sse_event(event, payload)
+
+    response = Response(stream_with_context(generate()),
+                        mimetype='text/event-stream')
+    response.call_on_close(lambda: default_user_quota.release(user))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@patent_bp.route('/infringements/<job_id>', methods=['GET'])
+def get_infringement_job(job_id):
+    job = default_job_manager.get(job_id)
+    if not job:
+        return jsonify({
+            'error': 'Job not found'
+        }), 404
+
+    return jsonify(job)
+
+
+def _run_infringement_job(app, user, patent_id, input_company_name, uid, fan_out):
+    try:
+        with app.app_context():
+            result, status = _analyze_infringement(
+                patent_id, input_company_name, uid, fan_out)
+    finally:
+        default_user_quota.release(user)
+    # A failed LLM call comes back with an error but a 200
+    if result.get('error') and status < 400:
+        status = 502
+    return result, status
+
+
+def _analyze_infringement(patent_id, input_company_name, uid, fan_out=False):
+    service = default_container.patent_service
+    company_result = service.get_company_data_fuzzy(
+        input_company_name, fields=MATCHED_COMPANY_FIELDS)
+
+    if not company_result['success']:
+        return company_result, 404
+
+    matched_company_name = company_result['data']['name']
+
     infringement_result = service.check_infringement(
-        patent_id, matched_company_name)
+        patent_id, matched_company_name, fan_out=fan_out)
 
     result = {
         'input_company': input_company_name,
@@ -39,10 +315,15 @@ def check_infringement():
         **infringement_result
     }
 
-    # if get uid
-    uid = data.get('uid')
-    if uid:
+    # if get uid, save the report unless the analysis failed
+    if uid and not infringement_result.get('error'):
         service.save_analysis(
-            uid, patent_id, matched_company_name, input_company_name, result)
+            uid, patent_id, matched_company_name, input_company_name, result,
+            cache_key=infringement_result.get('cache_key'))
+
+    return result, 200
+
 
-    return jsonify(result)
+@patent_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify(metrics.snapshot())
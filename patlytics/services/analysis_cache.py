@@ -0,0 +1,121 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from cachetools import TTLCache
+
+from config import (
+    ANALYSIS_CACHE_SIZE,
+    ANALYSIS_CACHE_TTL,
+    ANALYSIS_CACHE_PERSISTENT_TTL
+)
+from patlytics.database import db
+from patlytics.database.models import Report
+from patlytics.utils import metrics
+
+# Keys the route adds on top of the service result before saving a report
+REQUEST_FIELDS = ('input_company', 'matched_company', 'cache_key', 'cached')
+
+
+class _CountingTTLCache(TTLCache):
+    def popitem(self):
+        item = super().popitem()
+        metrics.incr('analysis_cache.evictions')
+        return item
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        if expired:
+            metrics.incr('analysis_cache.expirations', len(expired))
+        return expired
+
+
+class AnalysisCache:
+    """
+    Two-tier, content-addressed cache of infringement analyses.
+
+    Keys hash everything that determines the LLM answer, so a change in the
+    patent claims, the company's products, the model, its generation config
+    or the prompt template version simply produces a different key. The
+    in-process tier is an LRU with TTL; behind it, reports saved with a
+    `cache_key` act as the persistent tier shared by every worker.
+    """
+
+    def __init__(self, maxsize: int = ANALYSIS_CACHE_SIZE, ttl: int = ANALYSIS_CACHE_TTL,
+                 persistent_ttl: int = ANALYSIS_CACHE_PERSISTENT_TTL):
+        self._memory = _CountingTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.persistent_ttl = persistent_ttl
+
+    @staticmethod
+    def make_key(patent_data: dict, company_data: dict, company_name: str,
+                 model_name: str, generation_config: dict, prompt_version: int,
+                 fan_out: bool = False, screening: dict | None = None) -> str:
+        payload = json.dumps({
+            "patent_title": patent_data['title'],
+            "claims": patent_data['claims'],
+            "company_name": company_name,
+            "products": company_data['products'],
+            "model_name": model_name,
+            "generation_config": generation_config,
+            "prompt_version": prompt_version,
+            "fan_out": fan_out,
+            "screening": screening
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Get a cached analysis, checking memory first and then saved reports.
+        """
+        with self._lock:
+            result = self._memory.get(key)
+        if result is not None:
+            metrics.incr('analysis_cache.memory_hits')
+            return result
+
+        result = self._get_persistent(key)
+        if result is not None:
+            metrics.incr('analysis_cache.persistent_hits')
+            with self._lock:
+                self._memory[key] = result
+            return result
+
+        metrics.incr('analysis_cache.misses')
+        return None
+
+    def set(self, key: str, result: dict) -> None:
+        """
+        Cache an analysis in memory; it reaches the persistent tier when the
+        report is saved with this key.
+        """
+        with self._lock:
+            self._memory[key] = result
+
+    def _get_persistent(self, key: str) -> Optional[dict]:
+        try:
+            report = Report.query.filter(
+                Report.cache_key == key,
+                Report.ctime >= datetime.utcnow() - timedelta(seconds=self.persistent_ttl)
+            ).order_by(Report.id.desc()).first()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error reading analysis cache for {key}: {e}")
+            return None
+
+        if not report:
+            return None
+        return {
+            k: v for k, v in report.analysis_results.items()
+            if k not in REQUEST_FIELDS
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+# Create a default instance
+default_analysis_cache = AnalysisCache()
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import ASYNC_BLOCKING_WORKERS, LLM_FANOUT_CONCURRENCY
+from patlytics.services.patent_service import PatentService
+from patlytics.utils import metrics
+from patlytics.utils.claim_selection import estimate_tokens
+
+
+class AsyncPatentService:
+    """
+    Coroutine front of `PatentService` for the ASGI app.
+
+    OpenSearch and the LLMs are awaited on non-blocking clients, the patent
+    and the company are looked up concurrently, and the work that is still
+    blocking (MySQL reads and writes, the file-backed patent store and
+    company catalog, product screening and prompt building) runs on a
+    bounded thread pool. One event loop can then hold hundreds of
+    in-flight LLM analyses instead of one per thread. Results have the same
+    shape as `PatentService`'s.
+    """
+
+    def __init__(self, app, patent_service: PatentService, opensearch_client=None,
+                 max_workers: int = ASYNC_BLOCKING_WORKERS):
+        self.app = app
+        self.patent_service = patent_service
+        self._opensearch_client = opensearch_client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='patlytics-async')
+
+    @property
+    def opensearch_client(self):
+        # Built inside the serving event loop, which its session binds to
+        if self._opensearch_client is None:
+            from config import OS_HOST, OS_USER, OS_PASSWORD
+            from patlytics.utils.opensearch import AsyncOpenSearchClient
+            self._opensearch_client = AsyncOpenSearchClient(OS_HOST, OS_USER, OS_PASSWORD)
+        return self._opensearch_client
+
+    async def warm_up(self) -> bool:
+        return await self.opensearch_client.warm_up()
+
+    async def close(self) -> None:
+        if self._opensearch_client is not None:
+            await self._opensearch_client.close()
+        self._executor.shutdown(wait=False)
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking call on the service's thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def run_in_app_context(self, func, *args):
+        """
+        Run a blocking database call on the thread pool, in an app context
+        of its own so concurrent calls never share a SQLAlchemy session.
+        """
+        def run():
+            with self.app.app_context():
+                return func(*args)
+
+        return await self.run_blocking(run)
+
+    async def get_patent_data(self, patent_id: str) -> dict:
+        return await self.run_blocking(self.patent_service.get_patent_data, patent_id)
+
+    async def get_company_data_fuzzy(self, company_name: str,
+                                     fields: list[str] | None = None) -> dict:
+        """See `PatentService.get_company_data_fuzzy`."""
+        try:
+            matches = await self.opensearch_client.fuzzy_search_company(
+                company_name, fields=fields)
+
+            if matches:
+                return PatentService.fuzzy_company_result(matches)
+
+            # Fallback to the catalog: a fuzzy match, and a file load on first use
+            metrics.incr('company_lookup.fallbacks')
+            return await self.run_blocking(self.patent_service.get_company_data, company_name)
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to get company data: {str(e)}",
+                "company_name": company_name
+            }
+
+    async def check_infringement(self, patent_id: str, company_name: str, use_cache: bool = True,
+                                 fan_out: bool = False, patent_result: dict | None = None) -> dict:
+        """
+        See `PatentService.check_infringement`. Pass `patent_result` when the
+        patent was already loaded, e.g. concurrently with the company lookup.
+        """
+        service = self.patent_service
+        if patent_result is None:
+            patent_result = await self.get_patent_data(patent_id)
+        if not patent_result['success']:
+            return patent_result
+
+        company_result = await self.run_blocking(service.get_company_data, company_name)
+        if not company_result['success']:
+            return company_result
+
+        prepared = await self.run_blocking(
+            service.prepare_pair, patent_result['data'], company_result['data'],
+            company_name, fan_out)
+        patent_data = prepared['patent_data']
+        company_data = prepared['company_data']
+        cache_key = prepared['cache_key']
+
+        if use_cache:
+            cached = await self.run_in_app_context(service.analysis_cache.get, cache_key)
+            if cached is not None:
+                return {**cached, "cache_key": cache_key, "cached": True}
+
+        try:
+            if fan_out:
+                analysis_result = await self.analyze_products_fan_out(
+                    patent_data, company_data, company_name)
+            else:
+                prompt = await self.run_blocking(
+                    service.format_analysis_prompt, patent_data, company_data, company_name)
+                analysis_result = await self.analyze_prompt(prompt)
+
+            # Caches the result, in MySQL too when the cache is persistent
+            return await self.run_in_app_context(
+                service.finish_analysis, patent_id, patent_data, company_name,
+                analysis_result, cache_key, prepared['skipped_products'])
+
+        except Exception as e:
+            return {
+                "error": f"Analysis failed: {str(e)}",
+                "patent_id": patent_id,
+                "company_name": company_name
+            }
+
+    async def analyze_prompt(self, prompt: str) -> dict:
+        """See `PatentService.analyze_prompt`."""
+        llm_service = self.patent_service.llm_service
+        metrics.observe('prompt.tokens', estimate_tokens(prompt))
+        start = time.perf_counter()
+        try:
+            if hasattr(llm_service, 'analyze_patent_async'):
+                return await llm_service.analyze_patent_async(prompt)
+            return await self.run_blocking(llm_service.analyze_patent, prompt)
+        finally:
+            metrics.observe(
+                'llm.analyze_patent_ms', (time.perf_counter() - start) * 1000)
+
+    async def analyze_products_fan_out(self, patent_data: dict, company_data: dict, company_name: str,
+                                       max_concurrency: int = LLM_FANOUT_CONCURRENCY) -> dict:
+        """
+        See `PatentService.analyze_products_fan_out`; calls still pending
+        once the top-2 ranking is settled are cancelled.
+        """
+        service = self.patent_service
+        products = company_data['products']
+        if not products:
+            return {"analyses": [], "overall_risk_assessment": ""}
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def analyze(i, product):
+            prompt = await self.run_blocking(
+                service.format_analysis_prompt,
+                patent_data, {**company_data, "products": [product]}, company_name)
+            async with semaphore:
+                return i, await self.analyze_prompt(prompt)
+
+        tasks = [asyncio.ensure_future(analyze(i, product))
+                 for i, product in enumerate(products)]
+        results = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                i, result = await next_done
+                results[i] = result
+                if service.top_products_settled(results, len(products)):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return service.merge_fan_out(products, results)
+
+    async def save_analysis(self, uid: int, patent_id: int, matched_company_name: str,
+                            input_company: str, analysis: dict, cache_key: str | None = None) -> dict:
+        return await self.run_in_app_context(
+            self.patent_service.save_analysis, uid, patent_id, matched_company_name,
+            input_company, analysis, cache_key)
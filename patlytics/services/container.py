@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from patlytics.services.analysis_cache import default_analysis_cache
+from patlytics.services.llm_router import get_default_llm_router
+from patlytics.services.patent_service import PatentService
+from patlytics.utils import metrics
+from patlytics.utils.company_catalog import default_company_catalog
+from patlytics.utils.patent_similarity import default_similarity_index
+from patlytics.utils.patent_store import default_patent_store
+
+
+class ServiceContainer:
+    """
+    Worker-scoped services: the OpenSearch client, the LLM router and its
+    clients, the data indexes and the `PatentService` built on them are
+    created once and shared by every request of this process.
+
+    `warm_up` builds all of them and opens their connections up front, so
+    the first request after a deploy does not pay for it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._patent_service = None
+
+    @property
+    def opensearch_client(self):
+        from patlytics.utils.opensearch import get_default_client
+        return get_default_client()
+
+    @property
+    def llm_service(self):
+        return get_default_llm_router()
+
+    @property
+    def patent_service(self) -> PatentService:
+        if self._patent_service is None:
+            with self._lock:
+                if self._patent_service is None:
+                    self._patent_service = PatentService(
+                        opensearch_client=self.opensearch_client,
+                        patent_store=default_patent_store,
+                        similarity_index=default_similarity_index,
+                        company_catalog=default_company_catalog,
+                        llm_service=self.llm_service,
+                        analysis_cache=default_analysis_cache
+                    )
+        return self._patent_service
+
+    def warm_up(self) -> dict:
+        """
+        Load the data indexes and open the OpenSearch and LLM connections,
+        concurrently. A failing step is reported but does not stop the
+        others; the service then falls back to building it on first use.
+
+        Returns:
+            dict: step -> {"ms": duration, "error": message or None}
+        """
+        steps = {
+            "patent_store": lambda: len(default_patent_store),
+            "company_catalog": lambda: len(default_company_catalog),
+            "similarity_index": lambda: default_similarity_index.search("", 1),
+            "opensearch": lambda: self.opensearch_client.warm_up(),
+            "llm": self._warm_up_llm,
+            "patent_service": lambda: self.patent_service
+        }
+
+        def run(name, step):
+            start = time.perf_counter()
+            error = None
+            try:
+                step()
+            except Exception as e:
+                error = str(e)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            metrics.set_gauge(f'startup.warm_up.{name}_ms', elapsed_ms)
+            if error:
+                metrics.incr('startup.warm_up.errors')
+            return name, {"ms": round(elapsed_ms, 1), "error": error}
+
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            return dict(executor.map(lambda item: run(*item), steps.items()))
+
+    def _warm_up_llm(self) -> None:
+        errors = {name: error for name, error in self.llm_service.warm_up().items() if error}
+        if errors:
+            raise RuntimeError("; ".join(f"{name}: {error}" for name, error in errors.items()))
+
+
+# Create a default instance
+default_container = ServiceContainer()
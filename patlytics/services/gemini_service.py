@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
-import json
-import google.generativeai as genai
+from typing import Iterator
 
-from config import GEMINI_API_KEY
+from patlytics.utils.stream_json import parse_analysis_answer
 
 
 class GeminiService:
     def __init__(self, model_name: str = "gemini-1.5-flash"):
+        # The SDK takes most of a second to import, so it is only loaded
+        # once a client is actually built
+        import google.generativeai as genai
+        from config import GEMINI_API_KEY
+
+        self.model_name = model_name
         self.api_key = GEMINI_API_KEY
         genai.configure(api_key=self.api_key)
 
@@ -23,9 +28,16 @@ class GeminiService:
             generation_config=self.generation_config
         )
 
-    def analyze_patent(self, prompt: str) -> dict:
-        try:
-            formatted_prompt = f"""You are a patent analysis expert. Analyze potential patent infringement based on the given information.
+    def warm_up(self) -> None:
+        """
+        Open the model's API channel with a free token count, so the first
+        analysis does not pay for the connection setup.
+        """
+        self.model.count_tokens("warm up")
+
+    @staticmethod
+    def format_prompt(prompt: str) -> str:
+        return f"""You are a patent analysis expert. Analyze potential patent infringement based on the given information.
             
             Important: Your response must be a valid JSON object.
             
@@ -33,30 +45,29 @@ class GeminiService:
             
             Remember to format your response as a valid JSON object."""
 
-            chat = self.model.start_chat(history=[])
-            response = chat.send_message(formatted_prompt)
-
-            try:
-                response_text = response.text.strip()
-                if response_text.startswith("```json"):
-                    response_text = response_text.replace(
-                        "```json", "").replace("```", "")
-                return json.loads(response_text)
-
-            except json.JSONDecodeError:
-                return {
-                    "analyses": [{
-                        "infringement_likelihood": "Low",
-                        "claims_at_issue": [],
-                        "explanation": "Error parsing patent analysis response."
-                    }]
-                }
-
-        except Exception as e:
-            return {
-                "analyses": [{
-                    "infringement_likelihood": "Low",
-                    "claims_at_issue": [],
-                    "explanation": f"Error during analysis: {str(e)}"
-                }]
-            }
+    def analyze_patent_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream the raw answer text as the model generates it. Errors are
+        raised to the caller.
+        """
+        chat = self.model.start_chat(history=[])
+        response = chat.send_message(self.format_prompt(prompt), stream=True)
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def analyze_patent(self, prompt: str) -> dict:
+        """
+        Analyze a prompt. An answer that is not valid JSON comes back as an
+        error answer; API errors (quota, timeouts) are raised, so callers
+        can back off and retry instead of storing a made-up analysis.
+        """
+        chat = self.model.start_chat(history=[])
+        response = chat.send_message(self.format_prompt(prompt))
+        return parse_analysis_answer(response.text)
+
+    async def analyze_patent_async(self, prompt: str) -> dict:
+        """Non-blocking `analyze_patent`, over the SDK's async gRPC channel."""
+        chat = self.model.start_chat(history=[])
+        response = await chat.send_message_async(self.format_prompt(prompt))
+        return parse_analysis_answer(response.text)
@@ -0,0 +1,115 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+from cachetools import TTLCache
+
+from config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RESULT_TTL
+from patlytics.utils import metrics
+
+
+class JobManager:
+    """
+    Runs slow work (LLM analyses) on a bounded background pool.
+
+    At most `max_workers` jobs run at once and at most `max_pending` more
+    wait in the queue; beyond that `submit` refuses new work instead of
+    letting it pile up. Job state lives in this process for `result_ttl`
+    seconds after it was last updated, so a job can only be polled from the
+    process that runs it.
+
+    Like a Flask view, `fn` may return a `(result, status)` pair; a status
+    of 400 or more marks the job failed, with the result kept.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, max_pending: int = JOB_QUEUE_SIZE,
+                 result_ttl: int = JOB_RESULT_TTL):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='patlytics-job')
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._jobs = TTLCache(maxsize=10 * (max_workers + max_pending), ttl=result_ttl)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[str]:
+        """
+        Queue `fn(*args, **kwargs)`.
+
+        Returns:
+            str: Job id, or None if the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            metrics.incr('jobs.rejected')
+            return None
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "created_at": datetime.utcnow().isoformat()
+            }
+            self._queued += 1
+            self._publish()
+
+        try:
+            self._executor.submit(self._run, job_id, fn, args, kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Get a copy of the job's state, or None if unknown or expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = dict(self._jobs.get(job_id) or {"job_id": job_id})
+            job.update(fields)
+            self._jobs[job_id] = job
+
+    def _publish(self) -> None:
+        metrics.set_gauge('jobs.queued', self._queued)
+        metrics.set_gauge('jobs.running', self._running)
+
+    def _run(self, job_id: str, fn: Callable, args: tuple, kwargs: dict) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._publish()
+        self._update(job_id, status="running",
+                     started_at=datetime.utcnow().isoformat())
+
+        try:
+            result, status = fn(*args, **kwargs), 200
+            if isinstance(result, tuple):
+                result, status = result
+            if status >= 400:
+                error = result.get('error') if isinstance(result, dict) else None
+                self._update(job_id, status="failed", result=result,
+                             error=error or f"Job failed with status {status}",
+                             finished_at=datetime.utcnow().isoformat())
+                metrics.incr('jobs.failed')
+            else:
+                self._update(job_id, status="succeeded", result=result,
+                             finished_at=datetime.utcnow().isoformat())
+                metrics.incr('jobs.succeeded')
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e),
+                         finished_at=datetime.utcnow().isoformat())
+            metrics.incr('jobs.failed')
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._publish()
+            self._slots.release()
+
+
+# Create a default instance
+default_job_manager = JobManager()
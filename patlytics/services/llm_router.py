@@ -0,0 +1,311 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, Optional
+
+from config import (
+    GEMINI_REQUESTS_PER_MINUTE,
+    GEMINI_TOKENS_PER_MINUTE,
+    OPENAI_REQUESTS_PER_MINUTE,
+    OPENAI_TOKENS_PER_MINUTE,
+    LLM_HEDGE,
+    LLM_HEDGE_DEFAULT_DELAY_MS,
+    LLM_ROUTER_WINDOW,
+    LLM_ROUTER_MIN_SAMPLES,
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_SAMPLE_TTL,
+    LLM_ROUTER_WORKERS
+)
+from patlytics.services.gemini_service import GeminiService
+from patlytics.services.openai_service import OpenAIService
+from patlytics.services.rate_governor import governed
+from patlytics.utils import metrics
+
+
+class ProviderStats:
+    """
+    Rolling latency and error rate of one LLM provider: its last `window`
+    calls, forgetting those older than `sample_ttl` seconds.
+    """
+
+    def __init__(self, window: int = LLM_ROUTER_WINDOW, sample_ttl: float = LLM_ROUTER_SAMPLE_TTL,
+                 clock=time.monotonic):
+        self._lock = threading.Lock()
+        # (recorded at, latency ms, succeeded)
+        self._samples = deque(maxlen=window)
+        self.sample_ttl = sample_ttl
+        self.clock = clock
+
+    def record(self, latency_ms: float, succeeded: bool) -> None:
+        with self._lock:
+            self._samples.append((self.clock(), latency_ms, succeeded))
+
+    def _expire(self) -> None:
+        # Samples are appended in time order, so the stale ones are on the left
+        cutoff = self.clock() - self.sample_ttl
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+
+    def latency(self, pct: float) -> Optional[float]:
+        """Percentile of successful call latencies (ms), None before any."""
+        with self._lock:
+            self._expire()
+            latencies = sorted(latency for _, latency, ok in self._samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))]
+
+    def error_rate(self) -> float:
+        with self._lock:
+            self._expire()
+            if not self._samples:
+                return 0.0
+            return sum(1 for _, _, ok in self._samples if not ok) / len(self._samples)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._samples)
+
+
+class LLMRouter:
+    """
+    Routes `analyze_patent` calls across several LLM services that share
+    the `GeminiService` interface.
+
+    Each call goes to the fastest (rolling p50) healthy provider; a provider
+    is unhealthy once its rolling error rate exceeds `max_error_rate`. With
+    `hedge`, a duplicate request is sent to the next provider when the first
+    has not answered within its own p95, and whichever successful answer
+    arrives first is used. An error answer is retried on the next provider.
+
+    Samples expire after `sample_ttl` seconds. A demoted provider, which only
+    sees failover traffic, thus ends up unmeasured again and is tried first,
+    so it recovers once its vendor does.
+    """
+
+    def __init__(self, services: list, hedge: bool = LLM_HEDGE,
+                 window: int = LLM_ROUTER_WINDOW, min_samples: int = LLM_ROUTER_MIN_SAMPLES,
+                 max_error_rate: float = LLM_ROUTER_MAX_ERROR_RATE,
+                 default_hedge_delay_ms: float = LLM_HEDGE_DEFAULT_DELAY_MS,
+                 max_workers: int = LLM_ROUTER_WORKERS,
+                 sample_ttl: float = LLM_ROUTER_SAMPLE_TTL, clock=time.monotonic):
+        if not services:
+            raise ValueError("LLMRouter needs at least one service")
+        self.services = services
+        self.stats = {service.model_name: ProviderStats(window, sample_ttl, clock)
+                      for service in services}
+        self.hedge = hedge
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.default_hedge_delay_ms = default_hedge_delay_ms
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='patlytics-llm')
+
+    @property
+    def model_name(self) -> str:
+        return "+".join(service.model_name for service in self.services)
+
+    @property
+    def generation_config(self) -> dict:
+        return {service.model_name: service.generation_config for service in self.services}
+
+    def warm_up(self) -> dict:
+        """
+        Warm up every service's connection.
+
+        Returns:
+            dict: model name -> None, or the error that service raised
+        """
+        errors = {}
+        for service in self.services:
+            try:
+                service.warm_up()
+                errors[service.model_name] = None
+            except Exception as e:
+                errors[service.model_name] = str(e)
+        return errors
+
+    def healthy(self, service) -> bool:
+        stats = self.stats[service.model_name]
+        return len(stats) < self.min_samples or stats.error_rate() <= self.max_error_rate
+
+    def ranked(self) -> list:
+        """
+        Services in the order they should be tried: healthy before
+        unhealthy, then unmeasured (no recent call) first so they get
+        measured, then by rolling p50 latency, and last those whose recent
+        calls all failed.
+        """
+        def key(indexed):
+            i, service = indexed
+            stats = self.stats[service.model_name]
+            p50 = stats.latency(50)
+            if p50 is not None:
+                measured = (1, p50)
+            else:
+                measured = (0, 0) if len(stats) == 0 else (2, 0)
+            return (not self.healthy(service), *measured, i)
+
+        return [service for _, service in sorted(enumerate(self.services), key=key)]
+
+    def _call(self, service, prompt: str) -> dict:
+        start = time.perf_counter()
+        try:
+            result = service.analyze_patent(prompt)
+        except Exception as e:
+            result = {
+                "error": f"Error during analysis: {str(e)}",
+                "analyses": []
+            }
+        self._record(service, (time.perf_counter() - start) * 1000, not result.get('error'))
+        return result
+
+    def _record(self, service, latency_ms: float, succeeded: bool) -> None:
+        name = service.model_name
+        stats = self.stats[name]
+        stats.record(latency_ms, succeeded)
+        metrics.observe(f'llm.{name}.latency_ms', latency_ms)
+        if not succeeded:
+            metrics.incr(f'llm.{name}.errors')
+        metrics.set_gauge(f'llm.{name}.error_rate', stats.error_rate())
+        p95 = stats.latency(95)
+        if p95 is not None:
+            metrics.set_gauge(f'llm.{name}.p95_ms', p95)
+
+    def _hedge_delay(self, service) -> float:
+        """Seconds to wait for `service` before hedging."""
+        stats = self.stats[service.model_name]
+        p95 = stats.latency(95) if len(stats) >= self.min_samples else None
+        return (p95 if p95 is not None else self.default_hedge_delay_ms) / 1000
+
+    def analyze_patent(self, prompt: str) -> dict:
+        ranked = self.ranked()
+        if not self.hedge or len(ranked) < 2:
+            result = self._call(ranked[0], prompt)
+            for service in ranked[1:]:
+                if not result.get('error'):
+                    break
+                metrics.incr('llm_router.failovers')
+                result = self._call(service, prompt)
+            return result
+
+        pending = {self._executor.submit(self._call, ranked[0], prompt): ranked[0]}
+        remaining = ranked[1:]
+        timeout = self._hedge_delay(ranked[0])
+        result = None
+        while pending:
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                service = pending.pop(future)
+                result = future.result()
+                if not result.get('error'):
+                    if service is not ranked[0]:
+                        metrics.incr('llm_router.hedge_wins')
+                    return result
+
+            if remaining and (not done or not pending):
+                # Hedge a slow call, or fail over from an error answer
+                metrics.incr('llm_router.hedged' if not done else 'llm_router.failovers')
+                service = remaining.pop(0)
+                pending[self._executor.submit(self._call, service, prompt)] = service
+                timeout = self._hedge_delay(service)
+            elif not remaining:
+                timeout = None
+        return result
+
+    async def _call_async(self, service, prompt: str) -> dict:
+        start = time.perf_counter()
+        try:
+            if hasattr(service, 'analyze_patent_async'):
+                result = await service.analyze_patent_async(prompt)
+            else:
+                result = await asyncio.to_thread(service.analyze_patent, prompt)
+        except Exception as e:
+            result = {
+                "error": f"Error during analysis: {str(e)}",
+                "analyses": []
+            }
+        self._record(service, (time.perf_counter() - start) * 1000, not result.get('error'))
+        return result
+
+    async def analyze_patent_async(self, prompt: str) -> dict:
+        """
+        Coroutine version of `analyze_patent`, with the same ranking,
+        hedging and failover. It holds no thread while waiting, and the
+        losing call of a hedge is cancelled instead of left to finish.
+        """
+        ranked = self.ranked()
+        if not self.hedge or len(ranked) < 2:
+            result = await self._call_async(ranked[0], prompt)
+            for service in ranked[1:]:
+                if not result.get('error'):
+                    break
+                metrics.incr('llm_router.failovers')
+                result = await self._call_async(service, prompt)
+            return result
+
+        pending = {asyncio.ensure_future(self._call_async(ranked[0], prompt)): ranked[0]}
+        remaining = ranked[1:]
+        timeout = self._hedge_delay(ranked[0])
+        result = None
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    service = pending.pop(task)
+                    result = task.result()
+                    if not result.get('error'):
+                        if service is not ranked[0]:
+                            metrics.incr('llm_router.hedge_wins')
+                        return result
+
+                if remaining and (not done or not pending):
+                    # Hedge a slow call, or fail over from an error answer
+                    metrics.incr('llm_router.hedged' if not done else 'llm_router.failovers')
+                    service = remaining.pop(0)
+                    pending[asyncio.ensure_future(self._call_async(service, prompt))] = service
+                    timeout = self._hedge_delay(service)
+                elif not remaining:
+                    timeout = None
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def analyze_patent_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream from the best ranked service. A stream cannot be hedged, so
+        only its total latency and outcome are recorded.
+        """
+        service = self.ranked()[0]
+        start = time.perf_counter()
+        try:
+            yield from service.analyze_patent_stream(prompt)
+        except Exception:
+            self._record(service, (time.perf_counter() - start) * 1000, False)
+            raise
+        self._record(service, (time.perf_counter() - start) * 1000, True)
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_llm_router() -> LLMRouter:
+    """
+    Get the process-wide router, whose LLM clients, rate governors and
+    rolling stats are shared by every request. Created on first use.
+    """
+    global _default_router
+    if _default_router is None:
+        with _default_router_lock:
+            if _default_router is None:
+                _default_router = LLMRouter([
+                    governed(GeminiService(), GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE),
+                    governed(OpenAIService(), OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE)
+                ])
+    return _default_router
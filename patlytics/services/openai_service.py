@@ -1,37 +1,71 @@
-import json
-from openai import OpenAI
+from typing import Iterator
 
-from config import OPENAI_API_KEY
+from patlytics.utils.stream_json import parse_analysis_answer
 
 
 class OpenAIService:
-    def __init__(self):
+    def __init__(self, model_name: str = "gpt-3.5-turbo"):
+        self.model_name = model_name
+        self.generation_config = {"temperature": 0.2}
+
+        # Imported here so only processes that build a client pay for the SDK
+        from openai import OpenAI
+        from config import OPENAI_API_KEY
         self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self._async_client = None
+
+    def warm_up(self) -> None:
+        """
+        Open a pooled connection with a model lookup, so the first analysis
+        does not pay for the connection setup.
+        """
+        self.client.models.retrieve(self.model_name)
+
+    def _messages(self, prompt: str) -> list[dict]:
+        return [
+            {"role": "system", "content": "I am a patent analysis expert. Analyze potential patent infringement based on the given information."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def analyze_patent_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream the raw answer text as the model generates it. Errors are
+        raised to the caller.
+        """
+        stream = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(prompt),
+            stream=True,
+            **self.generation_config
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
     def analyze_patent(self, prompt: str) -> dict:
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "I am a patent analysis expert. Analyze potential patent infringement based on the given information."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2
-            )
-            print("response: ", response)
-            r = response.choices[0].message.content
-            print(r)
-            return json.loads(response.choices[0].message.content)
-
-        except json.JSONDecodeError:
-            return {
-                "infringement_likelihood": "Low",
-                "claims_at_issue": [],
-                "explanation": "Error analyzing patent infringement."
-            }
-        except Exception as e:
-            return {
-                "infringement_likelihood": "Low",
-                "claims_at_issue": [],
-                "explanation": f"Error during analysis: {str(e)}"
-            }
+        # Same answer shape and error behaviour as GeminiService, so either
+        # can serve behind LLMRouter
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(prompt),
+            **self.generation_config
+        )
+        return parse_analysis_answer(response.choices[0].message.content)
+
+    async def analyze_patent_async(self, prompt: str) -> dict:
+        """Non-blocking `analyze_patent`, on the SDK's async client."""
+        response = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=self._messages(prompt),
+            **self.generation_config
+        )
+        return parse_analysis_answer(response.choices[0].message.content)
+
+    @property
+    def async_client(self):
+        # Built on first use, inside the event loop that serves it
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            from config import OPENAI_API_KEY
+            self._async_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        return self._async_client
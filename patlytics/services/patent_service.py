@@ -1,22 +1,73 @@
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from thefuzz import fuzz
 
-from config import PATENTS_ALIAS, COMPANY_PRODUCTS_ALIAS
-from patlytics.services.gemini_service import GeminiService
-from patlytics.utils.opensearch import default_client
+from config import (
+    PATENTS_ALIAS,
+    COMPANY_PRODUCTS_ALIAS,
+    LLM_FANOUT_CONCURRENCY,
+    BATCH_CONCURRENCY,
+    CLAIM_SELECTION_TOP_K,
+    CLAIM_SELECTION_TOKEN_BUDGET,
+    PRODUCT_SCREENING_TOP_K,
+    PRODUCT_SCREENING_MIN_SCORE,
+    SIMILARITY_TOP_K
+)
+from patlytics.services.analysis_cache import AnalysisCache, default_analysis_cache
+from patlytics.services.llm_router import get_default_llm_router
+from patlytics.utils import metrics
+from patlytics.utils.claim_selection import (
+    estimate_tokens,
+    format_claims,
+    parse_claims,
+    select_claims
+)
+from patlytics.utils.company_catalog import default_company_catalog
+from patlytics.utils.patent_similarity import default_similarity_index
+from patlytics.utils.patent_store import default_patent_store
+from patlytics.utils.product_screening import screen_products
+from patlytics.utils.stream_json import AnalysesStreamParser
 from patlytics.database.models import Report, Company
 from patlytics.database import db
 
+# Bump whenever format_analysis_prompt changes so cached analyses are not reused
+PROMPT_TEMPLATE_VERSION = 2
+
+LIKELIHOOD_RANK = {
+    "High": 3,
+    "Medium": 2,
+    "Low": 1
+}
+
+
+def _likelihood_rank(analysis: dict) -> int:
+    return LIKELIHOOD_RANK.get(analysis.get('infringement_likelihood'), 0)
+
+
+def _result_rank(result: dict) -> int:
+    """Rank of a single-product `analyze_patent` result."""
+    return _likelihood_rank((result.get('analyses') or [{}])[0])
+
 
 class PatentService:
-    def __init__(self):
-        self.opensearch_client = default_client
-        self.llm_service = GeminiService()  # or OpenAIService()
+    def __init__(self, opensearch_client=None, patent_store=None, similarity_index=None,
+                 company_catalog=None, llm_service=None, analysis_cache=None):
+        # Anything not passed in is the process-wide default, so building a
+        # PatentService never creates new clients or indexes. opensearchpy
+        # is imported on first use to keep it off the import path
+        if opensearch_client is None:
+            from patlytics.utils.opensearch import get_default_client
+            opensearch_client = get_default_client()
+        self.opensearch_client = opensearch_client
+        self.patent_store = patent_store if patent_store is not None else default_patent_store
+        self.similarity_index = similarity_index if similarity_index is not None else default_similarity_index
+        self.company_catalog = company_catalog if company_catalog is not None else default_company_catalog
+        self.llm_service = llm_service if llm_service is not None else get_default_llm_router()
+        self.analysis_cache = analysis_cache if analysis_cache is not None else default_analysis_cache
 
     def get_patent_data(self, patent_id: str) -> dict:
         """
-        Get patent data from OpenSearch or fallback to JSON file.
+        Get patent data from OpenSearch or fallback to the resident patent store.
 
         Args:
             patent_id (str): ID of the patent to retrieve
@@ -37,11 +88,8 @@ class PatentService:
             #         }
             #     }
 
-            # Fallback to JSON file
-            with open('./data/patents.json') as f:
-                patents = json.load(f)
-                patent = next(
-                    (p for p in patents if p['id'] == int(patent_id)), None)
+            # Fallback to JSON file, loaded once and indexed by id
+            patent = self.patent_store.get(patent_id)
 
             if not patent:
                 return {
@@ -56,6 +104,7 @@ class PatentService:
                 "data": {
                     "claims": patent['claims'],
                     "title": patent.get('title', 'Unknown Patent'),
+                    "abstract": patent.get('abstract', ''),
                     "publication_number": patent.get('publication_number', '')
                 }
             }
@@ -67,20 +116,64 @@ class PatentService:
                 "patent_id": patent_id
             }
 
-    def forward_company_name(self) -> dict:
+    def find_similar_patents(self, description: str, top_k: int = SIMILARITY_TOP_K) -> dict:
         """
-        Forward company names to FE
+        Find the patents whose title, abstract and claims are most similar
+        to a free-text product description.
+
+        Args:
+            description (str): Product name and/or description
+            top_k (int): Maximum number of patents
 
+        Returns:
+            dict: Patents with their similarity score (0-1), best first
         """
-        with open('./data/company_products.json') as f:
-            company_data = json.load(f)
+        try:
+            start = time.perf_counter()
+            matches = self.similarity_index.search(description, top_k)
+            metrics.observe(
+                'similarity.search_ms', (time.perf_counter() - start) * 1000)
+
+            patents = []
+            for patent_id, score in matches:
+                patent = self.patent_store.get(patent_id) or {}
+                patents.append({
+                    "id": patent_id,
+                    "publication_number": patent.get('publication_number', ''),
+                    "title": patent.get('title', 'Unknown Patent'),
+                    "score": score
+                })
 
-        company_names = [company['name']
-                         for company in company_data['companies']]
+            return {
+                "success": True,
+                "data": patents
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to find similar patents: {str(e)}"
+            }
+
+    def forward_company_name(self, query: str = '', limit: int | None = None, offset: int = 0) -> dict:
+        """
+        Forward company names to FE
+
+        Args:
+            query (str): Typeahead prefix of the name or any word in it
+            limit (int|None): Page size, None for all matches
+            offset (int): Number of matches to skip (the previous `next_cursor`)
+
+        Returns:
+            dict: Page of names, the next cursor and the catalog version
+        """
+        names, next_offset = self.company_catalog.search(query, limit, offset)
 
         return {
             "success": True,
-            "data": company_names
+            "data": names,
+            "next_cursor": str(next_offset) if next_offset is not None else None,
+            "version": self.company_catalog.version
         }
 
     def get_company_data(self, company_name: str, threshold: int = 80) -> dict:
@@ -92,47 +185,67 @@ class PatentService:
             threshold (int): Minimum similarity score (0-100) for matching
         """
         try:
-            with open('./data/company_products.json') as f:
-                company_data = json.load(f)
+            best_match = self.company_catalog.find(company_name, threshold)
+            return self._company_result(company_name, best_match)
 
-            matches = []
-            for company in company_data['companies']:
-                ratio = fuzz.ratio(
-                    company['name'].lower(), company_name.lower())
-                if ratio >= threshold:
-                    matches.append((company, ratio))
-
-            matches.sort(key=lambda x: x[1], reverse=True)
-
-            if not matches:
-                return {
-                    "success": False,
-                    "error": "Company not found.",
-                    "company_name": company_name
-                }
-
-            best_match = matches[0][0]
+        except Exception as e:
             return {
-                "success": True,
-                "data": {
-                    "name": best_match['name'],
-                    "products": best_match['products']
-                }
+                "success": False,
+                "error": f"Failed to get company data: {str(e)}",
+                "company_name": company_name
             }
 
+    def get_company_data_batch(self, company_names: list[str], threshold: int = 80) -> list[dict]:
+        """
+        Get company data for many input names with one vectorized fuzzy match.
+
+        Args:
+            company_names (list[str]): Names of the companies
+            threshold (int): Minimum similarity score (0-100) for matching
+
+        Returns:
+            list[dict]: One `get_company_data`-shaped result per input name
+        """
+        try:
+            best_matches = self.company_catalog.resolve_many(
+                company_names, threshold)
         except Exception as e:
-            return {
+            return [{
                 "success": False,
                 "error": f"Failed to get company data: {str(e)}",
                 "company_name": company_name
+            } for company_name in company_names]
+
+        return [
+            self._company_result(company_name, best_match)
+            for company_name, best_match in zip(company_names, best_matches)
+        ]
+
+    @staticmethod
+    def _company_result(company_name: str, company: dict | None) -> dict:
+        if not company:
+            return {
+                "success": False,
+                "error": "Company not found.",
+                "company_name": company_name
+            }
+
+        return {
+            "success": True,
+            "data": {
+                "name": company['name'],
+                "products": company['products']
             }
+        }
 
-    def get_company_data_fuzzy(self, company_name: str) -> dict:
+    def get_company_data_fuzzy(self, company_name: str, fields: list[str] | None = None) -> dict:
         """
         Get company data with fuzzy matching support.
 
         Args:
             company_name (str): Name of the company to search for
+            fields (list[str], optional): Only fetch these fields of the
+                matched companies from OpenSearch, e.g. ["name"]
 
         Returns:
             dict: Company data or error message with fuzzy matches
@@ -140,22 +253,15 @@ class PatentService:
         try:
             # Try fuzzy search first
 
-            matches = self.opensearch_client.fuzzy_search_company(company_name)
+            matches = self.opensearch_client.fuzzy_search_company(
+                company_name, fields=fields)
 
             if matches:
-                # Return best match and alternatives
-                return {
-                    "success": True,
-                    "data": matches[0]['data'],
-                    "alternatives": [
-                        {
-                            "name": match['company_name'],
-                            "score": match['score']
-                        } for match in matches[1:3]  # Return up to 2 alternatives
-                    ]
-                }
+                return self.fuzzy_company_result(matches)
 
-            # Fallback to exact match if no fuzzy matches found
+            # Fallback to the resident catalog if OpenSearch found nothing,
+            # failed, or its circuit breaker is open
+            metrics.incr('company_lookup.fallbacks')
             return self.get_company_data(company_name)
 
         except Exception as e:
@@ -165,6 +271,45 @@ class PatentService:
                 "company_name": company_name
             }
 
+    @staticmethod
+    def fuzzy_company_result(matches: list[dict]) -> dict:
+        """The `get_company_data_fuzzy` result of OpenSearch matches, best first."""
+        # Return best match and alternatives
+        return {
+            "success": True,
+            "data": matches[0]['data'],
+            "alternatives": [
+                {
+                    "name": match['company_name'],
+                    "score": match['score']
+                } for match in matches[1:3]  # Return up to 2 alternatives
+            ]
+        }
+
+    def select_relevant_claims(self, claims, products: list[dict]) -> str:
+        """
+        Shrink the claims to the independent ones plus the dependent claims
+        most relevant to `products` (BM25), within the configured budget.
+        Falls back to the raw claims if they cannot be parsed.
+        """
+        raw_claims = claims if isinstance(claims, str) else str(claims)
+        try:
+            parsed = parse_claims(claims)
+        except (ValueError, TypeError):
+            return raw_claims
+        if not parsed:
+            return raw_claims
+
+        query_text = " ".join(
+            f"{product['name']} {product.get('description', '')}" for product in products)
+        selected = format_claims(select_claims(
+            parsed, query_text, CLAIM_SELECTION_TOP_K, CLAIM_SELECTION_TOKEN_BUDGET))
+
+        metrics.observe('prompt.claims_tokens_raw', estimate_tokens(raw_claims))
+        metrics.observe('prompt.claims_tokens_selected', estimate_tokens(selected))
+        metrics.observe('prompt.claims_selected_ratio', len(selected) / max(len(raw_claims), 1))
+        return selected
+
     def format_analysis_prompt(self, patent_data: dict, company_data: dict, company_name: str) -> str:
         """
         Format the prompt for LLM analysis.
@@ -173,12 +318,14 @@ class PatentService:
             f"Product {i+1}:\nName: {product['name']}\nDescription: {product['description']}"
             for i, product in enumerate(company_data['products'])
         ])
+        claims_text = self.select_relevant_claims(
+            patent_data['claims'], company_data['products'])
 
         return f"""
         Patent Title: {patent_data['title']}
         
         Patent Claims:
-        {patent_data['claims']}
+        {claims_text}
         
         Company: {company_name}
         Products to Analyze:
@@ -206,9 +353,239 @@ class PatentService:
         }}
         """
 
-    def check_infringement(self, patent_id: str, company_name: str) -> dict:
+    def check_infringement(self, patent_id: str, company_name: str, use_cache: bool = True,
+                           fan_out: bool = False) -> dict:
         """
         Check patent infringement for a company's products.
+
+        Only the products most similar to the patent are analyzed (see
+        `screen_company_products`); the others are listed in
+        `screened_out_products` with their screening score.
+
+        Results are cached by a hash of the patent claims, the company's
+        products, the LLM model/config and PROMPT_TEMPLATE_VERSION; pass
+        `use_cache=False` to force a fresh analysis. With `fan_out`, each
+        product is analyzed by its own, smaller LLM call (see
+        `analyze_products_fan_out`).
+        """
+        prepared = self._prepare_analysis(patent_id, company_name, fan_out)
+        if 'cache_key' not in prepared:
+            return prepared
+        patent_data = prepared['patent_data']
+        company_data = prepared['company_data']
+        skipped_products = prepared['skipped_products']
+        cache_key = prepared['cache_key']
+
+        if use_cache:
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "cache_key": cache_key, "cached": True}
+
+        return self._run_analysis(
+            patent_id, patent_data, company_data, company_name, cache_key,
+            fan_out, skipped_products)
+
+    def _run_analysis(self, patent_id: str, patent_data: dict, company_data: dict,
+                      company_name: str, cache_key: str, fan_out: bool = False,
+                      skipped_products: list[dict] | None = None) -> dict:
+        try:
+            if fan_out:
+                # 3-4. One prompt and LLM call per product, run concurrently
+                analysis_result = self.analyze_products_fan_out(
+                    patent_data, company_data, company_name)
+            else:
+                # 3. Create analysis prompt
+                prompt = self.format_analysis_prompt(
+                    patent_data, company_data, company_name)
+
+                # 4. Get analysis from LLM
+                analysis_result = self.analyze_prompt(prompt)
+
+            return self.finish_analysis(
+                patent_id, patent_data, company_name, analysis_result, cache_key,
+                skipped_products)
+
+        except Exception as e:
+            return {
+                "error": f"Analysis failed: {str(e)}",
+                "patent_id": patent_id,
+                "company_name": company_name
+            }
+
+    def check_infringement_matrix(self, patent_ids: list, company_names: list[str],
+                                  fan_out: bool = False, max_concurrency: int = BATCH_CONCURRENCY):
+        """
+        Check every patent against every company.
+
+        Each patent is loaded once, all company names are resolved with one
+        batch fuzzy match, and input names resolving to the same company
+        share one analysis. Cached pairs are answered right away; the rest
+        run on a pool of at most `max_concurrency` LLM analyses.
+
+        Yields `(event, data)` pairs: a "pair" event per analyzed patent and
+        matched company, as it finishes, then one "summary" event holding the
+        matrix of top likelihoods (patent id -> input company -> likelihood,
+        None if the pair failed or was not analyzed) and the inputs that
+        could not be resolved.
+        """
+        patent_ids = list(dict.fromkeys(str(patent_id) for patent_id in patent_ids))
+        input_names = list(dict.fromkeys(company_names))
+        errors = []
+
+        patents = {}
+        for patent_id in patent_ids:
+            patent_result = self.get_patent_data(patent_id)
+            if patent_result['success']:
+                patents[patent_id] = patent_result['data']
+            else:
+                errors.append(patent_result)
+
+        # matched company name -> (company data, input names matching it)
+        companies = {}
+        for input_name, company_result in zip(
+                input_names, self.get_company_data_batch(input_names)):
+            if not company_result['success']:
+                errors.append(company_result)
+                continue
+            company_data = company_result['data']
+            companies.setdefault(company_data['name'], (company_data, []))[1].append(input_name)
+
+        matrix = {patent_id: dict.fromkeys(input_names) for patent_id in patent_ids}
+
+        def pair_event(patent_id, company_name, result):
+            input_companies = companies[company_name][1]
+            if not result.get('error'):
+                likelihoods = [p.get('infringement_likelihood')
+                               for p in result.get('top_infringing_products', [])]
+                for input_name in input_companies:
+                    matrix[patent_id][input_name] = likelihoods[0] if likelihoods else None
+            return "pair", {
+                "patent_id": patent_id,
+                "matched_company": company_name,
+                "input_companies": input_companies,
+                "result": result
+            }
+
+        executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency))
+        futures = {}
+        try:
+            for patent_id, patent_data in patents.items():
+                for company_name, (company_data, _) in companies.items():
+                    prepared = self.prepare_pair(
+                        patent_data, company_data, company_name, fan_out)
+                    cache_key = prepared['cache_key']
+                    cached = self.analysis_cache.get(cache_key)
+                    if cached is not None:
+                        yield pair_event(patent_id, company_name,
+                                         {**cached, "cache_key": cache_key, "cached": True})
+                        continue
+
+                    future = executor.submit(
+                        self._run_analysis, patent_id, patent_data, prepared['company_data'],
+                        company_name, cache_key, fan_out, prepared['skipped_products'])
+                    futures[future] = (patent_id, company_name)
+
+            for future in as_completed(futures):
+                patent_id, company_name = futures[future]
+                yield pair_event(patent_id, company_name, future.result())
+        finally:
+            # Stop queued analyses if the client went away
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        metrics.incr('batch.pairs', len(patents) * len(companies))
+        metrics.incr('batch.llm_pairs', len(futures))
+        yield "summary", {
+            "patent_ids": patent_ids,
+            "company_names": input_names,
+            "matrix": matrix,
+            "errors": errors
+        }
+
+    def stream_infringement(self, patent_id: str, company_name: str, use_cache: bool = True):
+        """
+        Streaming variant of `check_infringement`.
+
+        Yields `(event, data)` pairs: an "analysis" event for each product
+        analysis as soon as the LLM has finished writing it, then a single
+        "complete" event with the same result `check_infringement` returns,
+        or an "error" event.
+        """
+        prepared = self._prepare_analysis(patent_id, company_name)
+        if 'cache_key' not in prepared:
+            yield "error", prepared
+            return
+        patent_data = prepared['patent_data']
+        company_data = prepared['company_data']
+        skipped_products = prepared['skipped_products']
+        cache_key = prepared['cache_key']
+
+        if use_cache:
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                for analysis in cached.get('top_infringing_products', []):
+                    yield "analysis", analysis
+                yield "complete", {**cached, "cache_key": cache_key, "cached": True}
+                return
+
+        try:
+            prompt = self.format_analysis_prompt(
+                patent_data, company_data, company_name)
+
+            if not hasattr(self.llm_service, 'analyze_patent_stream'):
+                analysis_result = self.analyze_prompt(prompt)
+                for analysis in analysis_result.get('analyses', []):
+                    yield "analysis", analysis
+            else:
+                analysis_result = yield from self._stream_prompt(prompt)
+
+            yield "complete", self.finish_analysis(
+                patent_id, patent_data, company_name, analysis_result, cache_key,
+                skipped_products)
+
+        except Exception as e:
+            yield "error", {
+                "error": f"Analysis failed: {str(e)}",
+                "patent_id": patent_id,
+                "company_name": company_name
+            }
+
+    def _stream_prompt(self, prompt: str):
+        """
+        Stream a prompt through the LLM, yielding ("analysis", ...) events
+        and returning the complete `analyze_patent`-shaped answer.
+        """
+        metrics.observe('prompt.tokens', estimate_tokens(prompt))
+        start = time.perf_counter()
+        first_analysis = True
+        parser = AnalysesStreamParser()
+        try:
+            for chunk in self.llm_service.analyze_patent_stream(prompt):
+                for analysis in parser.feed(chunk):
+                    if first_analysis:
+                        metrics.observe(
+                            'llm.first_analysis_ms', (time.perf_counter() - start) * 1000)
+                        first_analysis = False
+                    yield "analysis", analysis
+        finally:
+            metrics.observe(
+                'llm.analyze_patent_ms', (time.perf_counter() - start) * 1000)
+
+        analysis_result = parser.result()
+        if analysis_result is None:
+            return {
+                "error": "Invalid JSON response",
+                "analyses": [],
+                "overall_risk_assessment": "Error in analysis"
+            }
+        return analysis_result
+
+    def _prepare_analysis(self, patent_id: str, company_name: str, fan_out: bool = False) -> dict:
+        """
+        Load the patent and company, screen the products and compute the
+        analysis cache key.
+
+        Returns:
+            dict: See `prepare_pair`, or the failed lookup result
         """
         # 1. Get patent data
         patent_result = self.get_patent_data(patent_id)
@@ -224,45 +601,248 @@ class PatentService:
 
         company_data = company_result['data']
 
+        return self.prepare_pair(patent_data, company_data, company_name, fan_out)
+
+    def prepare_pair(self, patent_data: dict, company_data: dict, company_name: str,
+                     fan_out: bool = False) -> dict:
+        """
+        Screen the products of an already loaded patent and company and
+        compute the analysis cache key. Blocking (TF-IDF screening).
+
+        Returns:
+            dict: patent_data, company_data with only the screened-in
+            products, skipped_products and cache_key
+        """
+        screened_products, skipped_products = self.screen_company_products(
+            patent_data, company_data['products'])
+
+        cache_key = AnalysisCache.make_key(
+            patent_data, company_data, company_name,
+            self.llm_service.model_name, self.llm_service.generation_config,
+            PROMPT_TEMPLATE_VERSION, fan_out=fan_out,
+            screening={
+                "top_k": PRODUCT_SCREENING_TOP_K,
+                "min_score": PRODUCT_SCREENING_MIN_SCORE
+            })
+
+        return {
+            "patent_data": patent_data,
+            "company_data": {**company_data, "products": screened_products},
+            "skipped_products": skipped_products,
+            "cache_key": cache_key
+        }
+
+    def screen_company_products(self, patent_data: dict, products: list[dict]) -> tuple[list[dict], list[dict]]:
+        """
+        Keep the products whose TF-IDF similarity to the patent title,
+        abstract and claims puts them in the top PRODUCT_SCREENING_TOP_K and
+        above PRODUCT_SCREENING_MIN_SCORE.
+
+        Returns:
+            tuple[list[dict], list[dict]]: Products to analyze, and the
+            skipped products with their screening score
+        """
+        patent_text = " ".join([
+            patent_data.get('title', ''),
+            patent_data.get('abstract', ''),
+            patent_data['claims'] if isinstance(patent_data['claims'], str)
+            else str(patent_data['claims'])
+        ])
+        selected, skipped = screen_products(
+            products, patent_text, PRODUCT_SCREENING_TOP_K, PRODUCT_SCREENING_MIN_SCORE)
+
+        metrics.incr('screening.products_analyzed', len(selected))
+        metrics.incr('screening.products_skipped', len(skipped))
+        return selected, skipped
+
+    def finish_analysis(self, patent_id: str, patent_data: dict, company_name: str,
+                        analysis_result: dict, cache_key: str,
+                        skipped_products: list[dict] | None = None) -> dict:
+        """
+        Rank the LLM answer into the report result and cache it unless the
+        LLM call failed.
+        """
+        # 5. Process and sort results
+        matches = analysis_result.get('analyses', [])
+        matches.sort(key=_likelihood_rank, reverse=True)
+        overall_risk_assessment = analysis_result.get(
+            'overall_risk_assessment', '')
+
+        # 6. Return formatted result
+        result = {
+            "analysis_date": datetime.now().isoformat(),
+            "analysis_id": patent_id,
+            "patent_id": patent_data.get('publication_number'),
+            "patent_title": patent_data['title'],
+            "company_name": company_name,
+            "top_infringing_products": matches[:2],
+            "overall_risk_assessment": overall_risk_assessment,
+            "screened_out_products": skipped_products or [],
+            "failed_products": analysis_result.get('failed_products', [])
+        }
+
+        # Never cache (or persist under the key) a failed LLM call, and keep
+        # its error so callers do not save it as a report
+        if analysis_result.get('error'):
+            return {**result, "error": analysis_result['error'], "cache_key": None,
+                    "cached": False}
+        # A partial fan-out is returned and saved, but not reused for the same
+        # inputs, so the failed products get another try
+        if result['failed_products']:
+            return {**result, "cache_key": None, "cached": False}
+        self.analysis_cache.set(cache_key, result)
+        return {**result, "cache_key": cache_key, "cached": False}
+
+    def analyze_prompt(self, prompt: str) -> dict:
+        """
+        Send a prompt to the LLM, recording its size and the call latency.
+        """
+        metrics.observe('prompt.tokens', estimate_tokens(prompt))
+        start = time.perf_counter()
         try:
-            # 3. Create analysis prompt
-            prompt = self.format_analysis_prompt(
-                patent_data, company_data, company_name)
+            return self.llm_service.analyze_patent(prompt)
+        finally:
+            metrics.observe(
+                'llm.analyze_patent_ms', (time.perf_counter() - start) * 1000)
 
-            # 4. Get analysis from LLM
-            analysis_result = self.llm_service.analyze_patent(prompt)
+    def analyze_products_fan_out(self, patent_data: dict, company_data: dict, company_name: str,
+                                 max_concurrency: int = LLM_FANOUT_CONCURRENCY) -> dict:
+        """
+        Analyze each product with its own LLM call, at most `max_concurrency`
+        at a time, and merge the answers into one `analyze_patent`-shaped
+        result.
 
-            # 5. Process and sort results
-            matches = analysis_result.get('analyses', [])
-            matches.sort(key=lambda x: {
-                "High": 3,
-                "Medium": 2,
-                "Low": 1
-            }[x['infringement_likelihood']], reverse=True)
-            overall_risk_assessment = analysis_result.get(
-                'overall_risk_assessment', '')
+        Stops waiting as soon as the top-2 ranking can no longer change: two
+        products are rated High and no product listed before the second one
+        is still pending (ties keep product order).
+        """
+        products = company_data['products']
+        if not products:
+            return {"analyses": [], "overall_risk_assessment": ""}
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_concurrency, len(products))))
+        futures = {
+            executor.submit(
+                self.analyze_prompt,
+                self.format_analysis_prompt(
+                    patent_data, {**company_data, "products": [product]}, company_name)
+            ): i
+            for i, product in enumerate(products)
+        }
 
-            # 6. Return formatted result
-            return {
-                "analysis_date": datetime.now().isoformat(),
-                "analysis_id": patent_id,
-                "patent_id": patent_data.get('publication_number'),
-                "patent_title": patent_data['title'],
-                "company_name": company_name,
-                "top_infringing_products": matches[:2],
-                "overall_risk_assessment": overall_risk_assessment
-            }
+        results = {}
+        try:
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if self.top_products_settled(results, len(products)):
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
+        return self.merge_fan_out(products, results)
+
+    @staticmethod
+    def merge_fan_out(products: list[dict], results: dict) -> dict:
+        """
+        Merge per-product answers (product index -> `analyze_patent` result)
+        into one `analyze_patent`-shaped result.
+
+        Products whose call failed are listed in `failed_products`; the
+        merged result only has an `error` when every answer failed.
+        """
+        analyses = []
+        failed_products = []
+        for i in sorted(results):
+            result = results[i]
+            if result.get('error'):
+                failed_products.append(
+                    {"product_name": products[i]['name'], "error": result['error']})
+                continue
+            for analysis in result.get('analyses', [])[:1]:
+                analyses.append({"product_name": products[i]['name'], **analysis})
+
+        ranked = sorted(
+            (i for i in results if results[i].get('analyses')),
+            key=lambda i: _result_rank(results[i]),
+            reverse=True
+        )
+        overall = "\n".join(
+            f"{products[i]['name']}: {results[i].get('overall_risk_assessment', '')}"
+            for i in ranked[:2]
+        )
+
+        merged = {"analyses": analyses, "overall_risk_assessment": overall,
+                  "failed_products": failed_products}
+        if failed_products and len(failed_products) == len(results):
+            merged["error"] = "; ".join(
+                f"{failed['product_name']}: {failed['error']}" for failed in failed_products)
+        return merged
+
+    @staticmethod
+    def top_products_settled(results: dict, product_count: int) -> bool:
+        """Whether pending fan-out answers can no longer change the top 2."""
+        ranked = sorted(results, key=lambda i: (-_result_rank(results[i]), i))
+        if len(ranked) < 2:
+            return False
+
+        second = ranked[1]
+        if _result_rank(results[second]) < LIKELIHOOD_RANK["High"]:
+            return False
+        return all(i in results or i > second for i in range(product_count))
+
+    def save_analyses(self, uid: int, analyses: list[dict]) -> dict:
+        """
+        Save many analyses as Report rows in one transaction.
+
+        Args:
+            uid (int): User the reports belong to
+            analyses (list[dict]): Each with patent_id, matched_company,
+                input_company, analysis and an optional cache_key
+
+        Returns:
+            dict: Ids of the saved reports, in input order, or error message
+        """
+        company_names = {analysis['matched_company'] for analysis in analyses}
+        company_ids = {
+            company.name: company.id
+            for company in Company.query.filter(Company.name.in_(company_names))
+        } if company_names else {}
+
+        reports = [
+            Report(
+                uid=uid,
+                patent_id=analysis['patent_id'],
+                company_id=company_ids.get(analysis['matched_company']),
+                input_company=analysis['input_company'],
+                analysis_results=analysis['analysis'],
+                cache_key=analysis.get('cache_key')
+            )
+            for analysis in analyses
+        ]
+        db.session.add_all(reports)
+
+        try:
+            db.session.commit()
         except Exception as e:
+            db.session.rollback()
             return {
-                "error": f"Analysis failed: {str(e)}",
-                "patent_id": patent_id,
-                "company_name": company_name
+                "success": False,
+                "error": f"Failed to save analyses: {str(e)}"
             }
 
-    def save_analysis(self, uid: int, patent_id: int, matched_company_name: str, input_company: str, analysis: dict) -> dict:
+        return {
+            "success": True,
+            "data": [report.id for report in reports]
+        }
+
+    def save_analysis(self, uid: int, patent_id: int, matched_company_name: str, input_company: str, analysis: dict,
+                      cache_key: str | None = None) -> dict:
         """
         Save analysis to Report database
+
+        Reports saved with a `cache_key` also serve as the persistent tier of
+        the analysis cache.
         """
         company_id = None
         company = Company.query.filter_by(
@@ -275,7 +855,8 @@ class PatentService:
             patent_id=patent_id,
             company_id=company_id,
             input_company=input_company,
-            analysis_results=analysis
+            analysis_results=analysis,
+            cache_key=cache_key
         )
 
         db.session.add(new_report)
@@ -0,0 +1,314 @@
+import asyncio
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Iterator
+
+from config import (
+    LLM_GOVERNOR_MAX_WAIT,
+    LLM_GOVERNOR_MAX_QUEUE,
+    LLM_RESERVED_OUTPUT_TOKENS,
+    LLM_RETRY_ATTEMPTS,
+    LLM_RETRY_BASE_DELAY,
+    LLM_RETRY_MAX_DELAY,
+    LLM_USER_MAX_CONCURRENCY
+)
+from patlytics.utils import metrics
+from patlytics.utils.claim_selection import estimate_tokens
+
+# HTTP statuses, and SDK error classes without one, worth retrying: rate
+# limits, overload and transient network failures
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {
+    'APIConnectionError', 'APITimeoutError', 'DeadlineExceeded',
+    'ServiceUnavailable', 'ConnectionError', 'TimeoutError'
+}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether an LLM SDK error is a rate limit or a transient failure."""
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    try:
+        if int(status) in RETRYABLE_STATUS:
+            return True
+    except (TypeError, ValueError):
+        pass
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def is_rate_limit(error: Exception) -> bool:
+    status = getattr(error, 'status_code', None) or getattr(error, 'code', None)
+    try:
+        return int(status) == 429
+    except (TypeError, ValueError):
+        return False
+
+
+def backoff_delay(attempt: int, base: float = LLM_RETRY_BASE_DELAY,
+                  cap: float = LLM_RETRY_MAX_DELAY, rng=random) -> float:
+    """Seconds before retry `attempt` (0-based): exponential, full jitter."""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """
+    `rate_per_minute` units refilled continuously, holding at most one
+    minute's worth. Not thread-safe; `RateGovernor` locks around it.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (after `refill`)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+class RateGovernor:
+    """
+    Client-side limit of one LLM provider's requests and tokens per minute.
+
+    A call takes one request and its estimated tokens from two token
+    buckets, waiting until both have enough, so traffic stays just under
+    the provider's quota instead of running into it. At most `max_queue`
+    calls wait at a time and none longer than `max_wait` seconds; beyond
+    that, acquiring raises `TimeoutError` right away.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float,
+                 max_wait: float = LLM_GOVERNOR_MAX_WAIT, max_queue: int = LLM_GOVERNOR_MAX_QUEUE):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls currently waiting for capacity."""
+        return self._waiting
+
+    def _try_take(self, tokens: float) -> float:
+        """Take capacity for one call if available; else seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait == 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+            return wait
+
+    def throttle(self) -> None:
+        """
+        Empty the request bucket after the provider rate-limited us anyway,
+        so other callers back off too until it refills.
+        """
+        with self._lock:
+            self.requests.refill(time.monotonic())
+            self.requests.level = 0
+        metrics.incr(f'llm.{self.name}.governor.throttled')
+
+    def _enter_queue(self) -> float:
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                metrics.incr(f'llm.{self.name}.governor.rejected')
+                raise TimeoutError(f"LLM rate limit: {self._waiting} calls already waiting")
+            self._waiting += 1
+            metrics.set_gauge(f'llm.{self.name}.governor.queue_depth', self._waiting)
+        return time.monotonic() + self.max_wait
+
+    def _leave_queue(self, start: float) -> None:
+        with self._lock:
+            self._waiting -= 1
+            metrics.set_gauge(f'llm.{self.name}.governor.queue_depth', self._waiting)
+        metrics.observe(f'llm.{self.name}.governor.wait_ms', (time.monotonic() - start) * 1000)
+
+    def _check_deadline(self, wait: float, deadline: float) -> None:
+        if time.monotonic() + wait > deadline:
+            metrics.incr(f'llm.{self.name}.governor.timeouts')
+            raise TimeoutError(f"LLM rate limit: no capacity within {self.max_wait:.0f}s")
+
+    def acquire(self, tokens: float) -> None:
+        """Block until one call of `tokens` tokens fits under the limits."""
+        wait = self._try_take(tokens)
+        if wait == 0:
+            return
+        start = time.monotonic()
+        deadline = self._enter_queue()
+        try:
+            while wait > 0:
+                self._check_deadline(wait, deadline)
+                time.sleep(wait)
+                wait = self._try_take(tokens)
+        finally:
+            self._leave_queue(start)
+
+    async def acquire_async(self, tokens: float) -> None:
+        """`acquire` that waits on the event loop instead of a thread."""
+        wait = self._try_take(tokens)
+        if wait == 0:
+            return
+        start = time.monotonic()
+        deadline = self._enter_queue()
+        try:
+            while wait > 0:
+                self._check_deadline(wait, deadline)
+                await asyncio.sleep(wait)
+                wait = self._try_take(tokens)
+        finally:
+            self._leave_queue(start)
+
+
+class GovernedLLMService:
+    """
+    An LLM service behind a `RateGovernor`, with the same interface, so it
+    can serve behind `LLMRouter`.
+
+    Rate-limited and transient errors are retried up to `retries` times
+    with exponential backoff and full jitter; other errors, and the last
+    retryable one, are raised to the caller rather than turned into an
+    answer.
+    """
+
+    def __init__(self, service, governor: RateGovernor, retries: int = LLM_RETRY_ATTEMPTS,
+                 reserved_output_tokens: int = LLM_RESERVED_OUTPUT_TOKENS, rng=random):
+        self.service = service
+        self.governor = governor
+        self.retries = retries
+        self.reserved_output_tokens = reserved_output_tokens
+        self.rng = rng
+
+    @property
+    def model_name(self) -> str:
+        return self.service.model_name
+
+    @property
+    def generation_config(self) -> dict:
+        return self.service.generation_config
+
+    def warm_up(self) -> None:
+        self.service.warm_up()
+
+    def _tokens(self, prompt: str) -> int:
+        return estimate_tokens(prompt) + self.reserved_output_tokens
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        if not is_retryable(error):
+            return False
+        if is_rate_limit(error):
+            self.governor.throttle()
+        if attempt >= self.retries:
+            metrics.incr(f'llm.{self.model_name}.retries_exhausted')
+            return False
+        metrics.incr(f'llm.{self.model_name}.retries')
+        return True
+
+    def analyze_patent(self, prompt: str) -> dict:
+        tokens = self._tokens(prompt)
+        for attempt in range(self.retries + 1):
+            self.governor.acquire(tokens)
+            try:
+                return self.service.analyze_patent(prompt)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            time.sleep(backoff_delay(attempt, rng=self.rng))
+
+    async def analyze_patent_async(self, prompt: str) -> dict:
+        tokens = self._tokens(prompt)
+        for attempt in range(self.retries + 1):
+            await self.governor.acquire_async(tokens)
+            try:
+                if hasattr(self.service, 'analyze_patent_async'):
+                    return await self.service.analyze_patent_async(prompt)
+                return await asyncio.to_thread(self.service.analyze_patent, prompt)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            await asyncio.sleep(backoff_delay(attempt, rng=self.rng))
+
+    def analyze_patent_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Stream under the governor. Only a failure before the first chunk is
+        retried; once text was yielded, errors are raised to the caller.
+        """
+        tokens = self._tokens(prompt)
+        for attempt in range(self.retries + 1):
+            self.governor.acquire(tokens)
+            started = False
+            try:
+                for chunk in self.service.analyze_patent_stream(prompt):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not self._should_retry(e, attempt):
+                    raise
+            time.sleep(backoff_delay(attempt, rng=self.rng))
+
+
+class UserQuota:
+    """Limits how many analyses one user (uid or client address) runs at once."""
+
+    def __init__(self, max_per_user: int = LLM_USER_MAX_CONCURRENCY):
+        self.max_per_user = max_per_user
+        self._lock = threading.Lock()
+        self._active = defaultdict(int)
+
+    def acquire(self, user) -> bool:
+        """
+        Returns:
+            bool: False if the user already runs `max_per_user` analyses
+        """
+        with self._lock:
+            if self._active[user] >= self.max_per_user:
+                metrics.incr('llm.user_quota.rejected')
+                return False
+            self._active[user] += 1
+            return True
+
+    def release(self, user) -> None:
+        with self._lock:
+            self._active[user] -= 1
+            if self._active[user] <= 0:
+                del self._active[user]
+
+    def active(self, user) -> int:
+        with self._lock:
+            return self._active.get(user, 0)
+
+    @contextmanager
+    def slot(self, user) -> Iterator[bool]:
+        """`with quota.slot(user) as acquired:` releases on exit if acquired."""
+        acquired = self.acquire(user)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release(user)
+
+
+def governed(service, requests_per_minute: float, tokens_per_minute: float) -> GovernedLLMService:
+    return GovernedLLMService(
+        service, RateGovernor(service.model_name, requests_per_minute, tokens_per_minute))
+
+
+# Create a default instance
+default_user_quota = UserQuota()
@@ -0,0 +1,126 @@
+"""
+Cold-start profiler: per-module import time and memory of the app.
+
+Imports the target module in fresh interpreters, once under `-X importtime`
+for self/cumulative import time and once with tracemalloc to attribute the
+memory each newly imported package retains, then prints the heaviest
+modules. Exits with status 1 if the total import time or the peak RSS is
+over budget, so it can gate a deploy.
+
+Usage:
+    python -m patlytics.startup_profile [--target app] [--top 25]
+        [--budget-ms 1500] [--budget-mb 250]
+
+Run with PATLYTICS_CONFIG_SOURCE=env (see config.parameters) to profile
+without reaching SSM.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from config import STARTUP_IMPORT_BUDGET_MS, STARTUP_MEMORY_BUDGET_MB
+
+IMPORTTIME_PREFIX = "import time:"
+
+# Runs in the child interpreter: records, for every top-level package
+# imported for the first time, the Python memory it still holds afterwards
+_MEMORY_PROBE = """
+import builtins, resource, sys, time, tracemalloc
+tracemalloc.start()
+memory = {}
+_import = builtins.__import__
+
+def traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _import(name, globals, locals, fromlist, level)
+    before = tracemalloc.get_traced_memory()[0]
+    try:
+        return _import(name, globals, locals, fromlist, level)
+    finally:
+        memory[name] = max(memory.get(name, 0), tracemalloc.get_traced_memory()[0] - before)
+
+builtins.__import__ = traced_import
+start = time.perf_counter()
+__import__(sys.argv[1])
+wall_ms = (time.perf_counter() - start) * 1000
+builtins.__import__ = _import
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+import json
+print(json.dumps({"memory": memory, "traced_wall_ms": wall_ms, "max_rss_kb": rss_kb}))
+"""
+
+
+def _run(args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                          env=os.environ.copy())
+
+
+def import_times(target: str) -> dict[str, tuple[int, int]]:
+    """
+    Returns:
+        dict[str, tuple[int, int]]: module -> (self us, cumulative us)
+    """
+    result = _run(["-X", "importtime", "-c", f"import {target}"])
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{target}' failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith(IMPORTTIME_PREFIX) or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len(IMPORTTIME_PREFIX):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def import_memory(target: str) -> dict:
+    result = _run(["-c", _MEMORY_PROBE, target])
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing '{target}' failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report per-module import time and memory, and enforce the cold-start budget")
+    parser.add_argument('--target', default='app', help="module to import (default: app)")
+    parser.add_argument('--top', type=int, default=25, help="modules to list")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_IMPORT_BUDGET_MS,
+                        help="maximum import time of the target")
+    parser.add_argument('--budget-mb', type=float, default=STARTUP_MEMORY_BUDGET_MB,
+                        help="maximum peak RSS after importing the target")
+    args = parser.parse_args()
+
+    times = import_times(args.target)
+    probe = import_memory(args.target)
+    memory = probe['memory']
+
+    total_ms = times[args.target][1] / 1000 if args.target in times else 0.0
+    rss_mb = probe['max_rss_kb'] / 1024
+
+    print(f"{'module':<60} {'self ms':>9} {'cumul ms':>9} {'mem KiB':>9}")
+    ranked = sorted(times.items(), key=lambda item: item[1][1], reverse=True)
+    for module, (self_us, cumulative_us) in ranked[:args.top]:
+        # Memory is only attributed to modules imported by absolute name
+        held = memory.get(module)
+        held_kib = f"{held / 1024:9.1f}" if held is not None else f"{'-':>9}"
+        print(f"{module:<60} {self_us / 1000:9.1f} {cumulative_us / 1000:9.1f} {held_kib}")
+
+    print(f"\n{len(times)} modules, import of '{args.target}' took {total_ms:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms), peak RSS {rss_mb:.1f} MB "
+          f"(budget {args.budget_mb:.0f} MB)")
+
+    over_budget = []
+    if total_ms > args.budget_ms:
+        over_budget.append(f"import time {total_ms:.1f} ms > {args.budget_ms:.0f} ms")
+    if rss_mb > args.budget_mb:
+        over_budget.append(f"peak RSS {rss_mb:.1f} MB > {args.budget_mb:.0f} MB")
+    if over_budget:
+        print("Cold-start budget exceeded: " + "; ".join(over_budget))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
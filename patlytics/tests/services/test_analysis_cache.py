@@ -0,0 +1,73 @@
+from patlytics.database import db
+from patlytics.database.models import Company, Patent, Report
+from patlytics.services.analysis_cache import AnalysisCache
+from patlytics.tests.test_base import TestBase
+
+
+class TestAnalysisCache(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.cache = AnalysisCache(maxsize=2, ttl=60)
+        self.patent_data = {"title": "Test Patent", "claims": "Test Claims"}
+        self.company_data = {
+            "name": "Test Company",
+            "products": [{"name": "Test Product", "description": "Test"}]
+        }
+
+    def make_key(self, **overrides):
+        args = {
+            "patent_data": self.patent_data,
+            "company_data": self.company_data,
+            "company_name": "Test Company",
+            "model_name": "test-model",
+            "generation_config": {"temperature": 1},
+            "prompt_version": 1
+        }
+        args.update(overrides)
+        return AnalysisCache.make_key(**args)
+
+    def test_key_changes_with_inputs(self):
+        """Test any input that changes the LLM answer changes the key"""
+        key = self.make_key()
+        self.assertEqual(key, self.make_key())
+        self.assertNotEqual(key, self.make_key(prompt_version=2))
+        self.assertNotEqual(key, self.make_key(model_name="other-model"))
+        self.assertNotEqual(key, self.make_key(
+            patent_data={"title": "Test Patent", "claims": "New Claims"}))
+
+    def test_memory_tier(self):
+        """Test set/get through the in-process tier"""
+        key = self.make_key()
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.set(key, {"overall_risk_assessment": "High"})
+        self.assertEqual(
+            self.cache.get(key), {"overall_risk_assessment": "High"})
+
+    def test_persistent_tier(self):
+        """Test a saved report answers after the memory tier is cleared"""
+        user = self.create_test_user()
+        company = Company(name="Test Company")
+        db.session.add_all([company, Patent(patent_id=1, title="Test Patent")])
+        db.session.commit()
+
+        key = self.make_key()
+        db.session.add(Report(
+            uid=user.id,
+            patent_id=1,
+            company_id=company.id,
+            input_company="test co",
+            analysis_results={
+                "input_company": "test co",
+                "matched_company": "Test Company",
+                "cache_key": key,
+                "cached": False,
+                "overall_risk_assessment": "High"
+            },
+            cache_key=key
+        ))
+        db.session.commit()
+
+        self.cache.clear()
+        self.assertEqual(
+            self.cache.get(key), {"overall_risk_assessment": "High"})
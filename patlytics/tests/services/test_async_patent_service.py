@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import AsyncMock, MagicMock
+from patlytics.tests.test_base import TestBase
+from patlytics.services.analysis_cache import AnalysisCache
+from patlytics.services.async_patent_service import AsyncPatentService
+from patlytics.services.patent_service import PatentService
+from patlytics.utils.company_catalog import CompanyCatalog
+from patlytics.utils.patent_store import PatentStore
+
+
+class FakeAsyncLLM:
+    model_name = "test-model"
+    generation_config = {}
+
+    def __init__(self):
+        self.prompts = []
+
+    async def analyze_patent_async(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        return {
+            "analyses": [{
+                "product_name": "Test Product",
+                "infringement_likelihood": "High"
+            }],
+            "overall_risk_assessment": "High risk"
+        }
+
+
+class TestAsyncPatentService(TestBase):
+    def setUp(self):
+        super().setUp()
+        fd, self.patents_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump([{"id": "12345", "title": "Test Patent", "claims": "Test Claims"}], f)
+        fd, self.companies_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"companies": [{
+                "name": "Test Company",
+                "products": [{"name": "Test Product", "description": "Test Description"}]
+            }]}, f)
+
+        self.llm_service = FakeAsyncLLM()
+        self.opensearch_client = MagicMock()
+        self.opensearch_client.close = AsyncMock()
+        self.opensearch_client.fuzzy_search_company = AsyncMock(return_value=[])
+        self.patent_service = PatentService(
+            opensearch_client=MagicMock(),
+            patent_store=PatentStore(self.patents_file),
+            similarity_index=MagicMock(),
+            company_catalog=CompanyCatalog(self.companies_file),
+            llm_service=self.llm_service,
+            analysis_cache=AnalysisCache()
+        )
+        self.service = AsyncPatentService(
+            self.app, self.patent_service, opensearch_client=self.opensearch_client)
+
+    def tearDown(self):
+        asyncio.run(self.service.close())
+        os.remove(self.patents_file)
+        os.remove(self.companies_file)
+        super().tearDown()
+
+    def test_check_infringement(self):
+        """Test the analysis awaits the async LLM and is then served from cache"""
+        result = asyncio.run(self.service.check_infringement("12345", "Test Company"))
+        cached = asyncio.run(self.service.check_infringement("12345", "Test Company"))
+
+        self.assertFalse(result['cached'])
+        self.assertEqual(result['top_infringing_products'][0]['product_name'], "Test Product")
+        self.assertTrue(cached['cached'])
+        self.assertEqual(len(self.llm_service.prompts), 1)
+
+    def test_blocking_steps_run_off_the_event_loop(self):
+        """Test company matching, screening and prompt building use the thread pool"""
+        threads = {}
+
+        def recorded(name, func):
+            def run(*args):
+                threads[name] = threading.current_thread()
+                return func(*args)
+            return run
+
+        for name in ('get_company_data', 'prepare_pair', 'format_analysis_prompt'):
+            setattr(self.patent_service, name, recorded(name, getattr(self.patent_service, name)))
+
+        result = asyncio.run(self.service.check_infringement("12345", "Test Company"))
+
+        self.assertFalse(result['cached'])
+        self.assertEqual(sorted(threads), ['format_analysis_prompt', 'get_company_data', 'prepare_pair'])
+        for thread in threads.values():
+            self.assertTrue(thread.name.startswith('patlytics-async'))
+
+    def test_check_infringement_missing_patent(self):
+        """Test an unknown patent returns the lookup error without an LLM call"""
+        result = asyncio.run(self.service.check_infringement("999", "Test Company"))
+
+        self.assertFalse(result['success'])
+        self.assertEqual(self.llm_service.prompts, [])
+
+    def test_fan_out(self):
+        """Test fan-out analyzes each product with its own awaited call"""
+        result = asyncio.run(self.service.check_infringement(
+            "12345", "Test Company", fan_out=True))
+
+        self.assertEqual(len(self.llm_service.prompts), 1)
+        self.assertEqual(result['top_infringing_products'][0]['infringement_likelihood'], "High")
+
+    def test_company_lookup_falls_back_to_catalog(self):
+        """Test the resident catalog answers when OpenSearch has no match"""
+        result = asyncio.run(self.service.get_company_data_fuzzy("Test Company"))
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['name'], "Test Company")
+        self.opensearch_client.fuzzy_search_company.assert_awaited_once_with(
+            "Test Company", fields=None)
+
+    def test_company_lookup_uses_opensearch_match(self):
+        """Test OpenSearch matches come back with their alternatives"""
+        self.opensearch_client.fuzzy_search_company.return_value = [
+            {"company_name": "Test Company", "score": 9.0,
+             "data": {"name": "Test Company", "products": []}},
+            {"company_name": "Test Co", "score": 6.0, "data": {}}
+        ]
+
+        result = asyncio.run(self.service.get_company_data_fuzzy("Test Compny"))
+
+        self.assertEqual(result['data']['name'], "Test Company")
+        self.assertEqual(result['alternatives'], [{"name": "Test Co", "score": 6.0}])
@@ -0,0 +1,47 @@
+from unittest.mock import MagicMock, patch
+from patlytics.services.container import ServiceContainer
+from patlytics.tests.test_base import TestBase
+
+
+class TestServiceContainer(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.opensearch_client = MagicMock()
+        self.llm_service = MagicMock()
+        self.llm_service.warm_up.return_value = {"test-model": None}
+        self.patchers = [
+            patch('patlytics.utils.opensearch.get_default_client',
+                  return_value=self.opensearch_client),
+            patch('patlytics.services.container.get_default_llm_router',
+                  return_value=self.llm_service),
+            patch('patlytics.services.container.default_patent_store', MagicMock()),
+            patch('patlytics.services.container.default_company_catalog', MagicMock()),
+            patch('patlytics.services.container.default_similarity_index', MagicMock())
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        self.container = ServiceContainer()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        super().tearDown()
+
+    def test_patent_service_is_built_once(self):
+        """Test every request gets the same service and clients"""
+        service = self.container.patent_service
+
+        self.assertIs(self.container.patent_service, service)
+        self.assertIs(service.llm_service, self.llm_service)
+        self.assertIs(service.opensearch_client, self.opensearch_client)
+
+    def test_warm_up(self):
+        """Test warm-up opens connections and reports failing steps"""
+        self.opensearch_client.warm_up.side_effect = ConnectionError("unreachable")
+
+        result = self.container.warm_up()
+
+        self.assertIn("unreachable", result['opensearch']['error'])
+        self.assertIsNone(result['llm']['error'])
+        self.assertIsNone(result['patent_service']['error'])
+        self.llm_service.warm_up.assert_called_once()
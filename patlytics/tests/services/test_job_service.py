@@ -0,0 +1,65 @@
+import threading
+import time
+from patlytics.services.job_service import JobManager
+from patlytics.tests.test_base import TestBase
+
+
+class TestJobManager(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.jobs = JobManager(max_workers=1, max_pending=1, result_ttl=60)
+
+    def wait_for(self, job_id, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.jobs.get(job_id)
+            if job['status'] in ('succeeded', 'failed'):
+                return job
+            time.sleep(0.01)
+        self.fail(f"Job {job_id} did not finish")
+
+    def test_job_succeeds(self):
+        """Test a job's result is available once it finishes"""
+        job_id = self.jobs.submit(lambda a, b: a + b, 1, b=2)
+
+        job = self.wait_for(job_id)
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result'], 3)
+
+    def test_job_fails(self):
+        """Test exceptions are reported as failed jobs"""
+        def boom():
+            raise ValueError("boom")
+
+        job = self.wait_for(self.jobs.submit(boom))
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('boom', job['error'])
+
+    def test_job_fails_on_error_status(self):
+        """Test a (result, status) return of 400 or more marks the job failed"""
+        job = self.wait_for(self.jobs.submit(
+            lambda: ({"success": False, "error": "Patent ID not found."}, 404)))
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], "Patent ID not found.")
+        self.assertEqual(job['result']['success'], False)
+
+        job = self.wait_for(self.jobs.submit(lambda: ({"cached": True}, 200)))
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result'], {"cached": True})
+
+    def test_queue_is_bounded(self):
+        """Test submissions beyond workers + pending are rejected"""
+        release = threading.Event()
+        running = self.jobs.submit(release.wait)
+        queued = self.jobs.submit(release.wait)
+
+        self.assertIsNone(self.jobs.submit(release.wait))
+
+        release.set()
+        self.wait_for(running)
+        self.wait_for(queued)
+        self.assertIsNotNone(self.jobs.submit(lambda: None))
+
+    def test_unknown_job(self):
+        """Test unknown job ids return None"""
+        self.assertIsNone(self.jobs.get("missing"))
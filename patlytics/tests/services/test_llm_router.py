@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+from patlytics.services.llm_router import LLMRouter
+from patlytics.tests.test_base import TestBase
+
+
+def make_service(name, answer=None, release=None):
+    """LLM service mock; with `release`, calls wait on the event first"""
+    def analyze_patent(prompt):
+        if release is not None:
+            release.wait(5)
+        return answer or {"analyses": [{"product_name": name}]}
+
+    service = MagicMock()
+    service.model_name = name
+    service.generation_config = {}
+    service.analyze_patent.side_effect = analyze_patent
+    return service
+
+
+def make_async_service(name, delay=0.0):
+    """LLM service mock with a non-blocking analyze_patent_async"""
+    async def analyze_patent_async(prompt):
+        await asyncio.sleep(delay)
+        return {"analyses": [{"product_name": name}]}
+
+    service = make_service(name)
+    service.analyze_patent_async.side_effect = analyze_patent_async
+    return service
+
+
+class TestLLMRouter(TestBase):
+    def test_routes_to_fastest_provider(self):
+        """Test calls go to the provider with the lowest rolling p50"""
+        slow, fast = make_service("slow"), make_service("fast")
+        router = LLMRouter([slow, fast], hedge=False, min_samples=1)
+        router.stats["slow"].record(900, True)
+        router.stats["fast"].record(100, True)
+
+        result = router.analyze_patent("prompt")
+
+        self.assertEqual(result['analyses'][0]['product_name'], "fast")
+        slow.analyze_patent.assert_not_called()
+
+    def test_skips_unhealthy_provider(self):
+        """Test a provider above the error rate is tried last"""
+        flaky, steady = make_service("flaky"), make_service("steady")
+        router = LLMRouter([flaky, steady], hedge=False, min_samples=2,
+                           max_error_rate=0.5)
+        for _ in range(3):
+            router.stats["flaky"].record(10, False)
+        router.stats["steady"].record(500, True)
+
+        self.assertEqual(router.ranked(), [steady, flaky])
+
+    def test_demoted_provider_is_measured_again(self):
+        """Test a provider demoted by errors is tried first once its samples expire"""
+        now = [0.0]
+        flaky, steady = make_service("flaky"), make_service("steady")
+        router = LLMRouter([flaky, steady], hedge=False, min_samples=2,
+                           max_error_rate=0.5, sample_ttl=60, clock=lambda: now[0])
+        for _ in range(3):
+            router.stats["flaky"].record(10, False)
+        router.stats["steady"].record(500, True)
+        self.assertEqual(router.ranked(), [steady, flaky])
+
+        now[0] = 30
+        router.stats["steady"].record(500, True)
+        now[0] = 61
+        self.assertEqual(router.ranked(), [flaky, steady])
+
+        router.analyze_patent("prompt")
+        flaky.analyze_patent.assert_called_once()
+        # Recovered and faster: it keeps the traffic
+        self.assertEqual(router.ranked()[0], flaky)
+
+    def test_error_only_provider_ranks_after_measured(self):
+        """Test a provider whose few calls all failed does not rank first"""
+        broken, ok = make_service("broken"), make_service("ok")
+        router = LLMRouter([broken, ok], hedge=False, min_samples=5)
+        router.stats["broken"].record(10, False)
+        router.stats["broken"].record(10, False)
+        router.stats["ok"].record(800, True)
+
+        self.assertEqual(router.ranked(), [ok, broken])
+
+        result = router.analyze_patent("prompt")
+        self.assertEqual(result['analyses'][0]['product_name'], "ok")
+        broken.analyze_patent.assert_not_called()
+
+    def test_fails_over_on_error_answer(self):
+        """Test an error answer is retried on the next provider"""
+        broken = make_service("broken", answer={"error": "quota", "analyses": []})
+        backup = make_service("backup")
+        router = LLMRouter([broken, backup], hedge=False)
+
+        result = router.analyze_patent("prompt")
+
+        self.assertEqual(result['analyses'][0]['product_name'], "backup")
+        self.assertEqual(router.stats["broken"].error_rate(), 1.0)
+
+    def test_hedges_slow_provider(self):
+        """Test a duplicate request wins once the first exceeds its p95"""
+        release = threading.Event()
+        stuck = make_service("stuck", release=release)
+        backup = make_service("backup")
+        router = LLMRouter([stuck, backup], hedge=True, min_samples=1)
+        router.stats["stuck"].record(10, True)
+        router.stats["backup"].record(20, True)
+
+        try:
+            result = router.analyze_patent("prompt")
+        finally:
+            release.set()
+
+        self.assertEqual(result['analyses'][0]['product_name'], "backup")
+        stuck.analyze_patent.assert_called_once()
+
+    def test_async_hedge_cancels_slow_provider(self):
+        """Test the async path hedges too and cancels the losing call"""
+        stuck = make_async_service("stuck", delay=5)
+        backup = make_async_service("backup")
+        router = LLMRouter([stuck, backup], hedge=True, min_samples=1)
+        router.stats["stuck"].record(10, True)
+        router.stats["backup"].record(20, True)
+
+        result = asyncio.run(
+            asyncio.wait_for(router.analyze_patent_async("prompt"), timeout=2))
+
+        self.assertEqual(result['analyses'][0]['product_name'], "backup")
+        stuck.analyze_patent.assert_not_called()
+        # Only the winning call completed and was recorded
+        self.assertEqual(len(router.stats["stuck"]), 1)
@@ -1,13 +1,24 @@
-from unittest.mock import patch, mock_open
+import sys
+import threading
+import time
+from unittest.mock import MagicMock, patch
 from patlytics.tests.test_base import TestBase
+from patlytics.database import db
+from patlytics.database.models import Company, Patent, Report
+from patlytics.services.analysis_cache import AnalysisCache
 from patlytics.services.patent_service import PatentService
+from patlytics.utils.company_catalog import CompanyCatalog
+from patlytics.utils.patent_store import PatentStore
 import json
+import os
+import tempfile
 
 
 class TestPatentService(TestBase):
     def setUp(self):
         super().setUp()
         self.patent_service = PatentService()
+        self.patent_service.analysis_cache = AnalysisCache()
         self.test_patent_data = [
             {
                 "id": "12345",
@@ -15,6 +26,10 @@ class TestPatentService(TestBase):
                 "claims": "Test Claims"
             }
         ]
+        fd, self.patents_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.test_patent_data, f)
+        self.patent_service.patent_store = PatentStore(self.patents_file)
 
         self.test_company_data = {
             "companies": [
@@ -29,43 +44,99 @@ class TestPatentService(TestBase):
                 }
             ]
         }
+        fd, self.companies_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.test_company_data, f)
+        self.patent_service.company_catalog = CompanyCatalog(
+            self.companies_file)
+
+    def tearDown(self):
+        os.remove(self.patents_file)
+        os.remove(self.companies_file)
+        super().tearDown()
 
     def test_get_patent_data(self):
         """Test getting patent data"""
-        with patch("builtins.open", mock_open(read_data=json.dumps(self.test_patent_data))):
-            result = self.patent_service.get_patent_data("12345")
+        result = self.patent_service.get_patent_data("12345")
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['title'], 'Test Patent')
+        self.assertEqual(result['data']['claims'], 'Test Claims')
+
+    def test_find_similar_patents(self):
+        """Test similar patents come back with their title and score"""
+        self.patent_service.similarity_index = MagicMock()
+        self.patent_service.similarity_index.search.return_value = [(12345, 0.42)]
+
+        result = self.patent_service.find_similar_patents("Test Product", 5)
 
-            self.assertTrue(result['success'])
-            self.assertEqual(result['data']['title'], 'Test Patent')
-            self.assertEqual(result['data']['claims'], 'Test Claims')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], [{
+            "id": 12345,
+            "publication_number": "",
+            "title": "Test Patent",
+            "score": 0.42
+        }])
+        self.patent_service.similarity_index.search.assert_called_once_with(
+            "Test Product", 5)
 
     def test_get_patent_data_not_found(self):
         """Test getting non-existent patent"""
-        with patch("builtins.open", mock_open(read_data=json.dumps(self.test_patent_data))):
-            result = self.patent_service.get_patent_data("99999")
+        result = self.patent_service.get_patent_data("99999")
 
-            self.assertFalse(result['success'])
-            self.assertIn('not found', result['error'])
+        self.assertFalse(result['success'])
+        self.assertIn('not found', result['error'])
 
     def test_get_company_data(self):
         """Test getting company data"""
-        with patch("builtins.open", mock_open(read_data=json.dumps(self.test_company_data))):
-            result = self.patent_service.get_company_data("Test Company")
+        result = self.patent_service.get_company_data("Test Company")
 
-            self.assertTrue(result['success'])
-            self.assertEqual(result['data']['name'], 'Test Company')
-            self.assertEqual(len(result['data']['products']), 1)
-            self.assertEqual(result['data']['products']
-                             [0]['name'], 'Test Product')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['name'], 'Test Company')
+        self.assertEqual(len(result['data']['products']), 1)
+        self.assertEqual(result['data']['products']
+                         [0]['name'], 'Test Product')
+
+    def test_get_company_data_fuzzy_name(self):
+        """Test a misspelled company name still matches"""
+        result = self.patent_service.get_company_data("test compnay")
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data']['name'], 'Test Company')
 
     def test_get_company_data_not_found(self):
         """Test getting non-existent company"""
-        with patch("builtins.open", mock_open(read_data=json.dumps(self.test_company_data))):
-            result = self.patent_service.get_company_data(
-                "Non Existent Company")
+        result = self.patent_service.get_company_data(
+            "Non Existent Company")
+
+        self.assertFalse(result['success'])
+        self.assertIn('not found', result['error'])
 
-            self.assertFalse(result['success'])
-            self.assertIn('not found', result['error'])
+    def test_get_company_data_batch(self):
+        """Test resolving many company names at once"""
+        results = self.patent_service.get_company_data_batch(
+            ["Test Company", "Non Existent Company", "test compnay"])
+
+        self.assertEqual([r['success'] for r in results], [True, False, True])
+        self.assertEqual(results[2]['data']['name'], 'Test Company')
+
+    def test_forward_company_name(self):
+        """Test listing company names"""
+        result = self.patent_service.forward_company_name()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['data'], ['Test Company'])
+        self.assertIsNone(result['next_cursor'])
+        self.assertEqual(
+            result['version'], self.patent_service.company_catalog.version)
+
+    def test_forward_company_name_query(self):
+        """Test typeahead filtering of company names"""
+        self.assertEqual(
+            self.patent_service.forward_company_name("comp")['data'],
+            ['Test Company'])
+        self.assertEqual(
+            self.patent_service.forward_company_name("acme")['data'], [])
 
     @patch('patlytics.services.gemini_service.GeminiService')
     def test_check_infringement(self, mock_gemini):
@@ -81,22 +152,264 @@ class TestPatentService(TestBase):
             ]
         }
         mock_gemini.return_value.analyze_patent.return_value = mock_analysis
+        mock_gemini.return_value.model_name = "test-model"
+        mock_gemini.return_value.generation_config = {}
+        self.patent_service.llm_service = mock_gemini.return_value
+
+        result = self.patent_service.check_infringement(
+            "12345", "Test Company")
+
+        self.assertIn('patent_id', result)
+        self.assertIn('company_name', result)
+        self.assertIn('top_infringing_products', result)
+        self.assertEqual(len(result['top_infringing_products']), 1)
+        self.assertEqual(result['top_infringing_products']
+                         [0]['product_name'], 'Test Product')
+
+        self.assertFalse(result['cached'])
+
+        cached_result = self.patent_service.check_infringement(
+            "12345", "Test Company")
+        self.assertTrue(cached_result['cached'])
+        self.assertEqual(cached_result['cache_key'], result['cache_key'])
+        mock_gemini.return_value.analyze_patent.assert_called_once()
+
+    def test_failed_analysis_is_not_cached_or_saved(self):
+        """Test a failed LLM answer keeps its error and is neither cached nor saved"""
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.generation_config = {}
+        llm.analyze_patent.return_value = {
+            "error": "All LLM providers failed", "analyses": []}
+        self.patent_service.llm_service = llm
+
+        result = self.patent_service.check_infringement("12345", "Test Company")
+
+        self.assertEqual(result['error'], "All LLM providers failed")
+        self.assertIsNone(result['cache_key'])
+        self.patent_service.check_infringement("12345", "Test Company")
+        self.assertEqual(llm.analyze_patent.call_count, 2)
+
+        # patlytics.routes re-exports the blueprint under the module's name
+        from patlytics.routes.patent_bp import _analyze_infringement
+        routes = sys.modules[_analyze_infringement.__module__]
+        self.patent_service.get_company_data_fuzzy = MagicMock(return_value={
+            "success": True, "data": {"name": "Test Company"}})
+        self.patent_service.save_analysis = MagicMock()
+        with patch.object(routes, 'default_container') as container:
+            container.patent_service = self.patent_service
+            result, status = _analyze_infringement("12345", "Test Compny", uid=1)
+
+        self.assertEqual(status, 200)
+        self.assertIn('error', result)
+        self.patent_service.save_analysis.assert_not_called()
+
+    def make_fan_out_llm(self, likelihoods, blocked=None):
+        """LLM mock answering per product; `blocked` products wait on an event"""
+        release = threading.Event()
+
+        def analyze_patent(prompt):
+            for name, likelihood in likelihoods.items():
+                if f"Name: {name}" in prompt:
+                    if name == blocked:
+                        release.wait(5)
+                    return {
+                        "analyses": [{
+                            "product_name": name,
+                            "infringement_likelihood": likelihood,
+                            "claims_at_issue": [1],
+                            "explanation": f"{name} explanation"
+                        }],
+                        "overall_risk_assessment": f"{likelihood} risk"
+                    }
+
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.generation_config = {}
+        llm.analyze_patent.side_effect = analyze_patent
+        self.patent_service.llm_service = llm
+        return release
+
+    def set_products(self, names):
+        self.test_company_data['companies'][0]['products'] = [
+            {"name": name, "description": f"{name} test patent description"} for name in names
+        ]
+        with open(self.companies_file, 'w') as f:
+            json.dump(self.test_company_data, f)
+        self.patent_service.company_catalog = CompanyCatalog(
+            self.companies_file)
 
-        patent_mock = mock_open(read_data=json.dumps(self.test_patent_data))
-        company_mock = mock_open(read_data=json.dumps(self.test_company_data))
+    def test_check_infringement_fan_out(self):
+        """Test per-product analyses are merged and ranked"""
+        self.set_products(["Low One", "High One", "Medium One"])
+        self.make_fan_out_llm(
+            {"Low One": "Low", "High One": "High", "Medium One": "Medium"})
 
-        def mock_open_factory(*args, **kwargs):
-            if 'patents.json' in args[0]:
-                return patent_mock()
-            return company_mock()
+        result = self.patent_service.check_infringement(
+            "12345", "Test Company", fan_out=True)
 
-        with patch("builtins.open", mock_open_factory):
+        self.assertEqual(
+            [p['product_name'] for p in result['top_infringing_products']],
+            ["High One", "Medium One"])
+        self.assertIn("High One: High risk", result['overall_risk_assessment'])
+        self.assertEqual(
+            self.patent_service.llm_service.analyze_patent.call_count, 3)
+
+    def test_check_infringement_fan_out_partial_failure(self):
+        """Test one failed product answer does not fail the other products"""
+        self.set_products(["Low One", "Broken One", "High One"])
+        self.make_fan_out_llm({"Low One": "Low", "High One": "High"})
+        answer = self.patent_service.llm_service.analyze_patent.side_effect
+
+        def analyze_patent(prompt):
+            if "Name: Broken One" in prompt:
+                return {"error": "Error parsing patent analysis response.", "analyses": []}
+            return answer(prompt)
+        self.patent_service.llm_service.analyze_patent.side_effect = analyze_patent
+
+        result = self.patent_service.check_infringement(
+            "12345", "Test Company", fan_out=True)
+
+        self.assertNotIn('error', result)
+        self.assertEqual(
+            [p['product_name'] for p in result['top_infringing_products']],
+            ["High One", "Low One"])
+        self.assertEqual(result['failed_products'], [{
+            "product_name": "Broken One",
+            "error": "Error parsing patent analysis response."}])
+        # Not reused, so the failed product is retried next time
+        self.assertIsNone(result['cache_key'])
+
+    def test_check_infringement_fan_out_early_return(self):
+        """Test the response does not wait once the top 2 are settled"""
+        self.set_products(["First", "Second", "Slow"])
+        release = self.make_fan_out_llm(
+            {"First": "High", "Second": "High", "Slow": "High"}, blocked="Slow")
+
+        try:
+            start = time.monotonic()
             result = self.patent_service.check_infringement(
-                "12345", "Test Company")
-
-            self.assertIn('patent_id', result)
-            self.assertIn('company_name', result)
-            self.assertIn('top_infringing_products', result)
-            self.assertEqual(len(result['top_infringing_products']), 1)
-            self.assertEqual(result['top_infringing_products']
-                             [0]['product_name'], 'Test Product')
+                "12345", "Test Company", fan_out=True)
+            self.assertLess(time.monotonic() - start, 2)
+            self.assertEqual(
+                [p['product_name'] for p in result['top_infringing_products']],
+                ["First", "Second"])
+        finally:
+            release.set()
+
+    def test_stream_infringement(self):
+        """Test analyses are streamed as they complete, then the result"""
+        self.set_products(["First", "Second"])
+        answer = json.dumps({
+            "analyses": [
+                {"product_name": "First", "infringement_likelihood": "Low"},
+                {"product_name": "Second", "infringement_likelihood": "High"}
+            ],
+            "overall_risk_assessment": "Moderate risk"
+        })
+        llm = MagicMock()
+        llm.model_name = "test-model"
+        llm.generation_config = {}
+        llm.analyze_patent_stream.return_value = iter(
+            ["```json\n"] + [answer[i:i + 7] for i in range(0, len(answer), 7)] + ["\n```"])
+        self.patent_service.llm_service = llm
+
+        events = list(self.patent_service.stream_infringement(
+            "12345", "Test Company"))
+
+        self.assertEqual(
+            [event for event, _ in events], ["analysis", "analysis", "complete"])
+        self.assertEqual(events[0][1]['product_name'], "First")
+        result = events[-1][1]
+        self.assertEqual(
+            [p['product_name'] for p in result['top_infringing_products']],
+            ["Second", "First"])
+        self.assertEqual(result['overall_risk_assessment'], "Moderate risk")
+        self.assertFalse(result['cached'])
+
+        cached_events = list(self.patent_service.stream_infringement(
+            "12345", "Test Company"))
+        self.assertTrue(cached_events[-1][1]['cached'])
+        llm.analyze_patent_stream.assert_called_once()
+
+    def test_check_infringement_matrix(self):
+        """Test duplicate pairs share one analysis and unknown inputs are reported"""
+        self.make_fan_out_llm({"Test Product": "Medium"})
+
+        events = list(self.patent_service.check_infringement_matrix(
+            ["12345", "12345", "99999"],
+            ["Test Company", "test company", "Acme Corp"]))
+
+        pairs = [data for event, data in events if event == "pair"]
+        self.assertEqual(len(pairs), 1)
+        self.assertEqual(pairs[0]['input_companies'],
+                         ["Test Company", "test company"])
+        self.assertEqual(
+            self.patent_service.llm_service.analyze_patent.call_count, 1)
+
+        event, summary = events[-1]
+        self.assertEqual(event, "summary")
+        self.assertEqual(summary['matrix']['12345'], {
+            "Test Company": "Medium",
+            "test company": "Medium",
+            "Acme Corp": None
+        })
+        self.assertEqual(summary['matrix']['99999'], {
+            "Test Company": None,
+            "test company": None,
+            "Acme Corp": None
+        })
+        self.assertEqual(len(summary['errors']), 2)
+
+        # A second run is served from the cache
+        list(self.patent_service.check_infringement_matrix(
+            ["12345"], ["Test Company"]))
+        self.assertEqual(
+            self.patent_service.llm_service.analyze_patent.call_count, 1)
+
+    def test_save_analyses(self):
+        """Test reports are saved in one batch with their company ids"""
+        user = self.create_test_user()
+        company = Company(name="Test Company")
+        db.session.add_all([company, Patent(patent_id=12345, title="Test Patent")])
+        db.session.commit()
+
+        saved = self.patent_service.save_analyses(user.id, [
+            {
+                "patent_id": 12345,
+                "matched_company": "Test Company",
+                "input_company": input_company,
+                "analysis": {"overall_risk_assessment": "Low"},
+                "cache_key": "k"
+            }
+            for input_company in ["Test Company", "test co"]
+        ])
+
+        self.assertTrue(saved['success'])
+        self.assertEqual(len(saved['data']), 2)
+        reports = Report.query.filter(Report.id.in_(saved['data'])).all()
+        self.assertEqual({report.company_id for report in reports}, {company.id})
+        self.assertEqual({report.input_company for report in reports},
+                         {"Test Company", "test co"})
+
+    def test_check_infringement_screens_products(self):
+        """Test products unrelated to the patent are not sent to the LLM"""
+        self.test_company_data['companies'][0]['products'] = [
+            {"name": "Claims Tool", "description": "Test patent claims tool"},
+            {"name": "Tractor", "description": "Grain harvesting machine"}
+        ]
+        with open(self.companies_file, 'w') as f:
+            json.dump(self.test_company_data, f)
+        self.patent_service.company_catalog = CompanyCatalog(
+            self.companies_file)
+        self.make_fan_out_llm({"Claims Tool": "Medium", "Tractor": "High"})
+
+        result = self.patent_service.check_infringement(
+            "12345", "Test Company")
+
+        prompt = self.patent_service.llm_service.analyze_patent.call_args[0][0]
+        self.assertIn("Name: Claims Tool", prompt)
+        self.assertNotIn("Name: Tractor", prompt)
+        self.assertEqual(result['screened_out_products'], [
+            {"product_name": "Tractor", "screening_score": 0.0}
+        ])
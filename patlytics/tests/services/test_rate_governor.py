@@ -0,0 +1,132 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+from patlytics.services.rate_governor import (
+    GovernedLLMService,
+    RateGovernor,
+    UserQuota,
+    is_retryable
+)
+from patlytics.tests.test_base import TestBase
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+class NoJitter:
+    @staticmethod
+    def uniform(low, high):
+        return 0.0
+
+
+def make_service(*outcomes):
+    """LLM service mock answering with, or raising, each outcome in turn"""
+    service = MagicMock(spec=['model_name', 'generation_config', 'analyze_patent'])
+    service.model_name = "test-model"
+    service.generation_config = {}
+    service.analyze_patent.side_effect = list(outcomes)
+    return service
+
+
+class TestRateGovernor(TestBase):
+    def test_waits_for_token_capacity(self):
+        """Test a call waits until the token bucket has refilled enough"""
+        governor = RateGovernor("test", requests_per_minute=6000, tokens_per_minute=600)
+        governor.acquire(600)
+
+        start = time.monotonic()
+        governor.acquire(3)
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+        self.assertEqual(governor.queue_depth, 0)
+
+    def test_times_out_without_capacity(self):
+        """Test a call that cannot get capacity within max_wait fails fast"""
+        governor = RateGovernor("test", requests_per_minute=1, tokens_per_minute=600,
+                                max_wait=0.1)
+        governor.acquire(1)
+
+        with self.assertRaises(TimeoutError):
+            governor.acquire(1)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(governor.acquire_async(1))
+
+    def test_rejects_beyond_max_queue(self):
+        """Test no more than max_queue calls wait at once"""
+        governor = RateGovernor("test", requests_per_minute=1, tokens_per_minute=600,
+                                max_queue=0)
+        governor.acquire(1)
+
+        with self.assertRaisesRegex(TimeoutError, "already waiting"):
+            governor.acquire(1)
+
+    def test_retryable_errors(self):
+        """Test rate limits and transient errors are retryable, others not"""
+        self.assertTrue(is_retryable(QuotaError()))
+        self.assertTrue(is_retryable(APIConnectionError()))
+        self.assertFalse(is_retryable(ValueError("bad request")))
+
+
+class TestGovernedLLMService(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.governor = RateGovernor("test-model", requests_per_minute=6000,
+                                     tokens_per_minute=10_000_000)
+
+    def test_retries_rate_limited_call(self):
+        """Test a 429 is retried with backoff and throttles the governor"""
+        answer = {"analyses": [{"product_name": "Test Product"}]}
+        service = make_service(QuotaError("quota"), answer)
+        governed = GovernedLLMService(service, self.governor, retries=2, rng=NoJitter)
+
+        self.assertEqual(governed.analyze_patent("prompt"), answer)
+        self.assertEqual(service.analyze_patent.call_count, 2)
+        self.assertLess(self.governor.requests.level, 1)
+
+    def test_raises_after_retries(self):
+        """Test the last error is raised instead of a made-up answer"""
+        service = make_service(*[QuotaError("quota")] * 3)
+        governed = GovernedLLMService(service, self.governor, retries=2, rng=NoJitter)
+
+        with self.assertRaises(QuotaError):
+            governed.analyze_patent("prompt")
+        self.assertEqual(service.analyze_patent.call_count, 3)
+
+    def test_does_not_retry_other_errors(self):
+        """Test a non-retryable error is raised right away"""
+        service = make_service(ValueError("bad request"))
+        governed = GovernedLLMService(service, self.governor, retries=2, rng=NoJitter)
+
+        with self.assertRaises(ValueError):
+            governed.analyze_patent("prompt")
+        self.assertEqual(service.analyze_patent.call_count, 1)
+
+    def test_async_falls_back_to_blocking_service(self):
+        """Test the async path retries too, on a service without an async method"""
+        answer = {"analyses": []}
+        service = make_service(APIConnectionError(), answer)
+        governed = GovernedLLMService(service, self.governor, retries=1, rng=NoJitter)
+
+        self.assertEqual(asyncio.run(governed.analyze_patent_async("prompt")), answer)
+
+
+class TestUserQuota(TestBase):
+    def test_limits_concurrent_analyses_per_user(self):
+        """Test a user beyond the quota is refused until a slot is released"""
+        quota = UserQuota(max_per_user=2)
+
+        self.assertTrue(quota.acquire(1))
+        self.assertTrue(quota.acquire(1))
+        self.assertFalse(quota.acquire(1))
+        self.assertTrue(quota.acquire(2))
+
+        quota.release(1)
+        with quota.slot(1) as acquired:
+            self.assertTrue(acquired)
+            self.assertEqual(quota.active(1), 2)
+        self.assertEqual(quota.active(1), 1)
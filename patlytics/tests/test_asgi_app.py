@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock
+from patlytics.asgi_app import AsyncPatlyticsApp, _client_address
+from patlytics.services.async_patent_service import AsyncPatentService
+from patlytics.tests.test_base import TestBase
+
+
+def call(app, method, path, body=b'', query=b'', headers=()):
+    """Run one HTTP request through an ASGI app; returns (status, headers, body)"""
+    scope = {
+        'type': 'http', 'http_version': '1.1', 'method': method, 'path': path,
+        'query_string': query, 'headers': list(headers)
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return (start['status'], dict(start['headers']),
+            b''.join(message.get('body', b'') for message in sent[1:]))
+
+
+class TestAsyncPatlyticsApp(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.patent_service = MagicMock()
+        self.opensearch_client = MagicMock()
+        self.opensearch_client.close = AsyncMock()
+        container = MagicMock()
+        container.patent_service = self.patent_service
+        self.asgi_app = AsyncPatlyticsApp(self.app, container)
+        self.asgi_app._service = AsyncPatentService(
+            self.app, self.patent_service, opensearch_client=self.opensearch_client)
+
+    def tearDown(self):
+        asyncio.run(self.asgi_app.service.close())
+        super().tearDown()
+
+    def test_patent_and_company_load_concurrently(self):
+        """Test the patent is loaded while the company is being resolved"""
+        company_resolved = threading.Event()
+
+        def get_patent_data(patent_id):
+            # Only succeeds if the company lookup runs at the same time
+            return {"success": company_resolved.wait(2), "error": "Patent ID not found."}
+
+        async def fuzzy_search_company(name, fields=None):
+            company_resolved.set()
+            return [{"company_name": "Test Company", "score": 9.0,
+                     "data": {"name": "Test Company", "products": []}}]
+
+        self.patent_service.get_patent_data.side_effect = get_patent_data
+        self.opensearch_client.fuzzy_search_company = fuzzy_search_company
+        self.asgi_app.service.check_infringement = AsyncMock(return_value={"cached": True})
+
+        status, _, body = call(self.asgi_app, 'POST', '/api/patent/infringements', json.dumps({
+            "patent_id": "12345", "company_name": "Test Compny"
+        }).encode())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['matched_company'], "Test Company")
+        patent_result = self.asgi_app.service.check_infringement.await_args.kwargs['patent_result']
+        self.assertTrue(patent_result['success'])
+
+    def test_client_address_behind_proxy(self):
+        """Test anonymous callers are told apart by the address the proxy forwarded"""
+        scope = {'client': ('10.0.0.2', 443), 'headers': [
+            (b'x-forwarded-for', b'6.6.6.6, 203.0.113.7')]}
+
+        self.assertEqual(_client_address(scope, trusted_proxies=1), '203.0.113.7')
+        self.assertEqual(_client_address(scope, trusted_proxies=2), '6.6.6.6')
+        self.assertEqual(_client_address(scope, trusted_proxies=3), '10.0.0.2')
+        self.assertEqual(_client_address(scope, trusted_proxies=0), '10.0.0.2')
+
+    def test_missing_parameters(self):
+        """Test the async route validates its body like the Flask one"""
+        status, _, body = call(self.asgi_app, 'POST', '/api/patent/infringements', b'{}')
+
+        self.assertEqual(status, 400)
+        self.assertEqual(json.loads(body), {'error': 'Missing required parameters'})
+
+    def test_fuzzy_find_company_revalidates(self):
+        """Test the company list sends its ETag and answers 304 when unchanged"""
+        threads = []
+
+        def forward_company_name(*args):
+            threads.append(threading.current_thread().name)
+            return {"success": True, "data": ["Test Company"], "next_cursor": None,
+                    "version": "v1"}
+        self.patent_service.forward_company_name.side_effect = forward_company_name
+
+        status, headers, body = call(self.asgi_app, 'GET', '/api/patent/fuzzy_find_company',
+                                     query=b'q=test&limit=500')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'etag'], b'"v1"')
+        self.assertEqual(json.loads(body)['data'], ["Test Company"])
+        self.patent_service.forward_company_name.assert_called_with('test', 100, 0)
+        # The catalog lookup runs on the blocking pool, not the event loop
+        self.assertTrue(threads[0].startswith('patlytics-async'))
+
+        status, _, body = call(self.asgi_app, 'GET', '/api/patent/fuzzy_find_company',
+                               headers=[(b'if-none-match', b'"v1"')])
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+    def test_other_routes_go_to_flask(self):
+        """Test requests without an async route are served by the Flask app"""
+        @self.app.route('/ping')
+        def ping():
+            return "pong"
+
+        status, _, body = call(self.asgi_app, 'GET', '/ping')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(body, b'pong')
@@ -0,0 +1,64 @@
+import json
+import sys
+import threading
+from unittest.mock import patch
+from patlytics.routes.patent_bp import check_infringement, check_infringement_batch
+from patlytics.services.job_service import JobManager
+from patlytics.services.rate_governor import UserQuota
+from patlytics.tests.test_base import TestBase
+
+# patlytics.routes re-exports the blueprint under the module's name
+routes = sys.modules[check_infringement.__module__]
+
+
+class TestPatentRoutes(TestBase):
+    def post_batch(self, body):
+        with self.app.test_request_context(
+                '/api/patent/infringements/batch', method='POST', json=body):
+            response, status = check_infringement_batch()
+            return status, json.loads(response.get_data())
+
+    def test_batch_rejects_malformed_elements(self):
+        """Test non-scalar patent ids and empty or non-string company names are a 400"""
+        for body in (
+            {"patent_ids": ["12345"], "company_names": [["Test Company"]]},
+            {"patent_ids": ["12345"], "company_names": [{"name": "Test Company"}]},
+            {"patent_ids": ["12345"], "company_names": [" "]},
+            {"patent_ids": [{"id": 12345}], "company_names": ["Test Company"]},
+            {"patent_ids": [True], "company_names": ["Test Company"]},
+        ):
+            status, result = self.post_batch(body)
+
+            self.assertEqual(status, 400, body)
+            self.assertIn('patent_ids must be', result['error'])
+
+    def test_async_jobs_take_the_user_quota(self):
+        """Test async jobs hold a quota slot until they finish"""
+        release = threading.Event()
+        finished = threading.Event()
+
+        def analyze(*args):
+            release.wait(5)
+            return {"matched_company": "Test Company"}, 200
+
+        def post_async():
+            with self.app.test_request_context(
+                    '/api/patent/infringements?mode=async', method='POST',
+                    json={"patent_id": "12345", "company_name": "Test Company", "uid": 1}):
+                response, status = check_infringement()
+                return status
+
+        quota = UserQuota(max_per_user=1)
+        jobs = JobManager(max_workers=1, max_pending=1, result_ttl=60)
+        with patch.object(routes, 'default_user_quota', quota), \
+                patch.object(routes, 'default_job_manager', jobs), \
+                patch.object(routes, '_analyze_infringement', side_effect=analyze), \
+                patch.object(routes, 'url_for', return_value='/status'):
+            self.assertEqual(post_async(), 202)
+            self.assertEqual(post_async(), 429)
+
+            real_release = quota.release
+            quota.release = lambda user: (real_release(user), finished.set())
+            release.set()
+            self.assertTrue(finished.wait(5))
+            self.assertEqual(quota.active(1), 0)
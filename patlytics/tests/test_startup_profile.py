@@ -0,0 +1,19 @@
+from patlytics.startup_profile import import_memory, import_times
+from patlytics.tests.test_base import TestBase
+
+
+class TestStartupProfile(TestBase):
+    def test_import_times(self):
+        """Test -X importtime output is parsed per module"""
+        times = import_times('json')
+
+        self_us, cumulative_us = times['json']
+        self.assertGreaterEqual(cumulative_us, self_us)
+        self.assertIn('json.decoder', times)
+
+    def test_import_memory(self):
+        """Test memory is attributed to newly imported packages"""
+        probe = import_memory('json')
+
+        self.assertIn('json', probe['memory'])
+        self.assertGreater(probe['max_rss_kb'], 0)
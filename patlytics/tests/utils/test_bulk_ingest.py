@@ -0,0 +1,141 @@
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from opensearchpy import TransportError
+
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.bulk_ingest import BulkIngester, iter_records, normalize_patent
+
+
+class NoJitter:
+    @staticmethod
+    def uniform(low, high):
+        return 0.0
+
+
+def bulk_ids(body: bytes) -> list:
+    """Document ids of a bulk request body"""
+    lines = body.decode().splitlines()
+    return [json.loads(line)['index']['_id'] for line in lines[::2]]
+
+
+class TestBulkIngest(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patents = [
+            {"id": str(i), "title": f"Patent {i}", "inventors": "['A', 'B']",
+             "claims": [], "classifications": None, "citations": "['US-1']"}
+            for i in range(25)
+        ]
+        self.client = MagicMock()
+        self.sent = []
+
+        def bulk(body):
+            ids = bulk_ids(body)
+            self.sent.extend(ids)
+            return {"items": [{"index": {"_id": i, "status": 201}} for i in ids]}
+        self.client.bulk.side_effect = bulk
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def ingester(self, **kwargs) -> BulkIngester:
+        options = {"processes": 0, "threads": 2, "chunk_docs": 10,
+                   "normalize_batch": 4, "rng": NoJitter}
+        return BulkIngester(self.client, **{**options, **kwargs})
+
+    def test_iter_records_reads_json_and_ndjson_incrementally(self):
+        """Test records come out of JSON arrays and NDJSON alike, across read boundaries"""
+        json_path = self.write("companies.json", json.dumps(
+            {"companies": [{"name": "A [1]", "products": []}, {"name": "B", "products": []}]},
+            indent=2))
+        ndjson_path = self.write("patents.ndjson", "\n".join(
+            json.dumps(patent) for patent in self.patents[:3]) + "\n")
+
+        self.assertEqual([r['name'] for r in iter_records(json_path, read_chars=7)], ["A [1]", "B"])
+        self.assertEqual([r['id'] for r in iter_records(ndjson_path)], ["0", "1", "2"])
+
+    def test_normalize_patent(self):
+        """Test list fields exported as Python literals become lists"""
+        patent = normalize_patent({**self.patents[0], "claims": "{'not': 'a list'}"})
+
+        self.assertEqual(patent['inventors'], ['A', 'B'])
+        self.assertEqual(patent['citations'], ['US-1'])
+        self.assertEqual(patent['claims'], [])
+        self.assertEqual(patent['classifications'], [])
+
+    def test_run_indexes_every_record_in_chunks(self):
+        """Test every patent is indexed by id, at most chunk_docs per request"""
+        path = self.write("patents.json", json.dumps(self.patents))
+
+        result = self.ingester().run(path, "patents-test")
+
+        self.assertEqual(result['indexed'], 25)
+        self.assertEqual(sorted(self.sent), list(range(25)))
+        self.assertEqual(self.client.bulk.call_count, 3)
+
+    def test_rejected_documents_are_retried(self):
+        """Test a 429 response and 429 items are resent, shrinking the requests"""
+        path = self.write("patents.json", json.dumps(self.patents[:5]))
+        calls = []
+
+        def bulk(body):
+            ids = bulk_ids(body)
+            calls.append(ids)
+            if len(calls) == 1:
+                raise TransportError(429, "es_rejected_execution_exception")
+            return {"items": [
+                {"index": {"_id": i, "status": 429 if len(calls) == 2 and i == 0 else 201}}
+                for i in ids
+            ]}
+        self.client.bulk.side_effect = bulk
+        ingester = self.ingester()
+
+        result = ingester.run(path, "patents-test")
+
+        self.assertEqual(result['indexed'], 5)
+        self.assertEqual(calls[2], [0])
+        self.assertLess(ingester.sizer.target, ingester.sizer.max_bytes)
+
+    def test_resumes_from_checkpoint(self):
+        """Test a failed load resumes after the records already indexed"""
+        path = self.write("patents.ndjson", "\n".join(json.dumps(p) for p in self.patents))
+        checkpoint = os.path.join(self.tmp.name, "checkpoint")
+        bulk = self.client.bulk.side_effect
+
+        def failing_bulk(body):
+            if 20 in bulk_ids(body):
+                raise TransportError(500, "cluster down")
+            return bulk(body)
+        self.client.bulk.side_effect = failing_bulk
+
+        with self.assertRaises(TransportError):
+            self.ingester(threads=1).run(path, "patents-test", checkpoint_path=checkpoint)
+        with open(checkpoint, encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['records'], 20)
+
+        self.sent.clear()
+        self.client.bulk.side_effect = bulk
+        result = self.ingester().run(path, "patents-test", checkpoint_path=checkpoint)
+
+        self.assertEqual(result['skipped'], 20)
+        self.assertEqual(sorted(self.sent), list(range(20, 25)))
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_normalizes_in_process_pool(self):
+        """Test records normalized in worker processes are all indexed"""
+        path = self.write("patents.json", json.dumps(self.patents))
+
+        result = self.ingester(processes=2).run(path, "patents-test")
+
+        self.assertEqual(result['indexed'], 25)
@@ -0,0 +1,59 @@
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30,
+                                      clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the breaker opens at the threshold and refuses calls"""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_trial_closes_on_success(self):
+        """Test one trial call goes through after the reset timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 30
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_half_open_trial_reopens_on_failure(self):
+        """Test a failed trial opens the breaker for another reset timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 30
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.clock.now = 59
+        self.assertFalse(self.breaker.allow())
+        self.clock.now = 60
+        self.assertTrue(self.breaker.allow())
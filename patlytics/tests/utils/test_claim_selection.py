@@ -0,0 +1,44 @@
+import json
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.claim_selection import (
+    format_claims,
+    is_independent,
+    parse_claims,
+    select_claims
+)
+
+
+class TestClaimSelection(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.claims = json.dumps([
+            {"num": "00001", "text": "1. A shopping list method comprising a mobile device."},
+            {"num": "00002", "text": "2. The method according to claim 1 wherein the advertisement shows groceries."},
+            {"num": "00003", "text": "3. The method of claim 1 wherein the mobile device scans a barcode."},
+            {"num": "00004", "text": "4. The method of claim 3 , wherein a tractor harvests grain."},
+            {"num": "00005", "text": "5. A system comprising a server."}
+        ])
+
+    def test_parse_and_classify(self):
+        """Test claims are parsed and split into independent/dependent"""
+        claims = parse_claims(self.claims)
+
+        self.assertEqual(len(claims), 5)
+        self.assertEqual(
+            [is_independent(claim) for claim in claims],
+            [True, False, False, False, True])
+
+    def test_select_relevant_dependent_claims(self):
+        """Test independent claims are kept and dependents ranked by BM25"""
+        selected = select_claims(
+            parse_claims(self.claims), "mobile app that scans a product barcode", top_k=1)
+
+        self.assertEqual([c['num'] for c in selected], ["00001", "00003", "00005"])
+
+    def test_token_budget(self):
+        """Test dependent claims beyond the budget are dropped"""
+        selected = select_claims(
+            parse_claims(self.claims), "barcode groceries tractor", top_k=5, token_budget=30)
+
+        self.assertEqual([c['num'] for c in selected], ["00001", "00005"])
+        self.assertTrue(format_claims(selected).startswith("1. A shopping list"))
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.company_catalog import CompanyCatalog
+
+
+class TestCompanyCatalog(TestBase):
+    def setUp(self):
+        super().setUp()
+        fd, self.companies_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({"companies": [
+                {"name": "Walmart Inc.", "products": []},
+                {"name": "Target Corporation", "products": []},
+                {"name": "John Deere", "products": []}
+            ]}, f)
+
+    def tearDown(self):
+        os.remove(self.companies_file)
+        super().tearDown()
+
+    def assert_resolves(self, catalog):
+        self.assertEqual(catalog.find("walmart inc")['name'], 'Walmart Inc.')
+        self.assertIsNone(catalog.find("Microsoft"))
+        self.assertEqual(
+            [c and c['name'] for c in catalog.resolve_many(
+                ["target corporatin", "nobody", "john deer"])],
+            ['Target Corporation', None, 'John Deere']
+        )
+        matches = catalog.extract("walmart", threshold=50)
+        self.assertEqual(matches[0][0]['name'], 'Walmart Inc.')
+
+    def test_full_scan(self):
+        """Test matching small catalogs by scoring every name"""
+        catalog = CompanyCatalog(self.companies_file)
+        self.assert_resolves(catalog)
+        self.assertEqual(len(catalog), 3)
+
+    def test_ngram_index(self):
+        """Test matching through the n-gram candidate index"""
+        with patch('patlytics.utils.company_catalog.NGRAM_INDEX_MIN_SIZE', 1):
+            catalog = CompanyCatalog(self.companies_file)
+            self.assert_resolves(catalog)
+            self.assertIsNotNone(catalog._current().ngram_index)
+
+    def test_search(self):
+        """Test prefix/infix typeahead with pagination"""
+        catalog = CompanyCatalog(self.companies_file)
+
+        self.assertEqual(catalog.search("deere"), (['John Deere'], None))
+        self.assertEqual(catalog.search("w"), (['Walmart Inc.'], None))
+        self.assertEqual(
+            catalog.search("", limit=2),
+            (['Walmart Inc.', 'Target Corporation'], 2))
+        self.assertEqual(
+            catalog.search("", limit=2, offset=2), (['John Deere'], None))
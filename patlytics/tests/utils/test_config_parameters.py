@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock
+from cryptography.fernet import Fernet
+from config.parameters import EnvSource, FileSource, ParameterStore, SSMSource
+from patlytics.tests.test_base import TestBase
+
+
+class TestConfigParameters(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.ssm = MagicMock()
+        self.ssm.get_paginator.return_value.paginate.return_value = [
+            {"Parameters": [{"Name": "/patlytics/db/user", "Value": "user"}]},
+            {"Parameters": [{"Name": "/patlytics/secret_key", "Value": "secret"}]}
+        ]
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, 'config.cache')
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+        super().tearDown()
+
+    def test_ssm_loaded_lazily_in_one_batch(self):
+        """Test nothing is fetched until first use, then every page at once"""
+        store = ParameterStore(SSMSource(client=self.ssm))
+        self.ssm.get_paginator.assert_not_called()
+
+        self.assertEqual(store.get('/patlytics/secret_key'), 'secret')
+        self.assertEqual(store.get('/patlytics/db/user'), 'user')
+        self.ssm.get_paginator.assert_called_once_with('get_parameters_by_path')
+        with self.assertRaises(KeyError):
+            store.get('/patlytics/missing')
+
+    def test_encrypted_cache(self):
+        """Test a fresh cache file replaces the SSM call and is encrypted"""
+        key = Fernet.generate_key().decode()
+        ParameterStore(SSMSource(client=self.ssm), self.cache_path, key).get(
+            '/patlytics/db/user')
+        with open(self.cache_path, 'rb') as f:
+            self.assertNotIn(b'secret', f.read())
+
+        other_ssm = MagicMock()
+        store = ParameterStore(SSMSource(client=other_ssm), self.cache_path, key)
+        self.assertEqual(store.get('/patlytics/secret_key'), 'secret')
+        other_ssm.get_paginator.assert_not_called()
+
+        expired = ParameterStore(
+            SSMSource(client=other_ssm), self.cache_path, key, cache_ttl=-1)
+        with self.assertRaises(KeyError):
+            expired.get('/patlytics/secret_key')
+        other_ssm.get_paginator.assert_called_once()
+
+    def test_env_and_file_sources(self):
+        """Test the offline stand-ins for SSM"""
+        store = ParameterStore(EnvSource({"PATLYTICS_DB_TEST_NAME": "test_db"}))
+        self.assertEqual(store.get('/patlytics/db/test_name'), 'test_db')
+
+        file_path = os.path.join(self.cache_dir.name, 'local.json')
+        with open(file_path, 'w') as f:
+            json.dump({"/patlytics/db/port": 3306}, f)
+        store = ParameterStore(FileSource(file_path))
+        self.assertEqual(store.get('/patlytics/db/port'), '3306')
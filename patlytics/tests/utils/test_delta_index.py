@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.bulk_ingest import BulkIngester
+from patlytics.utils.delta_index import DeltaIndexer, Manifest
+
+
+def bulk_actions(body: bytes) -> list:
+    """(action, _id) of each action line of a bulk request body"""
+    actions = []
+    for line in body.decode().splitlines():
+        entry = json.loads(line)
+        action = next(iter(entry))
+        if action in ("index", "delete") and set(entry[action]) == {"_index", "_id"}:
+            actions.append((action, str(entry[action]["_id"])))
+    return actions
+
+
+class TestDeltaIndexer(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmp.name, "patents.manifest")
+        self.patents = {
+            str(i): {"id": str(i), "title": f"Patent {i}", "claims": [],
+                     "inventors": [], "classifications": [], "citations": [],
+                     "updated_at": "2024-11-01"}
+            for i in range(5)
+        }
+        self.client = MagicMock()
+        self.sent = []
+
+        def bulk(body):
+            actions = bulk_actions(body)
+            self.sent.extend(actions)
+            return {"items": [{action: {"_id": doc_id, "status": 200}}
+                              for action, doc_id in actions]}
+        self.client.bulk.side_effect = bulk
+        self.sync_database = MagicMock()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def dump(self) -> str:
+        path = os.path.join(self.tmp.name, "patents.ndjson")
+        with open(path, 'w', encoding='utf-8') as file:
+            for patent in self.patents.values():
+                file.write(json.dumps(patent) + "\n")
+        return path
+
+    def run_delta(self, **kwargs) -> dict:
+        ingester = BulkIngester(self.client, processes=0, threads=1)
+        indexer = DeltaIndexer(self.client, self.manifest_path, ingester, processes=0,
+                               sync_database=self.sync_database)
+        return indexer.run(self.dump(), "patents_v1", "patents", **kwargs)
+
+    def test_baseline_sends_nothing(self):
+        """Test a baseline run only records the dump"""
+        counts = self.run_delta(baseline=True)
+
+        self.assertEqual(counts['inserted'], 5)
+        self.assertEqual(self.sent, [])
+        self.sync_database.assert_not_called()
+        self.assertEqual(len(Manifest(self.manifest_path)), 5)
+
+    def test_ships_only_changes(self):
+        """Test only inserted, updated and deleted patents are sent"""
+        self.run_delta(baseline=True)
+        self.patents["1"].update(title="Retitled", updated_at="2024-11-02")
+        # Same updated_at, different content: caught by the hash with verify
+        self.patents["2"]["claims"] = ["1. A new claim"]
+        del self.patents["3"]
+        self.patents["9"] = {**self.patents["0"], "id": "9", "title": "Patent 9"}
+
+        counts = self.run_delta(verify=True)
+
+        self.assertEqual((counts['inserted'], counts['updated'], counts['deleted'],
+                          counts['unchanged']), (1, 2, 1, 2))
+        self.assertEqual(sorted(self.sent), [
+            ("delete", "3"), ("index", "1"), ("index", "2"), ("index", "9")])
+        self.sync_database.assert_called_once_with(
+            {1: "Retitled", 2: "Patent 2", 9: "Patent 9"}, [3])
+
+        self.sent.clear()
+        self.assertEqual(self.run_delta()['unchanged'], 5)
+        self.assertEqual(self.sent, [])
+
+    def test_failed_run_keeps_manifest(self):
+        """Test a delta that did not make it is shipped again on the next run"""
+        self.run_delta(baseline=True)
+        self.patents["1"].update(title="Retitled", updated_at="2024-11-02")
+        self.sync_database.side_effect = RuntimeError("database down")
+
+        with self.assertRaises(RuntimeError):
+            self.run_delta()
+
+        self.sync_database.side_effect = None
+        self.sent.clear()
+        self.assertEqual(self.run_delta()['updated'], 1)
+        self.assertEqual(self.sent, [("index", "1")])
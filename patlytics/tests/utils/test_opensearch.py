@@ -0,0 +1,107 @@
+from opensearchpy import RequestError
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.circuit_breaker import CircuitBreaker
+from patlytics.utils.opensearch import OpenSearchClient
+
+
+class TestOpenSearchClient(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+        self.client = OpenSearchClient("host", "user", "password", breaker=self.breaker,
+                                       lookup_timeout=0.25)
+
+    def test_fuzzy_search_company(self):
+        """Test company hits come back best first, within the lookup timeout"""
+        self.mock_os_client.search.return_value = {"hits": {"hits": [
+            {"_score": 6.0, "_source": {"name": "Test Co"}},
+            {"_score": 9.0, "_source": {"name": "Test Company"}}
+        ]}}
+
+        matches = self.client.fuzzy_search_company("Test Compny")
+
+        self.assertEqual([match['company_name'] for match in matches],
+                         ["Test Company", "Test Co"])
+        self.assertEqual(self.mock_os_client.search.call_args.kwargs['request_timeout'], 0.25)
+
+    def test_fuzzy_search_short_circuits_when_cluster_fails(self):
+        """Test no request is sent once the breaker has opened"""
+        self.mock_os_client.search.side_effect = ConnectionError("unreachable")
+
+        results = [self.client.fuzzy_search_company("Test Company") for _ in range(5)]
+
+        self.assertEqual(results, [[]] * 5)
+        self.assertEqual(self.mock_os_client.search.call_count, 2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_fuzzy_search_projects_source(self):
+        """Test only the requested fields of the top matches are fetched"""
+        self.mock_os_client.search.return_value = {"hits": {"hits": []}}
+
+        self.client.fuzzy_search_company("Test Company", fields=["name"])
+
+        body = self.mock_os_client.search.call_args.kwargs['body']
+        self.assertEqual(body['_source'], {"includes": ["name"]})
+        self.assertEqual(body['size'], 3)
+
+    def test_get_documents_batches_mget(self):
+        """Test ids are fetched in mget batches with _source filtering"""
+        def mget(index, body, **params):
+            return {"docs": [
+                {"_id": doc_id, "found": doc_id != "3", "_source": {"title": f"Patent {doc_id}"}}
+                for doc_id in body['ids']
+            ]}
+        self.mock_os_client.mget.side_effect = mget
+
+        documents = self.client.get_documents(
+            "patents", [1, 2, 3, 2], fields=["title"], batch_size=2)
+
+        self.assertEqual(documents, {"1": {"title": "Patent 1"}, "2": {"title": "Patent 2"}})
+        self.assertEqual(self.mock_os_client.mget.call_count, 2)
+        self.assertEqual(self.mock_os_client.mget.call_args.kwargs['_source_includes'], ["title"])
+
+    def test_get_document_by_id_uses_realtime_get(self):
+        """Test a lookup by _id is a get, not a search"""
+        self.mock_os_client.get.return_value = {"_id": "72", "_source": {"title": "Patent"}}
+
+        document = self.client.get_document_by_id("patents", 72, excludes=["claims"])
+
+        self.assertEqual(document, {"title": "Patent"})
+        self.mock_os_client.get.assert_called_once_with(
+            index="patents", id="72", _source_excludes=["claims"])
+        self.mock_os_client.search.assert_not_called()
+
+    def test_fuzzy_search_uses_completion_suggester(self):
+        """Test the v2 lookup asks the name.suggest completion field"""
+        client = OpenSearchClient("host", "user", "password", use_suggester=True)
+        self.mock_os_client.search.return_value = {"suggest": {"company": [{"options": [
+            {"_score": 2.0, "_source": {"name": "Test Co"}},
+            {"_score": 4.0, "_source": {"name": "Test Company"}}
+        ]}]}}
+
+        matches = client.fuzzy_search_company("Test Compny", fields=["name"])
+
+        self.assertEqual([match['company_name'] for match in matches],
+                         ["Test Company", "Test Co"])
+        body = self.mock_os_client.search.call_args.kwargs['body']
+        self.assertEqual(body['suggest']['company']['completion']['field'], "name.suggest")
+        self.assertNotIn('query', body)
+        self.assertEqual(body['size'], 0)
+
+    def test_suggester_falls_back_before_v2_reindex(self):
+        """Test a missing name.suggest field falls back to the fuzzy search"""
+        client = OpenSearchClient("host", "user", "password", breaker=self.breaker,
+                                  use_suggester=True)
+        self.mock_os_client.search.side_effect = [
+            RequestError(400, "search_phase_execution_exception",
+                         "no mapping found for field [name.suggest]"),
+            {"hits": {"hits": [{"_score": 9.0, "_source": {"name": "Test Company"}}]}}
+        ] * 3
+
+        results = [client.fuzzy_search_company("Test Compny") for _ in range(3)]
+
+        self.assertEqual([[m['company_name'] for m in matches] for matches in results],
+                         [["Test Company"]] * 3)
+        fallback = self.mock_os_client.search.call_args.kwargs['body']
+        self.assertIn('query', fallback)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
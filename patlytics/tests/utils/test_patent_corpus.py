@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.patent_corpus import compile_corpus, PatentCorpus
+from patlytics.utils.patent_store import PatentStore
+
+
+class TestPatentCorpus(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.json_file = os.path.join(self.tmp_dir.name, 'patents.json')
+        self.corpus_file = os.path.join(self.tmp_dir.name, 'patents.corpus')
+        self.patents = [
+            {
+                "id": 7,
+                "publication_number": "US-7-B1",
+                "title": "Seventh",
+                "claims": json.dumps([{"num": "00001", "text": "1. A thing." * 100}])
+            },
+            {"id": 3, "publication_number": "US-3-B1", "title": "Third"}
+        ]
+        with open(self.json_file, 'w') as f:
+            json.dump(self.patents, f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        super().tearDown()
+
+    def test_round_trip(self):
+        """Test every record decodes back to the original JSON"""
+        for compress in (True, False):
+            self.assertEqual(compile_corpus(
+                self.json_file, self.corpus_file, compress=compress), 2)
+            corpus = PatentCorpus(self.corpus_file)
+
+            for patent in self.patents:
+                self.assertEqual(corpus.get(patent['id']).to_dict(), patent)
+                self.assertEqual(corpus.get_by_publication_number(
+                    patent['publication_number'])['id'], patent['id'])
+            corpus.close()
+
+    def test_missing_record_and_field(self):
+        """Test absent ids and fields behave like a dict"""
+        compile_corpus(self.json_file, self.corpus_file)
+        corpus = PatentCorpus(self.corpus_file)
+
+        self.assertIsNone(corpus.get(5))
+        self.assertIsNone(corpus.get_by_publication_number("US-5-B1"))
+        self.assertIsNone(corpus.get(3).get('claims'))
+        self.assertNotIn('claims', corpus.get(3))
+        corpus.close()
+
+    def test_patent_store_reads_corpus(self):
+        """Test PatentStore serves a compiled corpus transparently"""
+        compile_corpus(self.json_file, self.corpus_file)
+        store = PatentStore(self.corpus_file)
+
+        self.assertEqual(store.get("7")['title'], 'Seventh')
+        self.assertEqual(len(store), 2)
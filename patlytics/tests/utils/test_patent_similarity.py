@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.patent_corpus import compile_corpus
+from patlytics.utils.patent_similarity import PatentSimilarityIndex, SimilarityIndex
+
+
+class TestPatentSimilarity(TestBase):
+    def setUp(self):
+        super().setUp()
+        fd, self.patents_file = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump([
+                {
+                    "id": 1,
+                    "title": "Electronic shopping list",
+                    "abstract": "Shopping list generated on a mobile device",
+                    "claims": json.dumps([{"num": "1", "text": "A shopping list app."}])
+                },
+                {
+                    "id": 2,
+                    "title": "Grain harvester",
+                    "abstract": "Tractor with a grain harvesting header",
+                    "claims": "[]"
+                },
+                {
+                    "id": 3,
+                    "title": "Digital advertisement display",
+                    "abstract": "Showing an advertisement on a mobile device",
+                    "claims": "not json"
+                }
+            ], f)
+
+    def tearDown(self):
+        os.remove(self.patents_file)
+        super().tearDown()
+
+    def test_top_k(self):
+        """Test documents are ranked by cosine similarity and zero scores dropped"""
+        index = SimilarityIndex.from_documents(
+            [["shopping", "list", "mobile"], ["grain", "tractor"], [], ["shopping", "grain"]])
+
+        results = index.top_k([["shopping", "list"], ["tractor"], ["unknown"]], 2)
+
+        self.assertEqual([row for row, _ in results[0]], [0, 3])
+        self.assertTrue(1 >= results[0][0][1] > results[0][1][1] > 0)
+        self.assertEqual([row for row, _ in results[1]], [1])
+        self.assertEqual(results[2], [])
+
+    def test_top_k_svd(self):
+        """Test dense SVD vectors rank the closest document first"""
+        index = SimilarityIndex.from_documents(
+            [["shopping", "list", "mobile"], ["grain", "tractor"], ["shopping", "grain"]],
+            svd_components=2)
+
+        self.assertEqual(index.doc_vectors.shape, (3, 2))
+        self.assertEqual(index.doc_vectors.dtype.name, 'float32')
+        results = index.top_k([["shopping", "list"]], 1)
+        self.assertEqual(results[0][0][0], 0)
+
+    def test_search(self):
+        """Test searching the patents file by product description"""
+        index = PatentSimilarityIndex(self.patents_file, svd_components=0)
+
+        results = index.search("Shopping list app for a mobile phone", 2)
+
+        self.assertEqual([patent_id for patent_id, _ in results], [1, 3])
+
+    def test_search_corpus(self):
+        """Test a compiled corpus file is indexed like the JSON dump"""
+        corpus_file = f"{self.patents_file}.corpus"
+        compile_corpus(self.patents_file, corpus_file)
+        try:
+            index = PatentSimilarityIndex(corpus_file, svd_components=0)
+            results = index.search("tractor", 3)
+        finally:
+            os.remove(corpus_file)
+
+        self.assertEqual([patent_id for patent_id, _ in results], [2])
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.patent_store import PatentStore
+
+
+class TestPatentStore(TestBase):
+    def setUp(self):
+        super().setUp()
+        fd, self.patents_file = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.write_patents([
+            {"id": 1, "publication_number": "US-1-B1", "title": "First"},
+            {"id": "2", "publication_number": "US-2-B1", "title": "Second"}
+        ])
+        self.store = PatentStore(self.patents_file)
+
+    def tearDown(self):
+        os.remove(self.patents_file)
+        super().tearDown()
+
+    def write_patents(self, patents, mtime_ns=None):
+        with open(self.patents_file, 'w') as f:
+            json.dump(patents, f)
+        if mtime_ns is not None:
+            os.utime(self.patents_file, ns=(mtime_ns, mtime_ns))
+
+    def test_get_by_id(self):
+        """Test lookup by integer or string id"""
+        self.assertEqual(self.store.get(1)['title'], 'First')
+        self.assertEqual(self.store.get("2")['title'], 'Second')
+        self.assertIsNone(self.store.get(3))
+        self.assertEqual(len(self.store), 2)
+
+    def test_get_by_publication_number(self):
+        """Test lookup by publication number"""
+        patent = self.store.get_by_publication_number("US-2-B1")
+        self.assertEqual(patent['title'], 'Second')
+        self.assertIsNone(self.store.get_by_publication_number("US-3-B1"))
+
+    def test_reload_on_mtime_change(self):
+        """Test the store picks up a rewritten file"""
+        self.assertEqual(self.store.get(1)['title'], 'First')
+
+        mtime_ns = os.stat(self.patents_file).st_mtime_ns + 1_000_000_000
+        self.write_patents(
+            [{"id": 1, "publication_number": "US-1-B1", "title": "Updated"}],
+            mtime_ns=mtime_ns
+        )
+
+        self.assertEqual(self.store.get(1)['title'], 'Updated')
+        self.assertIsNone(self.store.get(2))
@@ -0,0 +1,47 @@
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.product_screening import screen_products, tfidf_scores
+
+
+class TestProductScreening(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.patent_text = (
+            "Electronic shopping list generated from a digital advertisement "
+            "on a mobile device")
+        self.products = [
+            {"name": "Tractor", "description": "Grain harvesting machine"},
+            {"name": "List App", "description": "Shopping list app for mobile device"},
+            {"name": "Ad Scanner", "description": "Scans a digital advertisement"},
+            {"name": "Blender", "description": "Kitchen blender"}
+        ]
+
+    def test_tfidf_scores(self):
+        """Test identical text scores 1 and disjoint text scores 0"""
+        scores = tfidf_scores(
+            ["shopping", "list"],
+            [["shopping", "list"], ["grain"], [], ["shopping", "grain"]])
+
+        self.assertAlmostEqual(float(scores[0]), 1.0, places=5)
+        self.assertEqual(float(scores[1]), 0.0)
+        self.assertEqual(float(scores[2]), 0.0)
+        self.assertTrue(0 < scores[3] < 1)
+
+    def test_screen_products_top_k(self):
+        """Test only the top-k products are kept, in catalog order"""
+        selected, skipped = screen_products(self.products, self.patent_text, top_k=2)
+
+        self.assertEqual(
+            [product['name'] for product in selected], ["List App", "Ad Scanner"])
+        self.assertEqual(
+            [product['product_name'] for product in skipped], ["Tractor", "Blender"])
+        self.assertEqual(skipped[0]['screening_score'], 0.0)
+
+    def test_screen_products_min_score(self):
+        """Test products below the threshold are skipped but one is always kept"""
+        selected, skipped = screen_products(self.products, self.patent_text, min_score=0.01)
+        self.assertEqual(len(selected), 2)
+        self.assertEqual(len(skipped), 2)
+
+        selected, skipped = screen_products(self.products, "Unrelated words", min_score=0.01)
+        self.assertEqual([product['name'] for product in selected], ["Tractor"])
+        self.assertEqual(len(skipped), 3)
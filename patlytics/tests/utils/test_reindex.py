@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock
+
+from opensearchpy import NotFoundError
+
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.reindex import BlueGreenReindexer
+
+INDEX_SETTINGS = {
+    "settings": {"index": {"number_of_shards": 1, "number_of_replicas": 1}},
+    "mappings": {"properties": {"title": {"type": "text"}}}
+}
+
+
+class TestBlueGreenReindexer(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.client = MagicMock()
+        self.client.indices.exists.return_value = False
+        self.client.count.return_value = {"count": 100}
+        self.client.cluster.health.return_value = {"status": "green", "timed_out": False}
+        self.client.indices.get_alias.return_value = {"patents_v1-20240101000000": {}}
+        self.ingester = MagicMock()
+        self.ingester.run.return_value = {
+            "indexed": 100, "failed": 0, "skipped": 0, "seconds": 1.0}
+        self.reindexer = BlueGreenReindexer(self.client, self.ingester)
+
+    def test_loads_with_refresh_and_replicas_off(self):
+        """Test the new index is created for bulk loading and restored after"""
+        build = self.reindexer.build("patents_v1", INDEX_SETTINGS, "patents.json", "patents",
+                                     "patents_v1-20241101000000")
+
+        created = self.client.indices.create.call_args.kwargs['body']
+        self.assertEqual(created['settings']['index']['refresh_interval'], "-1")
+        self.assertEqual(created['settings']['index']['number_of_replicas'], 0)
+        self.assertEqual(INDEX_SETTINGS['settings']['index']['number_of_replicas'], 1)
+        self.client.indices.put_settings.assert_called_once_with(
+            index="patents_v1-20241101000000",
+            body={"index": {"refresh_interval": None, "number_of_replicas": 1}})
+        self.assertEqual(build['count'], 100)
+        self.client.indices.update_aliases.assert_not_called()
+
+    def test_count_mismatch_keeps_alias(self):
+        """Test a short index is never swapped in"""
+        self.client.count.return_value = {"count": 99}
+
+        with self.assertRaises(RuntimeError):
+            self.reindexer.reindex(["patents"])
+        self.client.indices.update_aliases.assert_not_called()
+        self.client.indices.delete.assert_not_called()
+
+    def test_swaps_all_aliases_in_one_call(self):
+        """Test both aliases move to their new indices atomically"""
+        def get_alias(name):
+            if name == "company_products_v1":
+                raise NotFoundError(404, "alias_missing")
+            return {"patents_v1-20240101000000": {}}
+        self.client.indices.get_alias.side_effect = get_alias
+
+        builds = self.reindexer.reindex(["patents", "company_products"], delete_old=True)
+
+        self.client.indices.update_aliases.assert_called_once()
+        actions = self.client.indices.update_aliases.call_args.kwargs['body']['actions']
+        self.assertEqual(actions, [
+            {"remove": {"index": "patents_v1-20240101000000", "alias": "patents_v1"}},
+            {"add": {"index": builds[0]['index'], "alias": "patents_v1"}},
+            {"add": {"index": builds[1]['index'], "alias": "company_products_v1"}},
+        ])
+        self.client.indices.delete.assert_called_once_with(index="patents_v1-20240101000000")
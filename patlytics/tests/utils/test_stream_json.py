@@ -0,0 +1,58 @@
+import json
+from patlytics.tests.test_base import TestBase
+from patlytics.utils.stream_json import AnalysesStreamParser, parse_analysis_answer, parse_llm_json
+
+
+class TestStreamJson(TestBase):
+    def setUp(self):
+        super().setUp()
+        self.answer = {
+            "analyses": [
+                {
+                    "product_name": "Quoted \"}] Product",
+                    "infringement_likelihood": "High",
+                    "claims_at_issue": [1, {"nested": [2]}]
+                },
+                {
+                    "product_name": "Second",
+                    "infringement_likelihood": "Low",
+                    "claims_at_issue": []
+                }
+            ],
+            "overall_risk_assessment": "analyses: [ {} ]"
+        }
+        self.text = "```json\n" + json.dumps(self.answer, indent=2) + "\n```"
+
+    def test_parse_llm_json(self):
+        """Test markdown fences are stripped before parsing"""
+        self.assertEqual(parse_llm_json(self.text), self.answer)
+
+    def test_parse_analysis_answer_error(self):
+        """Test an answer that is not JSON is an error with no analyses"""
+        self.assertEqual(parse_analysis_answer(self.text), self.answer)
+        self.assertEqual(parse_analysis_answer("Sorry, I cannot help with that."), {
+            "error": "Error parsing patent analysis response.", "analyses": []})
+
+    def test_feed_char_by_char(self):
+        """Test each analysis is emitted once, as soon as it is complete"""
+        parser = AnalysesStreamParser()
+        emitted = []
+        for i, char in enumerate(self.text):
+            for analysis in parser.feed(char):
+                emitted.append((i, analysis))
+
+        self.assertEqual(
+            [analysis for _, analysis in emitted], self.answer['analyses'])
+        # The first analysis arrives before the second one is even started
+        self.assertLess(emitted[0][0], self.text.index('"Second"'))
+        self.assertEqual(parser.result(), self.answer)
+
+    def test_incomplete_answer(self):
+        """Test a truncated answer yields the finished analyses only"""
+        parser = AnalysesStreamParser()
+        cut = self.text.index('"Second"')
+
+        emitted = parser.feed(self.text[:cut])
+
+        self.assertEqual(emitted, self.answer['analyses'][:1])
+        self.assertIsNone(parser.result())
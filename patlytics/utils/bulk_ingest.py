@@ -0,0 +1,428 @@
+"""
+Streaming bulk ingestion of patent and company dumps into OpenSearch.
+
+Records are read incrementally from NDJSON or JSON, normalized and
+serialized to bulk lines in a process pool, grouped into requests by byte
+size and sent on several threads. Memory stays bounded by the batches and
+requests in flight, whatever the size of the dump.
+
+Usage:
+    python -m patlytics.utils.bulk_ingest patents ./data/patents.json --index patents-20241101
+    python -m patlytics.utils.bulk_ingest patents ./dump.ndjson --index patents-20241101 \\
+        --checkpoint ./dump.checkpoint
+"""
+import argparse
+import ast
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from functools import partial
+
+from opensearchpy import TransportError
+
+from config import (
+    INGEST_BULK_THREADS,
+    INGEST_CHUNK_BYTES,
+    INGEST_CHUNK_DOCS,
+    INGEST_MAX_RETRIES,
+    INGEST_MIN_CHUNK_BYTES,
+    INGEST_NORMALIZE_BATCH,
+    INGEST_PROCESSES
+)
+
+PATENT_LIST_FIELDS = ('inventors', 'claims', 'classifications', 'citations')
+
+
+def iter_records(path: str, read_chars: int = 1 << 16, raw: bool = False):
+    """
+    Records of a dump, read incrementally: one JSON object per line for
+    `.ndjson`/`.jsonl` files, else the objects of the first JSON array in the
+    file (the file itself, or e.g. `{"companies": [...]}`).
+
+    With `raw`, NDJSON records are yielded as their undecoded lines, so
+    parsing them can be left to worker processes.
+    """
+    if path.endswith(('.ndjson', '.jsonl')):
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    yield line if raw else json.loads(line)
+        return
+
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as file:
+        buffer = ''
+        while '[' not in buffer:
+            chunk = file.read(read_chars)
+            if not chunk:
+                return
+            buffer = chunk
+        buffer = buffer[buffer.index('[') + 1:]
+        position = 0
+        eof = False
+
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                if eof:
+                    return
+                buffer = file.read(read_chars)
+                position = 0
+                eof = not buffer
+                continue
+            if buffer[position] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # A record cut by the read: read more, at least doubling the
+                # window so a large record is not decoded over and over
+                chunk = file.read(max(read_chars, len(buffer) - position))
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+
+            yield record
+            position = end
+
+
+def normalize_patent(record: dict) -> dict:
+    """
+    Turn the list fields exported as Python literals (e.g. "['A', 'B']") into
+    lists; anything that is still not a list becomes an empty list.
+    """
+    for field in PATENT_LIST_FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError) as e:
+                print(f"Error parsing {field} for post {record.get('id')}: {e}")
+        record[field] = value if isinstance(value, list) else []
+    return record
+
+
+def normalize_company(record: dict) -> dict:
+    return record
+
+
+def patent_doc_id(record: dict) -> int:
+    return int(record['id'])
+
+
+def company_doc_id(record: dict) -> str:
+    return record['name']
+
+
+# How the records of each dump are normalized and identified in the index
+SOURCES = {
+    'patents': (normalize_patent, patent_doc_id),
+    'company_products': (normalize_company, company_doc_id),
+}
+
+
+def prepare_batch(records: list[dict | str], target_index: str, source: str) -> list[bytes]:
+    """
+    Parse (if still JSON text) and normalize records into the bulk lines
+    (action and document) that index them. Runs in a worker process, so the
+    parent only reads the dump and joins bytes.
+    """
+    normalize, doc_id = SOURCES[source]
+    lines = []
+    for record in records:
+        if isinstance(record, str):
+            record = json.loads(record)
+        record = normalize(record)
+        lines.append(index_line(target_index, doc_id(record), record))
+    return lines
+
+
+def index_line(target_index: str, doc_id, record: dict) -> bytes:
+    action = {"index": {"_index": target_index, "_id": doc_id}}
+    return (json.dumps(action) + "\n" + json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+
+
+def delete_line(target_index: str, doc_id) -> bytes:
+    return (json.dumps({"delete": {"_index": target_index, "_id": doc_id}}) + "\n").encode('utf-8')
+
+
+class ChunkSizer:
+    """
+    Bytes per bulk request: halved (down to `min_bytes`) each time the
+    cluster rejects documents with 429, grown back by a quarter (up to
+    `max_bytes`) after `grow_after` requests in a row went through.
+    """
+
+    def __init__(self, max_bytes: int, min_bytes: int, grow_after: int = 10):
+        self.max_bytes = max_bytes
+        self.min_bytes = min(min_bytes, max_bytes)
+        self.grow_after = grow_after
+        self._lock = threading.Lock()
+        self._target = max_bytes
+        self._clean = 0
+
+    @property
+    def target(self) -> int:
+        return self._target
+
+    def record(self, rejected: bool) -> None:
+        with self._lock:
+            if rejected:
+                self._target = max(self.min_bytes, self._target // 2)
+                self._clean = 0
+                return
+            self._clean += 1
+            if self._clean >= self.grow_after:
+                self._target = min(self.max_bytes, self._target + self._target // 4)
+                self._clean = 0
+
+
+class BulkIngester:
+    """
+    Loads a dump into an index with `processes` normalizing and `threads`
+    bulk requests in flight.
+
+    With a `checkpoint_path`, the number of leading records known to be
+    indexed is saved as requests complete; a rerun after a failure skips
+    them. Documents are indexed by id, so the few sent twice on resume are
+    overwritten, not duplicated. The checkpoint is removed once the whole
+    dump is in.
+    """
+
+    def __init__(self, client, processes: int = INGEST_PROCESSES,
+                 threads: int = INGEST_BULK_THREADS, chunk_docs: int = INGEST_CHUNK_DOCS,
+                 chunk_bytes: int = INGEST_CHUNK_BYTES,
+                 min_chunk_bytes: int = INGEST_MIN_CHUNK_BYTES,
+                 normalize_batch: int = INGEST_NORMALIZE_BATCH,
+                 max_retries: int = INGEST_MAX_RETRIES, rng=random):
+        self.client = client
+        self.processes = processes
+        self.threads = max(1, threads)
+        self.chunk_docs = chunk_docs
+        self.sizer = ChunkSizer(chunk_bytes, min_chunk_bytes)
+        self.normalize_batch = normalize_batch
+        self.max_retries = max_retries
+        self.rng = rng
+
+    def run(self, path: str, target_index: str, source: str = 'patents',
+            checkpoint_path: str | None = None) -> dict:
+        """
+        Index every record of `path` into `target_index`. Raises if the
+        cluster keeps failing; the checkpoint then marks where to resume.
+
+        Returns:
+            dict: Documents indexed, failed (rejected by the cluster for good,
+            e.g. mapping errors), skipped thanks to the checkpoint, and seconds
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source '{source}', expected one of {sorted(SOURCES)}")
+
+        start = time.perf_counter()
+        skipped = load_checkpoint(checkpoint_path, path, target_index)
+        records = itertools.islice(iter_records(path, raw=True), skipped, None)
+        batches = batched(records, self.normalize_batch)
+        prepare = partial(prepare_batch, target_index=target_index, source=source)
+
+        def save_progress(records_done):
+            save_checkpoint(checkpoint_path, path, target_index, skipped + records_done)
+
+        pool = ProcessPoolExecutor(self.processes) if self.processes >= 1 else nullcontext()
+        with pool as processes:
+            prepared = ordered_map(processes, prepare, batches, 2 * max(1, self.processes))
+            totals = self.bulk(prepared, on_progress=save_progress, label=target_index)
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        totals["skipped"] = skipped
+        totals["seconds"] = time.perf_counter() - start
+        return totals
+
+    def bulk(self, prepared, on_progress=None, label: str = "OpenSearch") -> dict:
+        """
+        Send batches of bulk lines (one action, and its document if any, per
+        line) on `threads` concurrent requests.
+
+        `on_progress(lines)` is called with the number of leading lines known
+        to be applied whenever it grows, also when a request fails for good,
+        before its error is raised.
+
+        Returns:
+            dict: Documents indexed and failed
+        """
+        totals = {"indexed": 0, "failed": 0}
+        progress = {"lines": 0, "next_seq": 0, "reported_at": time.perf_counter()}
+        completed = {}
+        pending = {}
+
+        def advance():
+            # Move the progress over the requests completed in order
+            while progress["next_seq"] in completed:
+                indexed, failed, lines_in_chunk = completed.pop(progress["next_seq"])
+                totals["indexed"] += indexed
+                totals["failed"] += failed
+                progress["lines"] += lines_in_chunk
+                progress["next_seq"] += 1
+            if on_progress is not None:
+                on_progress(progress["lines"])
+
+        def collect(finished):
+            # Keep every request that went through before raising a failure,
+            # so the progress covers them
+            for future in finished:
+                if future.exception() is None:
+                    completed[pending.pop(future)] = future.result()
+            for future in finished:
+                if future in pending:
+                    future.result()
+
+        with ThreadPoolExecutor(self.threads) as threads:
+            try:
+                for seq, (lines, lines_in_chunk) in enumerate(self._chunks(prepared)):
+                    if len(pending) >= 2 * self.threads:
+                        collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                        advance()
+                    pending[threads.submit(self._send, lines, lines_in_chunk)] = seq
+
+                    if time.perf_counter() - progress["reported_at"] >= 10:
+                        progress["reported_at"] = time.perf_counter()
+                        print(f"Bulk indexed {totals['indexed']} documents into {label}")
+
+                collect(wait(pending).done)
+            finally:
+                for future in pending:
+                    future.cancel()
+                advance()
+
+        return totals
+
+    def _chunks(self, prepared):
+        """Bulk requests of at most `chunk_docs` documents and the sizer's target bytes."""
+        lines, size = [], 0
+        for batch in prepared:
+            for line in batch:
+                if lines and (len(lines) >= self.chunk_docs or size + len(line) > self.sizer.target):
+                    yield lines, len(lines)
+                    lines, size = [], 0
+                lines.append(line)
+                size += len(line)
+        if lines:
+            yield lines, len(lines)
+
+    def _send(self, lines: list[bytes], covered: int) -> tuple[int, int, int]:
+        """
+        Send one bulk request, resending the documents rejected with 429
+        with exponential backoff and full jitter.
+
+        Returns:
+            tuple: documents indexed, documents failed, lines covered
+        """
+        indexed = failed = 0
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.rng.uniform(0, min(30.0, 0.5 * 2 ** attempt)))
+            try:
+                response = self.client.bulk(body=b"".join(lines))
+            except TransportError as e:
+                if e.status_code != 429:
+                    raise
+                self.sizer.record(rejected=True)
+                continue
+
+            rejected = []
+            for line, item in zip(lines, response['items']):
+                result = next(iter(item.values()))
+                if result.get('status') == 429:
+                    rejected.append(line)
+                elif result.get('error'):
+                    failed += 1
+                    if failed <= 3:
+                        print(f"Failed to index document {result.get('_id')}: {result['error']}")
+                else:
+                    indexed += 1
+
+            self.sizer.record(rejected=bool(rejected))
+            if not rejected:
+                return indexed, failed, covered
+            lines = rejected
+
+        raise RuntimeError(
+            f"{len(lines)} documents still rejected after {self.max_retries} retries")
+
+
+def load_checkpoint(checkpoint_path: str | None, path: str, target_index: str) -> int:
+    """Records of `path` already in `target_index`, 0 without a matching checkpoint."""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, encoding='utf-8') as file:
+        checkpoint = json.load(file)
+    if checkpoint.get('source') != os.path.abspath(path) or checkpoint.get('index') != target_index:
+        return 0
+    return checkpoint['records']
+
+
+def save_checkpoint(checkpoint_path: str | None, path: str, target_index: str, records: int) -> None:
+    if not checkpoint_path:
+        return
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({"source": os.path.abspath(path), "index": target_index,
+                   "records": records}, file)
+    os.replace(temp_path, checkpoint_path)
+
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def ordered_map(executor, func, items, max_pending: int):
+    """
+    `executor.map` that submits at most `max_pending` items ahead of the one
+    being yielded, instead of consuming the whole input up front.
+    """
+    if executor is None:
+        yield from map(func, items)
+        return
+    pending = []
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_pending:
+            yield pending.pop(0).result()
+    for future in pending:
+        yield future.result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', choices=sorted(SOURCES))
+    parser.add_argument('path', help="NDJSON (.ndjson/.jsonl) or JSON dump")
+    parser.add_argument('--index', required=True, help="Index to load, e.g. patents-20241101")
+    parser.add_argument('--checkpoint', help="File recording progress, to resume a failed load")
+    parser.add_argument('--processes', type=int, default=INGEST_PROCESSES)
+    parser.add_argument('--threads', type=int, default=INGEST_BULK_THREADS)
+    args = parser.parse_args()
+
+    from patlytics.utils.opensearch import get_default_client
+    client = get_default_client().client
+    ingester = BulkIngester(client, processes=args.processes, threads=args.threads)
+    result = ingester.run(args.path, args.index, args.source, args.checkpoint)
+    client.indices.refresh(index=args.index)
+    print(f"Indexed {result['indexed']} documents into {args.index} in "
+          f"{result['seconds']:.1f} s ({result['failed']} failed, "
+          f"{result['skipped']} skipped from checkpoint)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from patlytics.utils import metrics
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing dependency for a while.
+
+    Closed: calls go through; `failure_threshold` consecutive failures open
+    the breaker. Open: `allow` refuses every call for `reset_timeout`
+    seconds, so callers go straight to their fallback. Half-open: then up
+    to `half_open_max_calls` trial calls go through; a success closes the
+    breaker, a failure opens it again.
+
+    The state is exported as the `circuit.<name>.state` gauge (0 closed, 1
+    half-open, 2 open), with a counter per transition and per refused call.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_GAUGE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 half_open_max_calls: int = 1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        metrics.set_gauge(f'circuit.{name}.state', self.STATE_GAUGE[self.CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._update()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through now."""
+        with self._lock:
+            self._update()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return True
+        metrics.incr(f'circuit.{self.name}.short_circuited')
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = self.clock()
+                self._set_state(self.OPEN)
+
+    def _update(self) -> None:
+        if self._state == self.OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._trial_calls = 0
+            self._set_state(self.HALF_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        metrics.set_gauge(f'circuit.{self.name}.state', self.STATE_GAUGE[state])
+        metrics.incr(f'circuit.{self.name}.{state}')
@@ -0,0 +1,117 @@
+import json
+import math
+import re
+from collections import Counter
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# "The method according to claim 1", "of claim 3", "as claimed in claims 1-4"
+CLAIM_REFERENCE = re.compile(r"\bclaims?\s+\d+", re.IGNORECASE)
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or said such
+that the their then there these this to was were which with wherein whereby
+comprising comprises claim claims one more least first second
+""".split())
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and not token.isdigit()
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def parse_claims(claims) -> list[dict]:
+    """
+    Parse the `claims` field of a patent record into a list of
+    {"num": ..., "text": ...} dicts. Accepts the JSON-encoded string stored
+    in patents.json or an already decoded list.
+    """
+    if isinstance(claims, str):
+        claims = json.loads(claims)
+    return [claim for claim in claims if isinstance(claim, dict) and claim.get('text')]
+
+
+def is_independent(claim: dict) -> bool:
+    # Skip the leading "12. " so the claim's own number is not a reference
+    text = claim['text'].lstrip()
+    text = re.sub(r"^\d+\s*\.\s*", "", text)
+    return not CLAIM_REFERENCE.search(text)
+
+
+def bm25_scores(documents: list[list[str]], query: list[str], k1: float = 1.5, b: float = 0.75) -> list[float]:
+    """
+    Okapi BM25 score of every tokenized document against a tokenized query.
+    """
+    if not documents:
+        return []
+
+    doc_count = len(documents)
+    avg_length = sum(len(doc) for doc in documents) / doc_count or 1
+    doc_freq = Counter(token for doc in documents for token in set(doc))
+    query_terms = Counter(query)
+
+    scores = []
+    for doc in documents:
+        term_freq = Counter(doc)
+        norm = k1 * (1 - b + b * len(doc) / avg_length)
+        score = 0.0
+        for term, query_count in query_terms.items():
+            tf = term_freq.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (doc_count - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            score += query_count * idf * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def select_claims(claims: list[dict], query_text: str, top_k: int = 5, token_budget: int = 3000) -> list[dict]:
+    """
+    Pick the claims worth sending to the LLM.
+
+    Independent claims are always kept. Dependent claims are ranked by BM25
+    relevance to `query_text` (the product descriptions) and added, best
+    first, while fewer than `top_k` have been added and the estimated tokens
+    stay within `token_budget`.
+
+    Args:
+        claims (list[dict]): Parsed claims, see `parse_claims`
+        query_text (str): Text the claims should be relevant to
+        top_k (int): Maximum number of dependent claims
+        token_budget (int): Estimated token budget for all selected claims
+
+    Returns:
+        list[dict]: Selected claims in their original order
+    """
+    independent = [i for i, claim in enumerate(claims) if is_independent(claim)]
+    dependent = [i for i, claim in enumerate(claims) if not is_independent(claim)]
+
+    selected = set(independent)
+    used_tokens = sum(estimate_tokens(claims[i]['text']) for i in independent)
+
+    scores = bm25_scores(
+        [tokenize(claims[i]['text']) for i in dependent], tokenize(query_text))
+    ranked = sorted(zip(scores, dependent), key=lambda pair: (-pair[0], pair[1]))
+
+    added = 0
+    for score, i in ranked:
+        if added >= top_k or score <= 0:
+            break
+        tokens = estimate_tokens(claims[i]['text'])
+        if used_tokens + tokens > token_budget:
+            continue
+        selected.add(i)
+        used_tokens += tokens
+        added += 1
+
+    return [claims[i] for i in sorted(selected)]
+
+
+def format_claims(claims: list[dict]) -> str:
+    return "\n".join(claim['text'].strip() for claim in claims)
@@ -0,0 +1,222 @@
+import bisect
+import hashlib
+import json
+from itertools import islice
+from typing import Optional
+
+from rapidfuzz import fuzz, process
+
+from config import COMPANY_PRODUCTS_FILE
+from patlytics.utils.file_snapshot import FileSnapshot
+from patlytics.utils.name_index import NGramIndex
+
+# Below this size scoring every name is already sub-millisecond
+NGRAM_INDEX_MIN_SIZE = 5_000
+
+
+def normalize_name(name: str) -> str:
+    return name.lower()
+
+
+def _word_starts(name: str) -> list[int]:
+    return [
+        i for i, char in enumerate(name)
+        if char.isalnum() and (i == 0 or not name[i - 1].isalnum())
+    ]
+
+
+def _score_cutoff(threshold: int) -> float:
+    # thefuzz rounded ratios to ints, so e.g. 79.5 used to clear a threshold of 80
+    return max(threshold - 0.5, 0)
+
+
+class _CompanyIndex:
+    """Parsed company catalog with names normalized once at load time."""
+
+    def __init__(self, companies: list[dict], version: str):
+        self.companies = companies
+        self.version = version
+        self.names = [company['name'] for company in companies]
+        self.normalized_names = [normalize_name(name) for name in self.names]
+        self.ngram_index = None
+        if len(companies) >= NGRAM_INDEX_MIN_SIZE:
+            self.ngram_index = NGramIndex(self.normalized_names)
+
+        # Sorted (key, company id) arrays for typeahead: whole names for
+        # prefix matches, and the tail of each name from every later word
+        # start for infix matches ("deere" finds "John Deere")
+        prefixes = sorted(
+            (name, i) for i, name in enumerate(self.normalized_names))
+        self.prefix_keys = [key for key, _ in prefixes]
+        self.prefix_ids = [i for _, i in prefixes]
+        infixes = sorted(
+            (name[start:], i)
+            for i, name in enumerate(self.normalized_names)
+            for start in _word_starts(name)[1:]
+        )
+        self.infix_keys = [key for key, _ in infixes]
+        self.infix_ids = [i for _, i in infixes]
+
+    def iter_matches(self, query: str):
+        """
+        Yield ids of companies whose name starts with `query`, then those with
+        a later word starting with it; each group in alphabetical order.
+        """
+        if not query:
+            yield from range(len(self.companies))
+            return
+
+        seen = set()
+        for keys, ids in ((self.prefix_keys, self.prefix_ids),
+                          (self.infix_keys, self.infix_ids)):
+            position = bisect.bisect_left(keys, query)
+            while position < len(keys) and keys[position].startswith(query):
+                company_id = ids[position]
+                if company_id not in seen:
+                    seen.add(company_id)
+                    yield company_id
+                position += 1
+
+    def choices(self, query: str, score_cutoff: float) -> tuple[list[str], Optional[list[int]]]:
+        """
+        Get the (normalized names, company ids) worth scoring for `query`.
+        """
+        if self.ngram_index is None:
+            return self.normalized_names, None
+        ids = self.ngram_index.candidates(query, score_cutoff).tolist()
+        return [self.normalized_names[i] for i in ids], ids
+
+
+class CompanyCatalog(FileSnapshot):
+    """
+    Process-wide company catalog with batched fuzzy name matching.
+
+    `company_products.json` is loaded once (and reloaded when its mtime
+    changes); queries are scored against the pre-normalized names with
+    RapidFuzz instead of a per-pair Python loop. Large catalogs are first
+    narrowed down with an `NGramIndex` so only a shortlist is scored.
+    """
+
+    def __init__(self, file_path: str = COMPANY_PRODUCTS_FILE):
+        super().__init__(file_path)
+
+    def _build(self, file_path: str) -> _CompanyIndex:
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        company_data = json.loads(raw)
+        return _CompanyIndex(
+            company_data['companies'], hashlib.sha1(raw).hexdigest())
+
+    @property
+    def names(self) -> list[str]:
+        """Company names in catalog order."""
+        return self._current().names
+
+    @property
+    def version(self) -> str:
+        """Content hash of the loaded catalog file."""
+        return self._current().version
+
+    def __len__(self) -> int:
+        return len(self._current().companies)
+
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> tuple[list[str], Optional[int]]:
+        """
+        Typeahead search over company names.
+
+        Args:
+            query (str): Prefix of the name or of any word in it; empty for all
+            limit (int|None): Page size, None for every remaining match
+            offset (int): Number of matches to skip
+
+        Returns:
+            tuple[list[str], int|None]: Page of names and the offset of the
+                next page, or None if this is the last one
+        """
+        index = self._current()
+        matches = index.iter_matches(normalize_name(query.strip()))
+
+        if limit is None:
+            return [index.names[i] for i in islice(matches, offset, None)], None
+
+        # Fetch one extra match to know whether another page exists
+        page = [index.names[i] for i in islice(matches, offset, offset + limit + 1)]
+        if len(page) > limit:
+            return page[:limit], offset + limit
+        return page, None
+
+    def extract(self, company_name: str, threshold: int = 80, limit: Optional[int] = 5) -> list[tuple[dict, float]]:
+        """
+        Get the companies whose names match `company_name`, best first.
+
+        Args:
+            company_name (str): Name to match
+            threshold (int): Minimum similarity score (0-100)
+            limit (int|None): Maximum number of matches, None for all
+
+        Returns:
+            list[tuple[dict, float]]: (company, score) pairs
+        """
+        index = self._current()
+        query = normalize_name(company_name)
+        cutoff = _score_cutoff(threshold)
+        choices, ids = index.choices(query, cutoff)
+        matches = process.extract(
+            query, choices, scorer=fuzz.ratio, score_cutoff=cutoff, limit=limit)
+        return [
+            (index.companies[ids[i] if ids is not None else i], score)
+            for _, score, i in matches
+        ]
+
+    def find(self, company_name: str, threshold: int = 80) -> Optional[dict]:
+        """
+        Get the best matching company, or None if nothing clears `threshold`.
+        """
+        index = self._current()
+        query = normalize_name(company_name)
+        cutoff = _score_cutoff(threshold)
+        choices, ids = index.choices(query, cutoff)
+        match = process.extractOne(
+            query, choices, scorer=fuzz.ratio, score_cutoff=cutoff)
+        if match is None:
+            return None
+        return index.companies[ids[match[2]] if ids is not None else match[2]]
+
+    def resolve_many(self, company_names: list[str], threshold: int = 80) -> list[Optional[dict]]:
+        """
+        Resolve many input names in one vectorized pass.
+
+        Args:
+            company_names (list[str]): Names to resolve
+            threshold (int): Minimum similarity score (0-100)
+
+        Returns:
+            list[dict|None]: Best matching company per input name, in order
+        """
+        if not company_names:
+            return []
+
+        index = self._current()
+        if not index.companies:
+            return [None] * len(company_names)
+        if index.ngram_index is not None:
+            # A full query x catalog matrix no longer fits; shortlist per name
+            return [self.find(name, threshold) for name in company_names]
+
+        cutoff = _score_cutoff(threshold)
+        scores = process.cdist(
+            [normalize_name(name) for name in company_names],
+            index.normalized_names,
+            scorer=fuzz.ratio,
+            score_cutoff=cutoff,
+            workers=-1
+        )
+        best = scores.argmax(axis=1)
+        return [
+            index.companies[j] if scores[i, j] >= cutoff else None
+            for i, j in enumerate(best)
+        ]
+
+
+# Create a default instance
+default_company_catalog = CompanyCatalog()
@@ -0,0 +1,265 @@
+"""
+Delta indexing: ship only what changed since the last load.
+
+A manifest (SQLite file) keeps the content hash and `updated_at` of every
+document in an index. A new dump is compared against it as it streams by,
+and only inserted and updated records are indexed, records missing from
+the dump are deleted, and with `--sync-db` the MySQL `patent` table gets
+the same changes. The cost of a refresh follows the number of changes, not
+the size of the corpus.
+
+Usage:
+    # Record the dump the index was fully loaded from, shipping nothing
+    python -m patlytics.utils.delta_index patents ./data/patents.json --baseline
+    # Then, for each new dump
+    python -m patlytics.utils.delta_index patents ./dump.ndjson --sync-db
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+
+from config import DELTA_MANIFEST_DIR, INGEST_PROCESSES
+from patlytics.utils.bulk_ingest import (
+    SOURCES,
+    BulkIngester,
+    batched,
+    delete_line,
+    index_line,
+    iter_records,
+    ordered_map
+)
+from patlytics.utils.reindex import TARGETS
+
+# Manifest rows looked up per SQLite query (below its bound parameter limit)
+LOOKUP_BATCH = 900
+
+
+def content_hash(record: dict) -> str:
+    """Hash of a normalized record, independent of its key order."""
+    canonical = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def hash_batch(records: list[dict | str], target_index: str, source: str) -> list[tuple]:
+    """
+    Parse, normalize and hash records. Runs in a worker process.
+
+    Returns:
+        list[tuple]: Per record: id (as str), content hash, `updated_at`,
+        `title` and the bulk lines indexing it
+    """
+    normalize, doc_id = SOURCES[source]
+    rows = []
+    for record in records:
+        if isinstance(record, str):
+            record = json.loads(record)
+        record = normalize(record)
+        record_id = doc_id(record)
+        rows.append((str(record_id), content_hash(record), record.get('updated_at'),
+                     record.get('title'), index_line(target_index, record_id, record)))
+    return rows
+
+
+class Manifest:
+    """
+    id -> content hash and `updated_at` of the documents of one index, in a
+    SQLite file. Changes are made in one transaction, committed once the
+    index and database have them: a failed run leaves the manifest as it
+    was, and rerunning it ships the same changes again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS manifest ("
+            "id TEXT PRIMARY KEY, hash TEXT NOT NULL, updated_at TEXT) WITHOUT ROWID")
+        self.connection.execute("CREATE TEMP TABLE seen (id TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+
+    def lookup(self, ids: list[str]) -> dict[str, tuple[str, str | None]]:
+        """id -> (hash, updated_at) of the given ids that are in the manifest."""
+        found = {}
+        for start in range(0, len(ids), LOOKUP_BATCH):
+            batch = ids[start:start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for row in self.connection.execute(
+                    f"SELECT id, hash, updated_at FROM manifest WHERE id IN ({placeholders})", batch):
+                found[row[0]] = (row[1], row[2])
+        return found
+
+    def mark_seen(self, ids: list[str]) -> None:
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO seen (id) VALUES (?)", ((doc_id,) for doc_id in ids))
+
+    def put(self, rows: list[tuple[str, str, str | None]]) -> None:
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO manifest (id, hash, updated_at) VALUES (?, ?, ?)", rows)
+
+    def unseen(self, batch_size: int = LOOKUP_BATCH):
+        """Batches of the ids in the manifest but not marked seen."""
+        cursor = self.connection.execute(
+            "SELECT id FROM manifest WHERE id NOT IN (SELECT id FROM seen) ORDER BY id")
+        while batch := cursor.fetchmany(batch_size):
+            yield [row[0] for row in batch]
+
+    def remove_unseen(self) -> None:
+        self.connection.execute("DELETE FROM manifest WHERE id NOT IN (SELECT id FROM seen)")
+
+    def commit(self) -> None:
+        self.connection.execute("DELETE FROM seen")
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+        self.connection.execute("DELETE FROM seen")
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class DeltaIndexer:
+    """
+    Compares dumps against a `Manifest` and sends the inserts, updates and
+    deletes to OpenSearch (through `ingester`) and, optionally, to the
+    MySQL `patent` table (`sync_database(upserts, deletes)`).
+
+    A record counts as unchanged when its `updated_at` matches the manifest
+    or, failing that, its content hash does; with `verify`, only the hash
+    is trusted.
+    """
+
+    def __init__(self, client, manifest_path: str, ingester: BulkIngester | None = None,
+                 processes: int = INGEST_PROCESSES, sync_database=None):
+        self.client = client
+        self.manifest_path = manifest_path
+        self.ingester = ingester or BulkIngester(client)
+        self.processes = processes
+        self.sync_database = sync_database
+
+    def run(self, path: str, target_index: str, source: str = 'patents',
+            baseline: bool = False, verify: bool = False) -> dict:
+        """
+        Apply the changes between the manifest and the dump at `path`.
+
+        With `baseline`, nothing is sent: the manifest is only made to match
+        the dump, e.g. the one `target_index` was just fully loaded from.
+
+        Returns:
+            dict: Records inserted, updated, unchanged and deleted, documents
+            failed, and seconds
+        """
+        start = time.perf_counter()
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "failed": 0}
+        upserts = {}
+        deletes = []
+        # Only database syncs need the changed ids; a baseline run keeps none
+        collect = source == 'patents' and not baseline and self.sync_database is not None
+        manifest = Manifest(self.manifest_path)
+
+        def changes(processes):
+            prepare = partial(hash_batch, target_index=target_index, source=source)
+            batches = batched(iter_records(path, raw=True), self.ingester.normalize_batch)
+            for rows in ordered_map(processes, prepare, batches, 2 * max(1, self.processes)):
+                ids = [row[0] for row in rows]
+                known = manifest.lookup(ids)
+                manifest.mark_seen(ids)
+                lines, changed = [], []
+                for doc_id, digest, updated_at, title, line in rows:
+                    previous = known.get(doc_id)
+                    if previous is not None and (
+                            previous[0] == digest
+                            or (not verify and updated_at is not None and previous[1] == updated_at)):
+                        counts["unchanged"] += 1
+                        if previous[0] == digest and previous[1] != updated_at:
+                            changed.append((doc_id, digest, updated_at))
+                        continue
+                    counts["inserted" if previous is None else "updated"] += 1
+                    lines.append(line)
+                    changed.append((doc_id, digest, updated_at))
+                    if collect:
+                        upserts[int(doc_id)] = title
+                manifest.put(changed)
+                yield lines
+
+            for batch in manifest.unseen():
+                counts["deleted"] += len(batch)
+                if collect:
+                    deletes.extend(int(doc_id) for doc_id in batch)
+                yield [delete_line(target_index, doc_id) for doc_id in batch]
+            manifest.remove_unseen()
+
+        pool = ProcessPoolExecutor(self.processes) if self.processes >= 1 else nullcontext()
+        try:
+            with pool as processes:
+                if baseline:
+                    for _ in changes(processes):
+                        pass
+                else:
+                    result = self.ingester.bulk(changes(processes), label=target_index)
+                    counts["failed"] = result["failed"]
+            if counts["failed"]:
+                raise RuntimeError(
+                    f"{counts['failed']} documents failed; manifest of {target_index} left unchanged")
+            if collect and (upserts or deletes):
+                self.sync_database(upserts, deletes)
+            manifest.commit()
+        except BaseException:
+            manifest.rollback()
+            raise
+        finally:
+            manifest.close()
+
+        counts["seconds"] = time.perf_counter() - start
+        return counts
+
+
+def sync_patent_table(upserts: dict[int, str], deletes: list[int]) -> None:
+    from patlytics import create_app
+    from patlytics.utils.import_data import apply_patent_delta
+
+    app = create_app()
+    with app.app_context():
+        print(apply_patent_delta(upserts, deletes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', choices=sorted(SOURCES))
+    parser.add_argument('path', help="NDJSON (.ndjson/.jsonl) or JSON dump")
+    parser.add_argument('--index', help="Index or alias to update (default: the source's alias)")
+    parser.add_argument('--manifest', help="Manifest file (default: <DELTA_MANIFEST_DIR>/<index>.manifest)")
+    parser.add_argument('--baseline', action='store_true',
+                        help="Only record the dump in the manifest, sending nothing")
+    parser.add_argument('--verify', action='store_true',
+                        help="Compare content hashes even when updated_at is unchanged")
+    parser.add_argument('--sync-db', action='store_true',
+                        help="Apply patent inserts, updates and deletes to MySQL too")
+    parser.add_argument('--processes', type=int, default=INGEST_PROCESSES)
+    args = parser.parse_args()
+
+    target_index = args.index or TARGETS[args.source][0]
+    manifest_path = args.manifest or f"{DELTA_MANIFEST_DIR}/{target_index}.manifest"
+
+    from patlytics.utils.opensearch import get_default_client
+    client = get_default_client().client
+    indexer = DeltaIndexer(client, manifest_path, processes=args.processes,
+                           sync_database=sync_patent_table if args.sync_db else None)
+    counts = indexer.run(args.path, target_index, args.source, args.baseline, args.verify)
+    if not args.baseline:
+        client.indices.refresh(index=target_index)
+    print(f"{target_index}: {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['deleted']} deleted, {counts['unchanged']} unchanged "
+          f"in {counts['seconds']:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import os
+import threading
+
+
+class FileSnapshot:
+    """
+    Base class for process-wide indexes built from a data file.
+
+    Subclasses implement `_build(file_path)` to parse the file into whatever
+    index they serve from. The index is built on first use and rebuilt when
+    the file's mtime changes; the new index is swapped in with a single
+    assignment so concurrent readers never see a partial state.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        # (mtime_ns, index)
+        self._snapshot = None
+
+    def _build(self, file_path: str):
+        raise NotImplementedError
+
+    def _current(self):
+        mtime_ns = os.stat(self.file_path).st_mtime_ns
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == mtime_ns:
+            return snapshot[1]
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is None or snapshot[0] != mtime_ns:
+                snapshot = (mtime_ns, self._build(self.file_path))
+                self._snapshot = snapshot
+        return snapshot[1]
+
+    def reload(self) -> None:
+        """Force a reload regardless of the file's mtime."""
+        mtime_ns = os.stat(self.file_path).st_mtime_ns
+        with self._lock:
+            self._snapshot = (mtime_ns, self._build(self.file_path))
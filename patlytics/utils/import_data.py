@@ -3,7 +3,7 @@ import os
 
 from patlytics import create_app
 from patlytics.database import db
-from patlytics.database.models import Company, Product, Patent
+from patlytics.database.models import Company, Product, Patent, Report
 
 
 def load_json_data(file_path):
@@ -91,6 +91,47 @@ def import_all_data():
             raise
 
 
+def apply_patent_delta(upserts: dict[int, str], deletes: list[int], batch_size: int = 1000) -> dict:
+    """
+    Apply an index delta to the `patent` table, in the current app context:
+    insert or retitle the `upserts` (patent id -> title) and delete the
+    `deletes`. Patents that reports still refer to are kept.
+    """
+    stats = {"inserted": 0, "updated": 0, "deleted": 0, "kept": 0}
+    try:
+        patent_ids = list(upserts)
+        for start in range(0, len(patent_ids), batch_size):
+            batch = patent_ids[start:start + batch_size]
+            existing = {patent.patent_id: patent for patent in
+                        Patent.query.filter(Patent.patent_id.in_(batch))}
+            for patent_id in batch:
+                patent = existing.get(patent_id)
+                if patent is None:
+                    db.session.add(Patent(patent_id=patent_id, title=upserts[patent_id]))
+                    stats["inserted"] += 1
+                elif patent.title != upserts[patent_id]:
+                    patent.title = upserts[patent_id]
+                    stats["updated"] += 1
+
+        for start in range(0, len(deletes), batch_size):
+            batch = deletes[start:start + batch_size]
+            referenced = {patent_id for (patent_id,) in db.session.query(Report.patent_id)
+                          .filter(Report.patent_id.in_(batch)).distinct()}
+            removable = [patent_id for patent_id in batch if patent_id not in referenced]
+            if removable:
+                stats["deleted"] += Patent.query.filter(
+                    Patent.patent_id.in_(removable)).delete(synchronize_session=False)
+            stats["kept"] += len(referenced)
+
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error applying patent delta: {e}")
+        raise
+
+    return stats
+
+
 def main():
     import_all_data()
 
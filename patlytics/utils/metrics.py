@@ -0,0 +1,54 @@
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_gauges = {}
+# name -> [count, total, max]
+_summaries = {}
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Increment a process-wide counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """Set a process-wide gauge to its current value."""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name: str, value: float) -> None:
+    """Record one observation (a latency, a size) of a summary."""
+    with _lock:
+        summary = _summaries.setdefault(name, [0, 0.0, value])
+        summary[0] += 1
+        summary[1] += value
+        summary[2] = max(summary[2], value)
+
+
+def snapshot() -> dict:
+    """Get a copy of every counter, gauge and summary of this process."""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "summaries": {
+                name: {
+                    "count": count,
+                    "sum": total,
+                    "avg": total / count,
+                    "max": maximum
+                }
+                for name, (count, total, maximum) in _summaries.items()
+            }
+        }
+
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _summaries.clear()
@@ -0,0 +1,93 @@
+import numpy as np
+
+
+class NGramIndex:
+    """
+    Character n-gram inverted index used to shortlist fuzzy-match candidates.
+
+    Names are padded and split into distinct n-grams; each n-gram maps to the
+    sorted ids of the names containing it, stored CSR-style in one int32
+    array. A query probes its rarest n-grams first (up to `posting_budget`
+    ids), keeps names whose length can still reach the score cutoff, and
+    returns the `max_candidates` names sharing the most n-grams. The exact
+    `ratio` check is left to the caller, so this trades a small, measurable
+    recall loss (see benchmarks/bench_name_index.py) for not scoring every
+    name.
+    """
+
+    def __init__(self, names: list[str], n: int = 3):
+        self.n = n
+        self.lengths = np.fromiter(
+            (len(name) for name in names), dtype=np.int32, count=len(names))
+
+        gram_ids = {}
+        pair_grams = []
+        pair_names = []
+        for name_id, name in enumerate(names):
+            for gram in self._grams(name):
+                gram_id = gram_ids.setdefault(gram, len(gram_ids))
+                pair_grams.append(gram_id)
+                pair_names.append(name_id)
+
+        pair_grams = np.asarray(pair_grams, dtype=np.int32)
+        order = np.argsort(pair_grams, kind='stable')
+        self.postings = np.asarray(pair_names, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(gram_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_grams, minlength=len(gram_ids)),
+                  out=self.offsets[1:])
+        self.gram_ids = gram_ids
+
+    def _grams(self, name: str) -> set[str]:
+        pad = " " * (self.n - 1)
+        padded = f"{pad}{name}{pad}"
+        return {padded[i: i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def candidates(self, query: str, score_cutoff: float, max_candidates: int = 256,
+                   posting_budget: int = 50_000) -> np.ndarray:
+        """
+        Get ids of names that may score at least `score_cutoff` against `query`.
+
+        Args:
+            query (str): Normalized query name
+            score_cutoff (float): Minimum `fuzz.ratio` score (0-100)
+            max_candidates (int): Maximum number of ids to return
+            posting_budget (int): Maximum number of posting entries to scan
+
+        Returns:
+            np.ndarray: Candidate name ids, best n-gram overlap first
+        """
+        spans = []
+        for gram in self._grams(query):
+            gram_id = self.gram_ids.get(gram)
+            if gram_id is not None:
+                spans.append((self.offsets[gram_id], self.offsets[gram_id + 1]))
+        if not spans:
+            return np.empty(0, dtype=np.int32)
+
+        # Rare n-grams are the most selective, so spend the budget on them
+        spans.sort(key=lambda span: span[1] - span[0])
+        probed = []
+        scanned = 0
+        for start, end in spans:
+            if probed and scanned + (end - start) > posting_budget:
+                break
+            probed.append(self.postings[start:end])
+            scanned += end - start
+
+        ids, counts = np.unique(np.concatenate(probed), return_counts=True)
+
+        # fuzz.ratio <= 200 * min(la, lb) / (la + lb) bounds the usable lengths
+        length = len(query)
+        cutoff = min(max(score_cutoff, 1.0), 100.0)
+        lengths = self.lengths[ids]
+        keep = ((lengths >= length * cutoff / (200 - cutoff))
+                & (lengths <= length * (200 - cutoff) / cutoff))
+        ids, counts = ids[keep], counts[keep]
+
+        if len(ids) > max_candidates:
+            top = np.argpartition(-counts, max_candidates)[:max_candidates]
+            ids, counts = ids[top], counts[top]
+        return ids[np.argsort(-counts, kind='stable')]
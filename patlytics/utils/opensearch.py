@@ -1,19 +1,46 @@
 import json
-import ast
+import threading
 
 from datetime import datetime
-from opensearchpy import OpenSearch, RequestsHttpConnection, helpers
+from opensearchpy import NotFoundError, OpenSearch, RequestError, RequestsHttpConnection
 
 from patlytics.opensearch_settings.patents_v1 import INDEX_SETTINGS as PATENTS_INDEX_SETTINGS
 from patlytics.opensearch_settings.company_products_v1 import INDEX_SETTINGS as COMPANY_PRODUCTS_INDEX_SETTINGS
-from config import OS_HOST, OS_USER, OS_PASSWORD, PATENTS_ALIAS, COMPANY_PRODUCTS_ALIAS
+from config import (
+    PATENTS_ALIAS,
+    COMPANY_PRODUCTS_ALIAS,
+    OS_ASYNC_POOL_SIZE,
+    OS_COMPANY_MATCHES,
+    OS_COMPANY_SUGGESTER,
+    OS_MGET_BATCH_SIZE,
+    INGEST_CHUNK_DOCS,
+    OS_COMPANY_LOOKUP_TIMEOUT,
+    OS_BREAKER_FAILURE_THRESHOLD,
+    OS_BREAKER_RESET_TIMEOUT
+)
+from patlytics.utils import metrics
+from patlytics.utils.bulk_ingest import BulkIngester, normalize_patent
+from patlytics.utils.reindex import BlueGreenReindexer
+from patlytics.utils.circuit_breaker import CircuitBreaker
+
+# Shared by the blocking and the async client: both talk to the same cluster
+company_lookup_breaker = CircuitBreaker(
+    'opensearch.company_lookup', OS_BREAKER_FAILURE_THRESHOLD, OS_BREAKER_RESET_TIMEOUT)
 
 
 class OpenSearchClient:
-    def __init__(self, host: str, user: str, password: str):
+    def __init__(self, host: str, user: str, password: str,
+                 breaker: CircuitBreaker | None = None,
+                 lookup_timeout: float = OS_COMPANY_LOOKUP_TIMEOUT,
+                 connection_class=RequestsHttpConnection,
+                 use_suggester: bool = OS_COMPANY_SUGGESTER):
         self.host = host
         self.user = user
         self.password = password
+        self.breaker = breaker if breaker is not None else company_lookup_breaker
+        self.lookup_timeout = lookup_timeout
+        self.use_suggester = use_suggester
+        self.connection_class = connection_class
         self.client = self._create_client()
 
     def _create_client(self) -> OpenSearch:
@@ -23,10 +50,19 @@ class OpenSearchClient:
             http_auth=(self.user, self.password),
             use_ssl=True,
             verify_certs=True,
-            connection_class=RequestsHttpConnection,
+            connection_class=self.connection_class,
             pool_maxsize=20,
         )
 
+    def warm_up(self) -> bool:
+        """
+        Open a pooled connection to the cluster ahead of the first query.
+
+        Returns:
+            bool: Whether the cluster answered
+        """
+        return self.client.ping()
+
     def put_alias_to_index(self, alias_name: str, index_name: str) -> bool:
         try:
             res = self.client.indices.put_alias(
@@ -44,37 +80,10 @@ class OpenSearchClient:
             with open(json_file_path, 'r') as file:
                 data = json.load(file)
                 if json_file_path == "./data/company_products.json":
-                    data = data.get('companies', [])
+                    return data.get('companies', [])
 
             for post in data:
-                if json_file_path == "./data/company_products.json":
-                    break
-
-                # Check if 'inventors' is a string and convert it if necessary and claims and classifications and citations
-                if isinstance(post.get('inventors'), str) or \
-                        isinstance(post.get('claims'), str) or \
-                        isinstance(post.get('classifications'), str) or \
-                        isinstance(post.get('citations'), str):
-                    try:
-                        # Safely evaluate the string representation to convert it to a list
-                        post['inventors'] = ast.literal_eval(post['inventors'])
-                        post['claims'] = ast.literal_eval(post['claims'])
-                        post['classifications'] = ast.literal_eval(
-                            post['classifications'])
-                        post['citations'] = ast.literal_eval(post['citations'])
-                    except (ValueError, SyntaxError) as e:
-                        print(
-                            f"Error parsing inventors for post {post.get('id')}: {e}")
-
-                # Ensure the 'inventors' field is a list or an empty list if not
-                if not isinstance(post['inventors'], list):
-                    post['inventors'] = []
-                if not isinstance(post['claims'], list):
-                    post['claims'] = []
-                if not isinstance(post['classifications'], list):
-                    post['classifications'] = []
-                if not isinstance(post['citations'], list):
-                    post['citations'] = []
+                normalize_patent(post)
 
         except FileNotFoundError:
             print(f"JSON file '{json_file_path}' not found.")
@@ -82,48 +91,21 @@ class OpenSearchClient:
 
         return data
 
-    def check_alias_and_index(self, target_index: str, alias: str) -> None:
-        try:
-            if self.client.indices.exists_alias(name=alias):
-                self.client.indices.delete_alias(
-                    name=alias, index=target_index)
-            else:
-                print(f"Alias '{alias}' not found")
-
-            if self.client.indices.exists(index=target_index):
-                self.client.indices.delete(index=target_index)
-            else:
-                print(f"Index '{target_index}' not found")
-
-        except Exception as e:
-            print(e)
-
-    def process(self, target_index: str, alias: str, index_setting: str, json_file_path: str, chunk_size: int = 100) -> int:
+    def process(self, target_index: str, alias: str, index_setting: str, json_file_path: str,
+                chunk_size: int = INGEST_CHUNK_DOCS) -> int:
+        """
+        Load a JSON file into a new `target_index`, then point `alias` at it.
+        The alias keeps serving its current index until the load is complete
+        and verified (see `patlytics.utils.reindex`).
+        """
         try:
-            self.check_alias_and_index(target_index, alias)
-            self.reindex(target_index, index_setting)
-            data = self.read_file(json_file_path)
-            chunks = [data[i: i + chunk_size]
-                      for i in range(0, len(data), chunk_size)]
-            count = 0
-            for chunk in chunks:
-                docs = []
-                for post_json in chunk:
-                    doc = {
-                        "_index": target_index,
-                        # if json_file_path is company_products.json, then use company_name as _id
-                        "_id": int(post_json["id"]) if json_file_path != "./data/company_products.json" else post_json["name"],
-                    }
-                    doc.update(post_json)
-                    docs.append(doc)
-
-                success, _ = helpers.bulk(self.client, docs)
-                count += success
-                print(f"Bulk indexed {success} documents")
-
-            self.client.indices.refresh(index=target_index)
-            self.put_alias_to_index(alias, target_index)
-            return count
+            # if json_file_path is company_products.json, then use company_name as _id
+            source = 'company_products' if json_file_path == "./data/company_products.json" else 'patents'
+            reindexer = BlueGreenReindexer(
+                self.client, BulkIngester(self.client, chunk_docs=chunk_size))
+            build = reindexer.build(alias, index_setting, json_file_path, source, target_index)
+            reindexer.swap([build])
+            return build['count']
         except Exception as e:
             print(e)
             return 0
@@ -140,113 +122,357 @@ class OpenSearchClient:
                 index=target_index, body=index_setting)
             print(f"Index '{target_index}' created")
 
-    def get_document_by_id(self, alias: str, doc_id: str | int, id_field: str = "_id") -> dict:
+    def get_document_by_id(self, alias: str, doc_id: str | int, id_field: str = "_id",
+                           fields: list[str] | None = None,
+                           excludes: list[str] | None = None) -> dict:
         """
         Get a document by its ID from any OpenSearch index/alias.
 
+        With the default `id_field`, this is a realtime get of the document;
+        with another field, the first document whose field equals `doc_id`.
+
         Args:
             alias (str): The index alias to search in (e.g., 'patents', 'company_products')
             doc_id (str|int): The document ID to retrieve
-            id_field (str, optional): The field name used as ID. Defaults to "id"
+            id_field (str, optional): The field name used as ID. Defaults to "_id"
+            fields (list[str], optional): Only return these `_source` fields
+            excludes (list[str], optional): Leave these `_source` fields out
 
         Returns:
             dict: Document if found, empty dict if not found
 
         Examples:
-            # Get patent
-            doc = client.get_document_by_id(PATENTS_ALIAS, 72)
+            # Get a patent's title and claims only
+            doc = client.get_document_by_id(PATENTS_ALIAS, 72, fields=["title", "claims"])
 
             # Get company product
             doc = client.get_document_by_id(COMPANY_PRODUCTS_ALIAS, "Company Name", id_field="name")
         """
         try:
+            if id_field == "_id":
+                response = self.client.get(
+                    index=alias, id=str(doc_id), **source_params(fields, excludes))
+                return response.get('_source', {})
+
             # Convert ID to int if the alias is patents (assuming patents use numeric IDs)
             if alias == PATENTS_ALIAS and isinstance(doc_id, str):
                 doc_id = int(doc_id)
 
-            response = self.client.search(
-                index=alias,
-                body={
-                    "query": {
-                        "term": {
-                            id_field: doc_id
-                        }
-                    }
-                }
-            )
-
-            hits = response['hits']['hits']
+            hits = self.search_documents(
+                alias, {"term": {id_field: doc_id}}, fields, excludes, size=1)
             if hits:
                 return hits[0]['_source']
             return {}
 
+        except NotFoundError:
+            return {}
         except Exception as e:
             print(
                 f"Error retrieving document from {alias} with {id_field}={doc_id}: {e}")
             return {}
 
-    def fuzzy_search_company(self, company_name: str, fuzziness: int = 2, min_score: float = 5.0) -> list[dict]:
+    def get_documents(self, alias: str, ids: list, fields: list[str] | None = None,
+                      excludes: list[str] | None = None,
+                      batch_size: int = OS_MGET_BATCH_SIZE) -> dict[str, dict]:
+        """
+        Get many documents by `_id` with one `mget` round trip per
+        `batch_size` ids, returning only the `_source` fields asked for.
+
+        Returns:
+            dict[str, dict]: id -> `_source` of every document found, in the
+            order of `ids`
+        """
+        ids = list(dict.fromkeys(str(doc_id) for doc_id in ids))
+        documents = {}
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            try:
+                response = self.client.mget(
+                    index=alias, body={"ids": batch}, **source_params(fields, excludes))
+            except Exception as e:
+                print(f"Error retrieving {len(batch)} documents from {alias}: {e}")
+                continue
+
+            for doc in response['docs']:
+                if doc.get('found'):
+                    documents[doc['_id']] = doc.get('_source', {})
+        return documents
+
+    def search_documents(self, alias: str, query: dict, fields: list[str] | None = None,
+                         excludes: list[str] | None = None, size: int = 10) -> list[dict]:
+        """
+        Run a query, returning at most `size` hits with `_id`, `_score` and
+        only the `_source` fields asked for. Errors are raised.
+        """
+        body = {"query": query, "size": size}
+        source = source_filter(fields, excludes)
+        if source is not None:
+            body["_source"] = source
+        response = self.client.search(index=alias, body=body)
+        return response['hits']['hits']
+
+    def fuzzy_search_company(self, company_name: str, fuzziness: int = 2, min_score: float = 5.0,
+                             size: int = OS_COMPANY_MATCHES,
+                             fields: list[str] | None = None) -> list[dict]:
         """
         Perform fuzzy search for company names in OpenSearch.
 
+        The search times out after `lookup_timeout` seconds and goes through
+        the circuit breaker: while it is open, no request is sent and the
+        result is empty, so callers fall back right away. With
+        `use_suggester` (v2 mappings), the `name.suggest` completion field
+        is queried instead and `min_score` does not apply; if the index
+        behind the alias has no such field (not reindexed to v2 yet), the
+        fuzzy search answers instead.
+
         Args:
             company_name (str): Company name to search for
             fuzziness (int): Maximum edit distance for fuzzy matching (default: 2)
             min_score (float): Minimum relevance score to include in results (default: 5.0)
+            size (int): Maximum number of matches
+            fields (list[str], optional): Only return these `_source` fields,
+                e.g. ["name"] when the products are not needed
 
         Returns:
             list[dict]: List of matching companies with their scores
         """
+        if not self.breaker.allow():
+            return []
         try:
-            query = {
-                "query": {
-                    "bool": {
-                        "should": [
-                            {
-                                "fuzzy": {
-                                    "name": {
-                                        "value": company_name,
-                                        "fuzziness": fuzziness,
-                                        "prefix_length": 2
-                                    }
-                                }
-                            },
-                            {
-                                "match": {
-                                    "name": {
-                                        "query": company_name,
-                                        "boost": 2.0
-                                    }
-                                }
+            matches = self._search_companies(company_name, fuzziness, min_score, size, fields)
+        except Exception as e:
+            self.breaker.record_failure()
+            metrics.incr('opensearch.company_lookup.errors')
+            print(f"Error performing fuzzy search: {e}")
+            return []
+
+        self.breaker.record_success()
+        return matches
+
+    def _search_companies(self, company_name: str, fuzziness: int, min_score: float,
+                          size: int, fields: list[str] | None) -> list[dict]:
+        if self.use_suggester:
+            try:
+                return company_suggestions(self.client.search(
+                    index=COMPANY_PRODUCTS_ALIAS,
+                    body=company_suggest_query(company_name, size, fields),
+                    request_timeout=self.lookup_timeout
+                ))
+            except RequestError as e:
+                suggester_failed(e)
+
+        return company_matches(self.client.search(
+            index=COMPANY_PRODUCTS_ALIAS,
+            body=fuzzy_company_query(company_name, fuzziness, min_score, size, fields),
+            request_timeout=self.lookup_timeout
+        ))
+
+
+def source_filter(fields: list[str] | None = None, excludes: list[str] | None = None):
+    """`_source` of a search body: None for the whole document."""
+    if fields is None and excludes is None:
+        return None
+    source = {}
+    if fields is not None:
+        source["includes"] = fields
+    if excludes is not None:
+        source["excludes"] = excludes
+    return source
+
+
+def source_params(fields: list[str] | None = None, excludes: list[str] | None = None) -> dict:
+    """`_source` filtering query parameters of get and mget."""
+    params = {}
+    if fields is not None:
+        params["_source_includes"] = fields
+    if excludes is not None:
+        params["_source_excludes"] = excludes
+    return params
+
+
+def fuzzy_company_query(company_name: str, fuzziness: int = 2, min_score: float = 5.0,
+                        size: int = OS_COMPANY_MATCHES, fields: list[str] | None = None) -> dict:
+    query = {
+        "query": {
+            "bool": {
+                "should": [
+                    {
+                        "fuzzy": {
+                            "name": {
+                                "value": company_name,
+                                "fuzziness": fuzziness,
+                                "prefix_length": 2
+                            }
+                        }
+                    },
+                    {
+                        "match": {
+                            "name": {
+                                "query": company_name,
+                                "boost": 2.0
                             }
-                        ]
+                        }
                     }
-                },
-                "min_score": min_score
+                ]
             }
+        },
+        "min_score": min_score,
+        "size": size
+    }
+    source = source_filter(fields)
+    if source is not None:
+        query["_source"] = source
+    return query
+
+
+def company_suggest_query(company_name: str, size: int = OS_COMPANY_MATCHES,
+                          fields: list[str] | None = None) -> dict:
+    """Fuzzy prefix lookup on the `name.suggest` completion field of v2 mappings."""
+    query = {
+        # Suggestions only: no hits from the implicit match_all
+        "size": 0,
+        "suggest": {
+            "company": {
+                "prefix": company_name,
+                "completion": {
+                    "field": "name.suggest",
+                    "size": size,
+                    "skip_duplicates": True,
+                    "fuzzy": {"fuzziness": "AUTO"}
+                }
+            }
+        }
+    }
+    source = source_filter(fields)
+    if source is not None:
+        query["_source"] = source
+    return query
+
+
+def suggester_failed(error: RequestError) -> None:
+    # A 400 from a healthy cluster, e.g. `name.suggest` missing from the
+    # index the alias points at: not a breaker failure
+    metrics.incr('opensearch.company_lookup.suggester_fallbacks')
+    print(f"Company suggester failed, falling back to fuzzy search: {error}")
+
 
-            response = self.client.search(
-                index=COMPANY_PRODUCTS_ALIAS,
-                body=query
-            )
+def company_suggestions(response: dict) -> list[dict]:
+    """Companies of a `company_suggest_query` response, best first."""
+    results = []
+    for entry in response.get('suggest', {}).get('company', []):
+        for option in entry['options']:
+            results.append({
+                'company_name': option['_source']['name'],
+                'score': option['_score'],
+                'data': option['_source']
+            })
 
-            results = []
-            for hit in response['hits']['hits']:
-                results.append({
-                    'company_name': hit['_source']['name'],
-                    'score': hit['_score'],
-                    'data': hit['_source']
-                })
+    return sorted(results, key=lambda x: x['score'], reverse=True)
 
-            return sorted(results, key=lambda x: x['score'], reverse=True)
 
+def company_matches(response: dict) -> list[dict]:
+    """Companies of a `fuzzy_company_query` response, best first."""
+    results = []
+    for hit in response['hits']['hits']:
+        results.append({
+            'company_name': hit['_source']['name'],
+            'score': hit['_score'],
+            'data': hit['_source']
+        })
+
+    return sorted(results, key=lambda x: x['score'], reverse=True)
+
+
+class AsyncOpenSearchClient:
+    """
+    Non-blocking counterpart of `OpenSearchClient` for the ASGI app, on
+    aiohttp. Only the per-request lookups are provided; indexing stays on
+    the blocking client.
+
+    The underlying session binds to the event loop of its first request, so
+    an instance must only be used from one loop.
+    """
+
+    def __init__(self, host: str, user: str, password: str,
+                 breaker: CircuitBreaker | None = None,
+                 lookup_timeout: float = OS_COMPANY_LOOKUP_TIMEOUT,
+                 use_suggester: bool = OS_COMPANY_SUGGESTER):
+        # aiohttp is only needed, and imported, in async serving mode
+        from opensearchpy import AsyncOpenSearch, AsyncHttpConnection
+
+        self.host = host
+        self.breaker = breaker if breaker is not None else company_lookup_breaker
+        self.lookup_timeout = lookup_timeout
+        self.use_suggester = use_suggester
+        self.client = AsyncOpenSearch(
+            hosts=host,
+            http_compress=True,
+            http_auth=(user, password),
+            use_ssl=True,
+            verify_certs=True,
+            connection_class=AsyncHttpConnection,
+            maxsize=OS_ASYNC_POOL_SIZE,
+        )
+
+    async def warm_up(self) -> bool:
+        return await self.client.ping()
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def fuzzy_search_company(self, company_name: str, fuzziness: int = 2,
+                                   min_score: float = 5.0, size: int = OS_COMPANY_MATCHES,
+                                   fields: list[str] | None = None) -> list[dict]:
+        """See `OpenSearchClient.fuzzy_search_company`."""
+        if not self.breaker.allow():
+            return []
+        try:
+            matches = await self._search_companies(
+                company_name, fuzziness, min_score, size, fields)
         except Exception as e:
+            self.breaker.record_failure()
+            metrics.incr('opensearch.company_lookup.errors')
             print(f"Error performing fuzzy search: {e}")
             return []
 
+        self.breaker.record_success()
+        return matches
 
-# Create a default instance
-default_client = OpenSearchClient(OS_HOST, OS_USER, OS_PASSWORD)
+    async def _search_companies(self, company_name: str, fuzziness: int, min_score: float,
+                                size: int, fields: list[str] | None) -> list[dict]:
+        if self.use_suggester:
+            try:
+                return company_suggestions(await self.client.search(
+                    index=COMPANY_PRODUCTS_ALIAS,
+                    body=company_suggest_query(company_name, size, fields),
+                    request_timeout=self.lookup_timeout
+                ))
+            except RequestError as e:
+                suggester_failed(e)
+
+        return company_matches(await self.client.search(
+            index=COMPANY_PRODUCTS_ALIAS,
+            body=fuzzy_company_query(company_name, fuzziness, min_score, size, fields),
+            request_timeout=self.lookup_timeout
+        ))
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> OpenSearchClient:
+    """
+    Get the process-wide client, created on first use rather than at import
+    so importing this module never touches OpenSearch.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                from config import OS_HOST, OS_USER, OS_PASSWORD
+                _default_client = OpenSearchClient(OS_HOST, OS_USER, OS_PASSWORD)
+    return _default_client
 
 if __name__ == "__main__":
     """
@@ -258,6 +484,9 @@ if __name__ == "__main__":
     2. Loads data from JSON files into these indices
     3. Sets up aliases (PATENTS_ALIAS, COMPANY_PRODUCTS_ALIAS) to point to the new indices
 
+    To rebuild indices that are serving, use the blue/green reindex instead:
+        python -m patlytics.utils.reindex patents company_products
+
     Usage:
     - Uncomment the code below when you need to:
         * Set up indices for the first time
@@ -268,6 +497,7 @@ if __name__ == "__main__":
     - patents-20240320 -> patents (alias)
     - company_products-20240320 -> company_products (alias)
     """
+    # default_client = get_default_client()
     # tw_datetime = datetime.utcnow().strftime("%Y%m%d")
 
     # Index patents data
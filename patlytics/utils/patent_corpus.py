@@ -0,0 +1,286 @@
+"""
+Compiled, memory-mappable patent corpus.
+
+`compile_corpus` turns the `patents.json` dump into a single binary file that
+gunicorn workers can `mmap` and share through the page cache. `PatentCorpus`
+reads it without materializing records: lookups binary-search the offset
+tables in place and fields are JSON-decoded only when accessed.
+
+Layout (little endian):
+
+    header       magic, version, flags, record/field counts, table offsets
+    fields       u16 length + utf-8 name, one per field
+    blocks       one JSON-encoded (optionally zlib-compressed) block per field
+    records      per record, one (offset u64, length u32, codec u8) entry per field
+    id index     (id i64, record offset u64), sorted by id
+    pub index    (string offset u64, length u16, record offset u64), sorted by
+                 publication number, followed by the publication number blob
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Mapping
+from typing import Iterator, Optional
+
+MAGIC = b"PTCORP1\0"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHIHHQQQ")
+FIELD_ENTRY = struct.Struct("<QIB")
+ID_ENTRY = struct.Struct("<qQ")
+PUB_ENTRY = struct.Struct("<QHQ")
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_MISSING = 255
+
+# Blocks smaller than this are not worth a zlib stream
+MIN_COMPRESS_SIZE = 256
+
+_MISSING = object()
+
+
+def is_corpus_file(file_path: str) -> bool:
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def compile_corpus(json_file_path: str, corpus_file_path: str, compress: bool = True) -> int:
+    """
+    Compile a patents JSON dump into a corpus file.
+
+    The output is written next to the target and moved into place with
+    `os.replace`, so workers that have the previous file mapped keep a
+    consistent view until they reload.
+
+    Args:
+        json_file_path (str): Path to the JSON array of patent records
+        corpus_file_path (str): Path of the corpus file to write
+        compress (bool): zlib-compress blocks when it makes them smaller
+
+    Returns:
+        int: Number of records written
+    """
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        patents = json.load(f)
+
+    fields = []
+    for patent in patents:
+        for key in patent:
+            if key not in fields:
+                fields.append(key)
+    field_table = b"".join(
+        struct.pack("<H", len(name.encode('utf-8'))) + name.encode('utf-8')
+        for name in fields
+    )
+
+    tmp_path = f"{corpus_file_path}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(b"\0" * HEADER.size)
+        fields_offset = out.tell()
+        out.write(field_table)
+
+        record_entries = []
+        for patent in patents:
+            entries = []
+            for name in fields:
+                if name not in patent:
+                    entries.append((0, 0, CODEC_MISSING))
+                    continue
+                block = json.dumps(patent[name], ensure_ascii=False).encode('utf-8')
+                codec = CODEC_RAW
+                if compress and len(block) >= MIN_COMPRESS_SIZE:
+                    compressed = zlib.compress(block, 6)
+                    if len(compressed) < len(block):
+                        block, codec = compressed, CODEC_ZLIB
+                entries.append((out.tell(), len(block), codec))
+                out.write(block)
+            record_entries.append(entries)
+
+        record_offsets = []
+        for entries in record_entries:
+            record_offsets.append(out.tell())
+            for entry in entries:
+                out.write(FIELD_ENTRY.pack(*entry))
+
+        index_offset = out.tell()
+        ids = sorted(
+            (int(patent['id']), offset)
+            for patent, offset in zip(patents, record_offsets)
+        )
+        for patent_id, offset in ids:
+            out.write(ID_ENTRY.pack(patent_id, offset))
+
+        pubidx_offset = out.tell()
+        publications = sorted(
+            (patent['publication_number'].encode('utf-8'), offset)
+            for patent, offset in zip(patents, record_offsets)
+            if patent.get('publication_number')
+        )
+        blob_offset = pubidx_offset + 4 + PUB_ENTRY.size * len(publications)
+        out.write(struct.pack("<I", len(publications)))
+        for number, offset in publications:
+            out.write(PUB_ENTRY.pack(blob_offset, len(number), offset))
+            blob_offset += len(number)
+        for number, _ in publications:
+            out.write(number)
+
+        out.seek(0)
+        out.write(HEADER.pack(
+            MAGIC, VERSION, 1 if compress else 0, len(patents), len(fields),
+            0, fields_offset, index_offset, pubidx_offset
+        ))
+
+    os.replace(tmp_path, corpus_file_path)
+    return len(patents)
+
+
+class PatentRecord(Mapping):
+    """Read-only view of one record; fields are decoded on first access."""
+
+    __slots__ = ('_corpus', '_offset', '_decoded')
+
+    def __init__(self, corpus: 'PatentCorpus', offset: int):
+        self._corpus = corpus
+        self._offset = offset
+        self._decoded = {}
+
+    def __getitem__(self, key: str):
+        if key in self._decoded:
+            return self._decoded[key]
+        position = self._corpus.field_positions.get(key)
+        if position is None:
+            raise KeyError(key)
+        value = self._corpus.decode_field(self._offset, position)
+        if value is _MISSING:
+            raise KeyError(key)
+        self._decoded[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        for key, position in self._corpus.field_positions.items():
+            if self._corpus.has_field(self._offset, position):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        return {key: self[key] for key in self}
+
+
+class PatentCorpus:
+    """
+    Memory-mapped reader for files written by `compile_corpus`.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.record_count, field_count, _,
+         fields_offset, self._index_offset, pubidx_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{file_path}' is not a patent corpus file")
+
+        self.field_positions = {}
+        position = fields_offset
+        for i in range(field_count):
+            (length,) = struct.unpack_from("<H", self._mm, position)
+            name = self._mm[position + 2: position + 2 + length].decode('utf-8')
+            self.field_positions[name] = i
+            position += 2 + length
+
+        (self._pub_count,) = struct.unpack_from("<I", self._mm, pubidx_offset)
+        self._pub_offset = pubidx_offset + 4
+
+    def _entry(self, record_offset: int, position: int) -> tuple:
+        return FIELD_ENTRY.unpack_from(
+            self._mm, record_offset + position * FIELD_ENTRY.size)
+
+    def has_field(self, record_offset: int, position: int) -> bool:
+        return self._entry(record_offset, position)[2] != CODEC_MISSING
+
+    def decode_field(self, record_offset: int, position: int):
+        offset, length, codec = self._entry(record_offset, position)
+        if codec == CODEC_MISSING:
+            return _MISSING
+        block = self._mm[offset: offset + length]
+        if codec == CODEC_ZLIB:
+            block = zlib.decompress(block)
+        return json.loads(block)
+
+    def get(self, patent_id: str | int) -> Optional[PatentRecord]:
+        """
+        Get a patent record by its id, or None if not found.
+        """
+        patent_id = int(patent_id)
+        lo, hi = 0, self.record_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_id, offset = ID_ENTRY.unpack_from(
+                self._mm, self._index_offset + mid * ID_ENTRY.size)
+            if mid_id == patent_id:
+                return PatentRecord(self, offset)
+            if mid_id < patent_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def get_by_publication_number(self, publication_number: str) -> Optional[PatentRecord]:
+        """
+        Get a patent record by its publication number, or None if not found.
+        """
+        target = publication_number.encode('utf-8')
+        lo, hi = 0, self._pub_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            string_offset, length, offset = PUB_ENTRY.unpack_from(
+                self._mm, self._pub_offset + mid * PUB_ENTRY.size)
+            number = self._mm[string_offset: string_offset + length]
+            if number == target:
+                return PatentRecord(self, offset)
+            if number < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def records(self) -> Iterator[PatentRecord]:
+        """
+        Iterate over every record, in id order.
+        """
+        for i in range(self.record_count):
+            _, offset = ID_ENTRY.unpack_from(
+                self._mm, self._index_offset + i * ID_ENTRY.size)
+            yield PatentRecord(self, offset)
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile a patents JSON dump into a memory-mappable corpus file")
+    parser.add_argument('json_file', help="e.g. ./data/patents.json")
+    parser.add_argument('corpus_file', help="e.g. ./data/patents.corpus")
+    parser.add_argument('--no-compress', action='store_true',
+                        help="store blocks uncompressed")
+    args = parser.parse_args()
+
+    count = compile_corpus(
+        args.json_file, args.corpus_file, compress=not args.no_compress)
+    print(f"Compiled {count} patents into '{args.corpus_file}' "
+          f"({os.path.getsize(args.corpus_file)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
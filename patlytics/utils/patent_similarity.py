@@ -0,0 +1,272 @@
+import json
+from typing import Iterable, Optional
+
+import numpy as np
+
+from config import PATENTS_CORPUS_FILE, PATENTS_FILE, SIMILARITY_SVD_COMPONENTS
+from patlytics.utils.claim_selection import parse_claims, tokenize
+from patlytics.utils.file_snapshot import FileSnapshot
+from patlytics.utils.patent_corpus import PatentCorpus, is_corpus_file
+
+# Rows scored per matrix product, so temporaries stay cache-sized on large corpora
+SCORE_BLOCK_ROWS = 1 << 16
+
+
+def patent_text(patent) -> str:
+    """Title, abstract and claim texts of a patent record."""
+    claims = patent.get('claims', '')
+    try:
+        claims_text = " ".join(claim['text'] for claim in parse_claims(claims))
+    except (ValueError, TypeError):
+        claims_text = claims if isinstance(claims, str) else str(claims)
+    return " ".join([patent.get('title', ''), patent.get('abstract', ''), claims_text])
+
+
+def _sparse_dot(rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+                dense: np.ndarray, row_count: int) -> np.ndarray:
+    """(row_count x n) sparse matrix in coordinate form times a dense (n x k) matrix."""
+    out = np.empty((row_count, dense.shape[1]), dtype=np.float32)
+    for j in range(dense.shape[1]):
+        out[:, j] = np.bincount(rows, values * dense[cols, j], minlength=row_count)
+    return out
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (matrix / norms).astype(np.float32)
+
+
+class SimilarityIndex:
+    """
+    TF-IDF vectors of a document collection, searchable by free text.
+
+    Documents are stored as an L2-normalized sparse matrix in term-major
+    (inverted) order, so a query only touches the postings of its own
+    terms. With `svd_components`, documents are also projected onto a
+    truncated SVD of that matrix and stored as a dense float32
+    (documents x components) matrix, which matches related wording that
+    shares no exact term; queries are then scored with dense products.
+    """
+
+    def __init__(self, rows: np.ndarray, terms: np.ndarray, counts: np.ndarray,
+                 doc_count: int, vocabulary: dict[str, int],
+                 svd_components: Optional[int] = None, seed: int = 0):
+        """
+        Args:
+            rows, terms, counts: Document-term counts in coordinate form
+            doc_count (int): Number of documents (rows)
+            vocabulary (dict[str, int]): Token -> term id
+            svd_components (int|None): Dense dimensions, None or 0 for sparse only
+            seed (int): Seed of the randomized SVD
+        """
+        self.doc_count = doc_count
+        self.vocabulary = vocabulary
+        term_count = len(vocabulary)
+
+        rows = np.asarray(rows, dtype=np.int32)
+        terms = np.asarray(terms, dtype=np.int32)
+        counts = np.asarray(counts, dtype=np.float32)
+
+        doc_freq = np.bincount(terms, minlength=term_count)
+        self.idf = (np.log((doc_count + 1) / (doc_freq + 1)) + 1).astype(np.float32)
+
+        weights = (1 + np.log(counts)) * self.idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=doc_count))
+        norms[norms == 0] = 1
+        weights = (weights / norms[rows]).astype(np.float32)
+
+        order = np.argsort(terms, kind='stable')
+        self.postings_docs = rows[order]
+        self.postings_weights = weights[order]
+        self.term_offsets = np.zeros(term_count + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=self.term_offsets[1:])
+
+        self.components = None
+        self.doc_vectors = None
+        if svd_components:
+            self.components, self.doc_vectors = self._truncated_svd(
+                rows, terms, weights, svd_components, seed)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[list[str]], **kwargs) -> 'SimilarityIndex':
+        """Build an index from tokenized documents."""
+        vocabulary = {}
+        rows, terms, counts = [], [], []
+        doc_count = 0
+        for row, document in enumerate(documents):
+            doc_count += 1
+            if not document:
+                continue
+            doc_terms, doc_counts = np.unique(
+                [vocabulary.setdefault(token, len(vocabulary)) for token in document],
+                return_counts=True)
+            rows.append(np.full(len(doc_terms), row, dtype=np.int32))
+            terms.append(doc_terms.astype(np.int32))
+            counts.append(doc_counts)
+
+        if not rows:
+            empty = np.zeros(0, dtype=np.int32)
+            return cls(empty, empty, empty, doc_count, vocabulary, **kwargs)
+        return cls(np.concatenate(rows), np.concatenate(terms), np.concatenate(counts),
+                   doc_count, vocabulary, **kwargs)
+
+    def _truncated_svd(self, rows, terms, weights, k, seed, oversample=10, power_iterations=2):
+        """
+        Randomized truncated SVD (Halko et al.) of the sparse matrix.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (terms x k) components and
+            L2-normalized (documents x k) document vectors, float32
+        """
+        term_count = len(self.vocabulary)
+        k = max(1, min(k, self.doc_count, term_count))
+        sketch = min(k + oversample, self.doc_count, term_count)
+        rng = np.random.default_rng(seed)
+
+        basis = _sparse_dot(
+            rows, terms, weights,
+            rng.standard_normal((term_count, sketch)).astype(np.float32), self.doc_count)
+        for _ in range(power_iterations):
+            basis, _ = np.linalg.qr(basis)
+            projected, _ = np.linalg.qr(
+                _sparse_dot(terms, rows, weights, basis, term_count))
+            basis = _sparse_dot(rows, terms, weights, projected, self.doc_count)
+        basis, _ = np.linalg.qr(basis)
+
+        # B = Q^T X is only sketch x terms, small enough for a dense SVD
+        reduced = _sparse_dot(terms, rows, weights, basis, term_count).T
+        u, s, vt = np.linalg.svd(reduced, full_matrices=False)
+        components = vt[:k].T.astype(np.float32)
+        doc_vectors = (basis @ (u[:, :k] * s[:k])).astype(np.float32)
+        return components, _normalize_rows(doc_vectors)
+
+    def _query_terms(self, tokens: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        known = [self.vocabulary[token] for token in tokens if token in self.vocabulary]
+        if not known:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        terms, counts = np.unique(known, return_counts=True)
+        weights = (1 + np.log(counts)) * self.idf[terms]
+        return terms, (weights / np.linalg.norm(weights)).astype(np.float32)
+
+    def scores(self, queries: list[list[str]]) -> np.ndarray:
+        """
+        Cosine similarity of every document to each tokenized query.
+
+        Returns:
+            np.ndarray: (queries x documents) float32 scores
+        """
+        query_terms = [self._query_terms(tokens) for tokens in queries]
+        if self.doc_vectors is not None:
+            query_vectors = np.zeros(
+                (self.components.shape[1], len(queries)), dtype=np.float32)
+            for j, (terms, weights) in enumerate(query_terms):
+                if len(terms):
+                    query_vectors[:, j] = weights @ self.components[terms]
+            norms = np.linalg.norm(query_vectors, axis=0)
+            norms[norms == 0] = 1
+            query_vectors /= norms
+
+            scores = np.empty((len(queries), self.doc_count), dtype=np.float32)
+            for start in range(0, self.doc_count, SCORE_BLOCK_ROWS):
+                block = self.doc_vectors[start: start + SCORE_BLOCK_ROWS]
+                scores[:, start: start + len(block)] = (block @ query_vectors).T
+            return scores
+
+        scores = np.zeros((len(queries), self.doc_count), dtype=np.float32)
+        for j, (terms, weights) in enumerate(query_terms):
+            if not len(terms):
+                continue
+            starts = self.term_offsets[terms]
+            lengths = self.term_offsets[terms + 1] - starts
+            # Positions of every posting of the query terms, in one gather
+            positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) \
+                + np.arange(lengths.sum())
+            scores[j] = np.bincount(
+                self.postings_docs[positions],
+                self.postings_weights[positions] * np.repeat(weights, lengths),
+                minlength=self.doc_count)
+        return scores
+
+    def top_k(self, queries: list[list[str]], k: int) -> list[list[tuple[int, float]]]:
+        """
+        Best `k` documents for each tokenized query, best first.
+
+        Returns:
+            list[list[tuple[int, float]]]: (row, score) pairs per query,
+            without documents scoring 0
+        """
+        if not queries or not self.doc_count or k <= 0:
+            return [[] for _ in queries]
+
+        scores = self.scores(queries)
+        k = min(k, self.doc_count)
+        results = []
+        for row_scores in scores:
+            if k < self.doc_count:
+                candidates = np.argpartition(-row_scores, k - 1)[:k]
+            else:
+                candidates = np.arange(self.doc_count)
+            ranked = candidates[np.argsort(-row_scores[candidates], kind='stable')]
+            results.append([
+                (int(i), float(row_scores[i])) for i in ranked if row_scores[i] > 0
+            ])
+        return results
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.idf, self.postings_docs, self.postings_weights, self.term_offsets]
+        if self.doc_vectors is not None:
+            arrays += [self.components, self.doc_vectors]
+        return sum(array.nbytes for array in arrays)
+
+
+class _PatentSimilarity:
+    def __init__(self, ids: np.ndarray, index: SimilarityIndex):
+        self.ids = ids
+        self.index = index
+
+
+class PatentSimilarityIndex(FileSnapshot):
+    """
+    Process-wide "patents similar to this text" search over the patents
+    dump (JSON or compiled corpus), rebuilt when the file's mtime changes.
+    """
+
+    def __init__(self, file_path: str = PATENTS_CORPUS_FILE or PATENTS_FILE,
+                 svd_components: Optional[int] = SIMILARITY_SVD_COMPONENTS):
+        super().__init__(file_path)
+        self.svd_components = svd_components
+
+    def _build(self, file_path: str) -> _PatentSimilarity:
+        if is_corpus_file(file_path):
+            corpus = PatentCorpus(file_path)
+            patents = list(corpus.records())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                patents = json.load(f)
+
+        ids = np.array([int(patent['id']) for patent in patents], dtype=np.int64)
+        index = SimilarityIndex.from_documents(
+            (tokenize(patent_text(patent)) for patent in patents),
+            svd_components=self.svd_components)
+        return _PatentSimilarity(ids, index)
+
+    def search(self, text: str, top_k: int = 10) -> list[tuple[int, float]]:
+        """
+        Find the patents most similar to a free-text description.
+
+        Args:
+            text (str): e.g. a product name and description
+            top_k (int): Maximum number of patents
+
+        Returns:
+            list[tuple[int, float]]: (patent id, cosine similarity 0-1), best first
+        """
+        current = self._current()
+        (matches,) = current.index.top_k([tokenize(text)], top_k)
+        return [(int(current.ids[row]), round(score, 4)) for row, score in matches]
+
+
+# Create a default instance
+default_similarity_index = PatentSimilarityIndex()
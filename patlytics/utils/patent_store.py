@@ -0,0 +1,76 @@
+import json
+from collections.abc import Mapping
+from typing import Optional
+
+from config import PATENTS_CORPUS_FILE, PATENTS_FILE
+from patlytics.utils.file_snapshot import FileSnapshot
+from patlytics.utils.patent_corpus import PatentCorpus, is_corpus_file
+
+
+class _JsonPatentIndex:
+    """In-memory index over a parsed patents JSON dump."""
+
+    def __init__(self, patents: list[dict]):
+        self.by_id = {}
+        self.by_publication_number = {}
+        for patent in patents:
+            self.by_id[int(patent['id'])] = patent
+            publication_number = patent.get('publication_number')
+            if publication_number:
+                self.by_publication_number[publication_number] = patent
+
+    def get(self, patent_id: int) -> Optional[dict]:
+        return self.by_id.get(patent_id)
+
+    def get_by_publication_number(self, publication_number: str) -> Optional[dict]:
+        return self.by_publication_number.get(publication_number)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+class PatentStore(FileSnapshot):
+    """
+    Process-wide, read-only view of the patents dump.
+
+    The file is parsed once and kept resident, keyed by integer id and by
+    publication number, and reloaded when its mtime changes. A file compiled
+    with `patent_corpus.compile_corpus` is memory-mapped instead of parsed,
+    and its fields are decoded lazily.
+    """
+
+    def __init__(self, file_path: str = PATENTS_CORPUS_FILE or PATENTS_FILE):
+        super().__init__(file_path)
+
+    def _build(self, file_path: str):
+        if is_corpus_file(file_path):
+            return PatentCorpus(file_path)
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            patents = json.load(f)
+        return _JsonPatentIndex(patents)
+
+    def get(self, patent_id: str | int) -> Optional[Mapping]:
+        """
+        Get a patent record by its id.
+
+        Args:
+            patent_id (str|int): Patent id, as stored in the `id` field
+
+        Returns:
+            Mapping: Patent record, or None if not found
+        """
+        return self._current().get(int(patent_id))
+
+    def get_by_publication_number(self, publication_number: str) -> Optional[Mapping]:
+        """
+        Get a patent record by its publication number (e.g. 'US-RE49889-E1').
+        """
+        return self._current().get_by_publication_number(publication_number)
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+
+# Create a default instance
+default_patent_store = PatentStore()
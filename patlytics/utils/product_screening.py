@@ -0,0 +1,102 @@
+import numpy as np
+
+from patlytics.utils.claim_selection import tokenize
+
+
+def tfidf_scores(query: list[str], documents: list[list[str]]) -> np.ndarray:
+    """
+    Cosine similarity between a tokenized query and every tokenized
+    document, using sublinear-tf TF-IDF weights with IDF smoothed over the
+    documents and the query.
+
+    The document-term matrix is kept in coordinate form (row, term, count),
+    so memory grows with the number of tokens rather than with
+    documents x vocabulary.
+
+    Returns:
+        np.ndarray: float32 scores in [0, 1], one per document
+    """
+    if not documents:
+        return np.zeros(0, dtype=np.float32)
+
+    vocabulary = {}
+    rows, terms, counts = [], [], []
+    for row, document in enumerate(documents):
+        doc_terms, doc_counts = np.unique(
+            [vocabulary.setdefault(token, len(vocabulary)) for token in document],
+            return_counts=True)
+        rows.append(np.full(len(doc_terms), row, dtype=np.int32))
+        terms.append(doc_terms.astype(np.int32))
+        counts.append(doc_counts)
+
+    query_terms, query_counts = np.unique(
+        [vocabulary.setdefault(token, len(vocabulary)) for token in query],
+        return_counts=True)
+    query_terms = query_terms.astype(np.int32)
+
+    rows = np.concatenate(rows)
+    terms = np.concatenate(terms)
+    counts = np.concatenate(counts).astype(np.float32)
+
+    doc_count = len(documents) + 1
+    doc_freq = np.bincount(terms, minlength=len(vocabulary)).astype(np.float32)
+    doc_freq[query_terms] += 1
+    idf = np.log(doc_count / doc_freq) + 1
+
+    weights = (1 + np.log(counts)) * idf[terms]
+    query_vector = np.zeros(len(vocabulary), dtype=np.float32)
+    query_vector[query_terms] = (1 + np.log(query_counts)) * idf[query_terms]
+
+    dots = np.bincount(rows, weights * query_vector[terms], minlength=len(documents))
+    norms = np.sqrt(np.bincount(rows, weights ** 2, minlength=len(documents)))
+    norms *= np.linalg.norm(query_vector)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(norms > 0, dots / norms, 0)
+    return scores.astype(np.float32)
+
+
+def screen_products(products: list[dict], patent_text: str, top_k: int | None = None,
+                    min_score: float = 0.0) -> tuple[list[dict], list[dict]]:
+    """
+    Split a company's products into those worth an LLM analysis and those
+    sharing too little vocabulary with the patent.
+
+    A product is kept if it is among the `top_k` best scoring ones (all if
+    None) and scores at least `min_score`; the best scoring product is
+    always kept so every analysis has something to rank.
+
+    Args:
+        products (list[dict]): Products with `name` and `description`
+        patent_text (str): Patent title, abstract and claims
+        top_k (int|None): Maximum number of products kept
+        min_score (float): Minimum cosine similarity (0-1) of kept products
+
+    Returns:
+        tuple[list[dict], list[dict]]: Kept products in their original
+        order, and {"product_name", "screening_score"} for each skipped
+        product, best first
+    """
+    if not products:
+        return [], []
+
+    scores = tfidf_scores(
+        tokenize(patent_text),
+        [tokenize(f"{product['name']} {product.get('description', '')}")
+         for product in products])
+
+    # Stable sort keeps catalog order between equal scores
+    ranked = np.argsort(-scores, kind='stable')
+    keep = scores >= min_score
+    if top_k is not None:
+        keep[ranked[top_k:]] = False
+    keep[ranked[0]] = True
+
+    selected = [product for product, kept in zip(products, keep) if kept]
+    skipped = [
+        {
+            "product_name": products[i]['name'],
+            "screening_score": round(float(scores[i]), 4)
+        }
+        for i in ranked if not keep[i]
+    ]
+    return selected, skipped
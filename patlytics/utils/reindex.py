@@ -0,0 +1,220 @@
+"""
+Blue/green reindex: load each dump into a new timestamped index while the
+aliases keep serving the old ones, then repoint every alias in a single
+atomic `update_aliases` call. Search never sees a missing or half-loaded
+index, and the previous indices are kept for a rollback unless
+`--delete-old` is given.
+
+Usage:
+    python -m patlytics.utils.reindex patents company_products [--force-merge] [--delete-old]
+    python -m patlytics.utils.reindex patents --path ./dump.ndjson --checkpoint ./dump.checkpoint
+
+To resume a failed load, rerun it with `--index` set to the index it created.
+"""
+import argparse
+import copy
+from datetime import datetime, timezone
+
+from opensearchpy import NotFoundError
+
+from config import (
+    COMPANY_PRODUCTS_ALIAS,
+    COMPANY_PRODUCTS_FILE,
+    PATENTS_ALIAS,
+    OS_MAPPING_VERSION,
+    PATENTS_FILE,
+    REINDEX_HEALTH_TIMEOUT
+)
+from patlytics.opensearch_settings import company_products_v1, company_products_v2, patents_v1, patents_v2
+from patlytics.utils.bulk_ingest import BulkIngester
+
+# Index settings of each source, per mapping version
+MAPPINGS = {
+    'v1': {'patents': patents_v1.INDEX_SETTINGS,
+           'company_products': company_products_v1.INDEX_SETTINGS},
+    'v2': {'patents': patents_v2.INDEX_SETTINGS,
+           'company_products': company_products_v2.INDEX_SETTINGS},
+}
+
+# Alias, index settings and default dump of each ingest source
+TARGETS = {
+    'patents': (PATENTS_ALIAS, MAPPINGS[OS_MAPPING_VERSION]['patents'], PATENTS_FILE),
+    'company_products': (COMPANY_PRODUCTS_ALIAS, MAPPINGS[OS_MAPPING_VERSION]['company_products'],
+                         COMPANY_PRODUCTS_FILE),
+}
+
+# Index settings while bulk loading: no periodic refresh, no replicas to copy
+# every document to
+BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+def timestamped_index(alias: str, now: datetime | None = None) -> str:
+    now = now or datetime.now(timezone.utc)
+    return f"{alias}-{now.strftime('%Y%m%d%H%M%S')}"
+
+
+def bulk_load_settings(index_settings: dict) -> dict:
+    """`index_settings` with refresh and replicas turned off for the load."""
+    body = copy.deepcopy(index_settings)
+    body.setdefault("settings", {}).setdefault("index", {}).update(BULK_LOAD_SETTINGS)
+    return body
+
+
+def serving_settings(index_settings: dict) -> dict:
+    """
+    The refresh and replica settings to restore after the load: those of
+    `index_settings`, or None to reset the cluster default.
+    """
+    index = index_settings.get("settings", {}).get("index", {})
+    return {name: index.get(name) for name in BULK_LOAD_SETTINGS}
+
+
+class BlueGreenReindexer:
+    """
+    Builds new indices in bulk-load mode (`refresh_interval` -1, no
+    replicas), restores their settings, verifies them and swaps the aliases.
+    """
+
+    def __init__(self, client, ingester: BulkIngester | None = None, force_merge: bool = False,
+                 wait_for_status: str = "green", health_timeout: str = REINDEX_HEALTH_TIMEOUT):
+        self.client = client
+        self.ingester = ingester or BulkIngester(client)
+        self.force_merge = force_merge
+        self.wait_for_status = wait_for_status
+        self.health_timeout = health_timeout
+
+    def build(self, alias: str, index_settings: dict, path: str, source: str,
+              target_index: str | None = None, checkpoint_path: str | None = None) -> dict:
+        """
+        Create and load a new index for `alias` without touching the alias.
+
+        Returns:
+            dict: The alias, the new index and its document count
+
+        Raises:
+            RuntimeError: If documents failed or the index count is off
+        """
+        target_index = target_index or timestamped_index(alias)
+        if not self.client.indices.exists(index=target_index):
+            self.client.indices.create(index=target_index, body=bulk_load_settings(index_settings))
+            print(f"Index '{target_index}' created")
+        else:
+            # Resuming a load: make sure it is still in bulk-load mode
+            self.client.indices.put_settings(
+                index=target_index, body={"index": BULK_LOAD_SETTINGS})
+
+        result = self.ingester.run(path, target_index, source, checkpoint_path)
+        print(f"Bulk indexed {result['indexed']} documents into '{target_index}' "
+              f"in {result['seconds']:.1f} s")
+
+        self.client.indices.put_settings(
+            index=target_index, body={"index": serving_settings(index_settings)})
+        self.client.indices.refresh(index=target_index)
+        if self.force_merge:
+            self.client.indices.forcemerge(index=target_index, max_num_segments=1)
+
+        expected = result['indexed'] + result['skipped']
+        count = self.client.count(index=target_index)['count']
+        if result['failed'] or count != expected:
+            raise RuntimeError(
+                f"Index '{target_index}' has {count} documents, expected {expected} "
+                f"({result['failed']} failed); alias '{alias}' left unchanged")
+
+        if self.wait_for_status:
+            health = self.client.cluster.health(
+                index=target_index, wait_for_status=self.wait_for_status,
+                timeout=self.health_timeout)
+            if health.get('timed_out'):
+                raise RuntimeError(
+                    f"Index '{target_index}' is {health.get('status')}, not "
+                    f"{self.wait_for_status}; alias '{alias}' left unchanged")
+
+        return {"alias": alias, "index": target_index, "count": count}
+
+    def aliased_indices(self, alias: str) -> list[str]:
+        try:
+            return sorted(self.client.indices.get_alias(name=alias))
+        except NotFoundError:
+            return []
+
+    def swap(self, builds: list[dict], delete_old: bool = False) -> dict[str, list[str]]:
+        """
+        Point every alias at its new index in one atomic `update_aliases`.
+
+        Returns:
+            dict: alias -> indices it pointed to before
+        """
+        previous = {build['alias']: self.aliased_indices(build['alias']) for build in builds}
+        actions = []
+        for build in builds:
+            for index in previous[build['alias']]:
+                if index != build['index']:
+                    actions.append({"remove": {"index": index, "alias": build['alias']}})
+            actions.append({"add": {"index": build['index'], "alias": build['alias']}})
+        self.client.indices.update_aliases(body={"actions": actions})
+        for build in builds:
+            print(f"Alias '{build['alias']}' -> '{build['index']}' "
+                  f"(was {previous[build['alias']] or 'unset'})")
+
+        if delete_old:
+            for build in builds:
+                for index in previous[build['alias']]:
+                    if index != build['index']:
+                        self.client.indices.delete(index=index)
+                        print(f"Index '{index}' deleted")
+        return previous
+
+    def reindex(self, sources: list[str], paths: dict | None = None,
+                delete_old: bool = False, mapping: str = OS_MAPPING_VERSION) -> list[dict]:
+        """
+        Build a new index per source (from `paths`, else its default data
+        file) with the `mapping` settings, then swap all their aliases at
+        once. Nothing is swapped if any build fails.
+        """
+        paths = paths or {}
+        builds = []
+        for source in sources:
+            alias, _, default_path = TARGETS[source]
+            index_settings = MAPPINGS[mapping][source]
+            builds.append(self.build(
+                alias, index_settings, paths.get(source, default_path), source))
+        self.swap(builds, delete_old)
+        return builds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('sources', nargs='+', choices=sorted(TARGETS))
+    parser.add_argument('--path', help="Dump to load instead of the default data file "
+                                       "(one source only)")
+    parser.add_argument('--index', help="New index name, e.g. the one of a load to resume "
+                                        "(one source only)")
+    parser.add_argument('--checkpoint', help="Resume file of the load (one source only)")
+    parser.add_argument('--force-merge', action='store_true',
+                        help="Merge each new index to one segment before the swap")
+    parser.add_argument('--delete-old', action='store_true',
+                        help="Delete the indices the aliases pointed to before")
+    parser.add_argument('--wait-for-status', default='green', choices=['green', 'yellow'])
+    parser.add_argument('--mapping', default=OS_MAPPING_VERSION, choices=sorted(MAPPINGS),
+                        help="Mapping version of the new indices")
+    args = parser.parse_args()
+    if (args.path or args.index or args.checkpoint) and len(args.sources) != 1:
+        parser.error("--path, --index and --checkpoint take a single source")
+
+    from patlytics.utils.opensearch import get_default_client
+    reindexer = BlueGreenReindexer(get_default_client().client, force_merge=args.force_merge,
+                                   wait_for_status=args.wait_for_status)
+    if len(args.sources) == 1:
+        source = args.sources[0]
+        alias, _, default_path = TARGETS[source]
+        index_settings = MAPPINGS[args.mapping][source]
+        build = reindexer.build(alias, index_settings, args.path or default_path, source,
+                                args.index, args.checkpoint)
+        reindexer.swap([build], args.delete_old)
+    else:
+        reindexer.reindex(args.sources, delete_old=args.delete_old, mapping=args.mapping)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import json
+from typing import Optional
+
+
+def parse_llm_json(text: str) -> dict:
+    """
+    Parse an LLM answer that should be a JSON object, tolerating the
+    ```json ... ``` fences models like to wrap it in.
+    """
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.replace("```json", "").replace("```", "")
+    return json.loads(text)
+
+
+def parse_analysis_answer(text: str) -> dict:
+    """An LLM analysis answer, or an `error_answer` if it is not valid JSON."""
+    try:
+        return parse_llm_json(text)
+    except json.JSONDecodeError:
+        return error_answer("Error parsing patent analysis response.")
+
+
+def error_answer(message: str) -> dict:
+    # No placeholder analysis: a failed call must not read as "Low"
+    return {
+        "error": message,
+        "analyses": []
+    }
+
+
+class AnalysesStreamParser:
+    """
+    Incrementally extracts the objects of the top-level "analyses" array from
+    a JSON answer that arrives in chunks.
+
+    `feed` scans only the new text, tracking strings, escapes and nesting, and
+    returns each array element as soon as its closing brace arrives, so the
+    first product analysis can be shown long before the answer is complete.
+    """
+
+    def __init__(self, array_key: str = "analyses"):
+        self.array_key = array_key
+        self._text = ""
+        self._position = 0
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = None
+        self._last_string = None
+        self._current_key = None
+        self._array_depth = None
+        self._item_start = None
+
+    def feed(self, chunk: str) -> list[dict]:
+        """
+        Add a chunk of the answer.
+
+        Returns:
+            list[dict]: Array elements completed by this chunk
+        """
+        self._text += chunk
+        completed = []
+
+        text = self._text
+        for i in range(self._position, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1: i]
+                continue
+
+            if not self._stack and char != '{':
+                # Markdown fences or chatter around the JSON object
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ':':
+                self._current_key = self._last_string
+            elif char == ',':
+                self._current_key = None
+            elif char in '{[':
+                if (char == '[' and self._array_depth is None and len(self._stack) == 1
+                        and self._current_key == self.array_key):
+                    self._array_depth = len(self._stack) + 1
+                elif char == '{' and len(self._stack) == self._array_depth:
+                    self._item_start = i
+                self._stack.append(char)
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if (char == '}' and self._item_start is not None
+                        and len(self._stack) == self._array_depth):
+                    try:
+                        completed.append(json.loads(text[self._item_start: i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif char == ']' and len(self._stack) == (self._array_depth or 0) - 1:
+                    # The array is closed; never match a later one
+                    self._array_depth = -1
+
+        self._position = len(text)
+        return completed
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def result(self) -> Optional[dict]:
+        """
+        Parse the complete answer, or None if it is not valid JSON.
+        """
+        try:
+            return parse_llm_json(self._text)
+        except json.JSONDecodeError:
+            return None